@@ -0,0 +1,174 @@
+"""High-volume analytics events, stored only as per-minute rollups.
+
+``record`` appends an event to a fixed-size in-memory ring buffer and returns;
+it never touches Mongo. A background flusher drains the buffer every
+``flush_interval`` seconds (or sooner once it is half full), folds the events
+into ``(minute, section, event)`` counts and applies them with one unordered
+``bulk_write`` of ``$inc`` upserts. A burst of page views therefore costs at
+most one write per distinct counter per flush, and readers query the rollup
+collection instead of raw events.
+
+When the buffer is full the oldest events are overwritten and counted in
+``dropped``; counts that fail to flush are kept and retried with the next one.
+"""
+
+import asyncio
+import logging
+import time
+from collections import Counter, deque
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+
+logger = logging.getLogger(__name__)
+
+# Accepted values; anything else is rejected so clients cannot create
+# unbounded numbers of counters
+SECTIONS = frozenset({"home", "about", "skills", "projects", "certifications", "contact", "resume"})
+EVENTS = frozenset({"view", "click", "submit", "download"})
+
+# (epoch minute, section, event)
+_Key = Tuple[int, str, str]
+
+
+class EventCollector:
+    # Monotonic entries of metrics()
+    COUNTERS = ("accepted", "dropped", "flushes", "flush_failures", "counters_written")
+
+    def __init__(
+        self,
+        collection,
+        capacity: int = 10000,
+        flush_interval: float = 1.0,
+        max_pending_keys: int = 10000,
+    ):
+        self.collection = collection
+        self.capacity = capacity
+        self.flush_interval = flush_interval
+        self.max_pending_keys = max_pending_keys
+        self._buffer: "deque[_Key]" = deque(maxlen=capacity)
+        # Counts folded from the buffer but not yet acknowledged by Mongo
+        self._pending: "Counter[_Key]" = Counter()
+        self._wake: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+
+        self.accepted = 0
+        self.dropped = 0
+        self.flushes = 0
+        self.counters_written = 0
+        self.flush_failures = 0
+
+    def record(self, section: str, event: str) -> None:
+        if len(self._buffer) == self.capacity:
+            self.dropped += 1
+        self._buffer.append((int(time.time() // 60), section, event))
+        self.accepted += 1
+        if self._wake is not None and len(self._buffer) >= self.capacity // 2:
+            self._wake.set()
+
+    def start(self) -> None:
+        if self._task is not None:
+            return
+        self._wake = asyncio.Event()
+        self._stopping = False
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the flusher and write whatever is still buffered."""
+        if self._task is not None:
+            # Not cancelled: a flush interrupted mid-write could lose or double its counts
+            self._stopping = True
+            self._wake.set()
+            await self._task
+            self._task = None
+            self._wake = None
+        await self.flush()
+
+    async def flush(self) -> int:
+        """Write everything buffered so far; returns the number of counters written."""
+        buffer = self._buffer
+        for _ in range(len(buffer)):
+            self._pending[buffer.popleft()] += 1
+        if not self._pending:
+            return 0
+
+        batch = list(self._pending.items())
+        self._pending.clear()
+        requests = [
+            UpdateOne(
+                {"minute": datetime.utcfromtimestamp(minute * 60), "section": section, "event": event},
+                {"$inc": {"count": count}},
+                upsert=True,
+            )
+            for (minute, section, event), count in batch
+        ]
+        failed: List[int] = []
+        try:
+            await self.collection.bulk_write(requests, ordered=False)
+        except BulkWriteError as e:
+            # Typically concurrent upserts of a new counter; retry just those
+            failed = [error["index"] for error in e.details.get("writeErrors", [])]
+        except Exception as e:
+            logger.warning("Could not flush %d analytics counters: %s", len(batch), e)
+            failed = list(range(len(batch)))
+
+        for index in failed:
+            key, count = batch[index]
+            if key in self._pending or len(self._pending) < self.max_pending_keys:
+                self._pending[key] += count
+            else:
+                self.dropped += count
+        self.flushes += 1
+        self.flush_failures += bool(failed)
+        self.counters_written += len(batch) - len(failed)
+        return len(batch) - len(failed)
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "buffered": len(self._buffer),
+            "buffer_capacity": self.capacity,
+            "pending_counters": len(self._pending),
+            "accepted": self.accepted,
+            "dropped": self.dropped,
+            "flushes": self.flushes,
+            "flush_failures": self.flush_failures,
+            "counters_written": self.counters_written,
+        }
+
+    async def _run(self) -> None:
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(self._wake.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            await self.flush()
+
+
+def rollup_pipeline(
+    since: datetime,
+    until: datetime,
+    section: Optional[str] = None,
+    event: Optional[str] = None,
+) -> List[Dict[str, Any]]:
+    """Totals per section and event over ``[since, until)``, from the rollups."""
+    match: Dict[str, Any] = {"minute": {"$gte": since, "$lt": until}}
+    if section:
+        match["section"] = section
+    if event:
+        match["event"] = event
+    return [
+        {"$match": match},
+        {
+            "$group": {
+                "_id": {"section": "$section", "event": "$event"},
+                "count": {"$sum": "$count"},
+                "lastMinute": {"$max": "$minute"},
+            }
+        },
+        {"$sort": {"count": -1, "_id.section": 1, "_id.event": 1}},
+        {"$project": {"_id": 0, "section": "$_id.section", "event": "$_id.event", "count": 1, "lastMinute": 1}},
+    ]
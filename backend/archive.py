@@ -0,0 +1,195 @@
+"""Archival of old contacts and status checks to monthly Parquet files.
+
+``archive_collection`` moves documents older than a cutoff out of a hot
+collection into ``<directory>/<collection>/<YYYY-MM>.parquet`` (columnar,
+zstd-compressed), one month at a time: the month's rows are streamed in
+batches into one temporary file, which is merged once with what an earlier
+run archived (deduplicated on ``id``), fsynced and moved into place before
+the same documents are deleted from Mongo. A run interrupted between the two
+steps is repaired by the next one, which rewrites the month without
+duplicating anything.
+
+``ArchiveReader`` answers historical queries from those files. Only the
+months overlapping the requested range are opened, newest first, and reading
+stops as soon as ``limit`` rows are found; filters are pushed down to
+Parquet so row groups outside the range are not decoded.
+"""
+
+import asyncio
+import os
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from contact_search import CONTACT_FIELDS
+
+# Archived columns per collection; "id" and "timestamp" are required
+ARCHIVED_FIELDS: Dict[str, Tuple[str, ...]] = {
+    "contacts": CONTACT_FIELDS,
+    "status_checks": ("id", "client_name", "timestamp"),
+}
+
+# Contacts still waiting to be notified stay in the hot collection
+KEEP_HOT: Dict[str, Dict[str, Any]] = {
+    "contacts": {"status": {"$nin": ["new", "notifying"]}},
+}
+
+COMPRESSION = "zstd"
+
+
+def month_of(timestamp: datetime) -> str:
+    return f"{timestamp.year:04d}-{timestamp.month:02d}"
+
+
+def _schema(fields: Sequence[str]) -> pa.Schema:
+    return pa.schema([(field, pa.timestamp("us") if field == "timestamp" else pa.string()) for field in fields])
+
+
+class _MonthWriter:
+    """Streams one month's rows into a temporary file, then publishes it.
+
+    Rows arrive in ``(timestamp, id)`` order, so a month with no earlier
+    archive is published as written; otherwise the earlier file is merged in
+    once, when the month is complete.
+    """
+
+    def __init__(self, path: Path, fields: Sequence[str]):
+        self.path = path
+        self.schema = _schema(fields)
+        self.tmp = path.with_name(path.name + ".tmp")
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._writer = pq.ParquetWriter(self.tmp, self.schema, compression=COMPRESSION)
+
+    def write(self, rows: List[Dict[str, Any]]) -> None:
+        self._writer.write_table(pa.Table.from_pylist(rows, schema=self.schema))
+
+    def publish(self) -> None:
+        self._writer.close()
+        if self.path.exists():
+            frame = pd.concat([pd.read_parquet(self.path), pd.read_parquet(self.tmp)], ignore_index=True)
+            frame = frame.drop_duplicates("id", keep="last").sort_values(["timestamp", "id"], ignore_index=True)
+            table = pa.Table.from_pandas(frame, schema=self.schema, preserve_index=False)
+            pq.write_table(table, self.tmp, compression=COMPRESSION)
+        # Durable before the documents are deleted from Mongo
+        with open(self.tmp, "rb") as f:
+            os.fsync(f.fileno())
+        os.replace(self.tmp, self.path)
+
+    def abort(self) -> None:
+        self._writer.close()
+        self.tmp.unlink(missing_ok=True)
+
+
+async def archive_collection(
+    collection,
+    name: str,
+    cutoff: datetime,
+    directory: Path,
+    batch_size: int = 5000,
+) -> Dict[str, int]:
+    """Move ``name`` documents older than ``cutoff`` into monthly files; returns counts moved per month."""
+    fields = ARCHIVED_FIELDS[name]
+    query = {"timestamp": {"$lt": cutoff}, **KEEP_HOT.get(name, {})}
+    projection = {"_id": 0, **{field: 1 for field in fields}}
+    cursor = collection.find(query, projection).sort([("timestamp", 1), ("id", 1)]).batch_size(batch_size)
+
+    moved: Dict[str, int] = {}
+    month: Optional[str] = None
+    writer: Optional[_MonthWriter] = None
+    rows: List[Dict[str, Any]] = []
+    ids: List[str] = []
+
+    # Parquet encoding is blocking; it runs off the event loop
+    async def write_rows() -> None:
+        if rows:
+            await asyncio.to_thread(writer.write, list(rows))
+            ids.extend(row["id"] for row in rows)
+            rows.clear()
+
+    async def finish_month() -> None:
+        await write_rows()
+        await asyncio.to_thread(writer.publish)
+        # Only now that the month is on disk
+        for start in range(0, len(ids), batch_size):
+            result = await collection.delete_many({"id": {"$in": ids[start:start + batch_size]}, **query})
+            moved[month] = moved.get(month, 0) + result.deleted_count
+        ids.clear()
+
+    try:
+        async for doc in cursor:
+            doc_month = month_of(doc["timestamp"])
+            if doc_month != month:
+                if writer is not None:
+                    await finish_month()
+                month = doc_month
+                writer = await asyncio.to_thread(_MonthWriter, Path(directory) / name / f"{month}.parquet", fields)
+            rows.append(doc)
+            if len(rows) >= batch_size:
+                await write_rows()
+        if writer is not None:
+            await finish_month()
+            writer = None
+    except BaseException:
+        if writer is not None:
+            writer.abort()
+        raise
+    return moved
+
+
+class ArchiveReader:
+    def __init__(self, directory: Path):
+        self.directory = Path(directory)
+
+    def months(self, name: str) -> List[str]:
+        """Archived months of ``name``, newest first."""
+        folder = self.directory / name
+        if not folder.is_dir():
+            return []
+        return sorted((path.stem for path in folder.glob("*.parquet")), reverse=True)
+
+    def read(
+        self,
+        name: str,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        equals: Optional[Dict[str, Any]] = None,
+        limit: int = 1000,
+    ) -> List[Dict[str, Any]]:
+        """Archived documents in ``[since, until)`` matching ``equals``, newest first."""
+        filters: List[Tuple[str, str, Any]] = [(field, "==", value) for field, value in (equals or {}).items()]
+        if since is not None:
+            filters.append(("timestamp", ">=", pd.Timestamp(since)))
+        if until is not None:
+            filters.append(("timestamp", "<", pd.Timestamp(until)))
+
+        found: List[pd.DataFrame] = []
+        remaining = limit
+        for month in self.months(name):
+            if until is not None and month > month_of(until):
+                continue
+            if since is not None and month < month_of(since):
+                break
+            frame = pd.read_parquet(self.directory / name / f"{month}.parquet", filters=filters or None)
+            if frame.empty:
+                continue
+            frame = frame.sort_values(["timestamp", "id"], ascending=False).head(remaining)
+            found.append(frame)
+            remaining -= len(frame)
+            if remaining <= 0:
+                break
+        return _records(found)
+
+
+def _records(frames: Iterable[pd.DataFrame]) -> List[Dict[str, Any]]:
+    records = []
+    for frame in frames:
+        timestamps = frame["timestamp"].dt.to_pydatetime()
+        frame = frame.astype(object).where(frame.notna(), None)
+        for record, timestamp in zip(frame.to_dict("records"), timestamps):
+            record["timestamp"] = timestamp
+            records.append(record)
+    return records
@@ -0,0 +1,164 @@
+"""Content-encoding negotiation and response compression.
+
+Cached payloads (see ``http_cache``) keep their own pre-compressed variants and
+set ``Content-Encoding`` themselves; ``CompressionMiddleware`` only gzips the
+remaining dynamic responses and leaves anything already encoded alone.
+"""
+
+import gzip
+import zlib
+from typing import Iterable, List, Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; gzip is always available
+    brotli = None
+
+# Preferred first when the client weighs encodings equally
+ENCODINGS = ("br", "gzip") if brotli is not None else ("gzip",)
+
+COMPRESSIBLE_TYPES = (
+    "application/json",
+    "application/x-ndjson",
+    "application/javascript",
+    "application/xml",
+    "text/",
+)
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    """Compress at the highest level; only used for bodies that are compressed once."""
+    if encoding == "br":
+        return brotli.compress(body, quality=11)
+    if encoding == "gzip":
+        return gzip.compress(body, compresslevel=9, mtime=0)
+    raise ValueError(f"Unsupported encoding: {encoding}")
+
+
+def negotiate(accept_encoding: Optional[str], available: Iterable[str] = ENCODINGS) -> Optional[str]:
+    """Pick the best encoding from an Accept-Encoding header, or None for identity."""
+    candidates = acceptable(accept_encoding, available)
+    return candidates[0] if candidates else None
+
+
+def acceptable(accept_encoding: Optional[str], available: Iterable[str] = ENCODINGS) -> List[str]:
+    """The ``available`` encodings an Accept-Encoding header allows, most preferred first."""
+    if not accept_encoding:
+        return []
+    weights = {}
+    for item in accept_encoding.split(","):
+        coding, _, params = item.strip().partition(";")
+        coding = coding.strip().lower()
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        weights[coding] = q
+
+    ranked = [(weights.get(coding, weights.get("*", 0.0)), coding) for coding in available]
+    # Stable on ties, so ``available`` order breaks them
+    ranked.sort(key=lambda item: -item[0])
+    return [coding for q, coding in ranked if q > 0]
+
+
+def is_compressible(content_type: str) -> bool:
+    return content_type.startswith(COMPRESSIBLE_TYPES)
+
+
+class CompressionMiddleware:
+    """Gzip dynamic responses on the fly.
+
+    Responses that already carry ``Content-Encoding`` or vary on
+    ``Accept-Encoding`` (pre-compressed payloads, compressed streams), partial
+    content, and non-text media types pass through untouched.
+    """
+
+    def __init__(self, app: ASGIApp, minimum_size: int = 500, compresslevel: int = 6) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+        self.compresslevel = compresslevel
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        accepts_gzip = negotiate(Headers(scope=scope).get("accept-encoding"), ("gzip",)) == "gzip"
+        responder = _GzipResponder(accepts_gzip, self.minimum_size, self.compresslevel, send)
+        await self.app(scope, receive, responder.on_send)
+
+
+class _GzipResponder:
+    def __init__(self, accepts_gzip: bool, minimum_size: int, compresslevel: int, send: Send) -> None:
+        self.accepts_gzip = accepts_gzip
+        self.minimum_size = minimum_size
+        self.compresslevel = compresslevel
+        self.send = send
+        self.start_message: Optional[Message] = None
+        self.passthrough = False
+        self.compressor = None
+
+    async def on_send(self, message: Message) -> None:
+        if self.passthrough:
+            await self.send(message)
+            return
+
+        if message["type"] == "http.response.start":
+            headers = Headers(raw=message["headers"])
+            if (
+                "content-encoding" in headers
+                # Cached payloads negotiate their own encoding
+                or "accept-encoding" in headers.get("vary", "").lower()
+                or "content-range" in headers
+                or message["status"] in (204, 206, 304)
+                or not is_compressible(headers.get("content-type", ""))
+            ):
+                self.passthrough = True
+                await self.send(message)
+                return
+            MutableHeaders(raw=message["headers"]).add_vary_header("Accept-Encoding")
+            if not self.accepts_gzip:
+                self.passthrough = True
+                await self.send(message)
+                return
+            # Hold the start message until we know the body is worth compressing
+            self.start_message = message
+            return
+
+        if message["type"] != "http.response.body":
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        start = self.start_message
+
+        if self.compressor is None:
+            headers = MutableHeaders(raw=start["headers"])
+            if not more_body and len(body) < self.minimum_size:
+                self.passthrough = True
+                await self.send(start)
+                await self.send(message)
+                return
+            headers["Content-Encoding"] = "gzip"
+            del headers["Content-Length"]
+            self.compressor = zlib.compressobj(self.compresslevel, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+            if not more_body:
+                compressed = self.compressor.compress(body) + self.compressor.flush()
+                headers["Content-Length"] = str(len(compressed))
+                await self.send(start)
+                await self.send({"type": "http.response.body", "body": compressed})
+                return
+            await self.send(start)
+
+        chunk = self.compressor.compress(body)
+        if more_body:
+            chunk += self.compressor.flush(zlib.Z_SYNC_FLUSH)
+        else:
+            chunk += self.compressor.flush()
+        await self.send({"type": "http.response.body", "body": chunk, "more_body": more_body})
@@ -0,0 +1,73 @@
+"""Filters and projections for the admin contact listing.
+
+Every filter maps onto an index (see ``indexes.index_models``): status and
+email domain lead compound indexes that end in the keyset sort, the date range
+is a range on ``timestamp`` itself, and free text goes through the text index
+over subject and message.
+"""
+
+from datetime import datetime
+from typing import Any, Dict, Iterable, Optional
+
+from notifications import NOTIFY_FIELDS
+from pagination import naive_utc
+
+# Fields an admin can ask for, in export column order
+CONTACT_FIELDS = ("id", "timestamp", "status", "name", "email", "subject", "message")
+
+# Needed to build the next page's cursor, so always returned
+KEYSET_FIELDS = ("id", "timestamp")
+
+# dedupKey/dedupHash, emailDomain and the notification outbox fields are bookkeeping,
+# not part of the record
+CONTACT_PROJECTION = {"_id": 0, "dedupKey": 0, "dedupHash": 0, "emailDomain": 0, **{field: 0 for field in NOTIFY_FIELDS}}
+
+
+def email_domain(email: str) -> str:
+    return email.rpartition("@")[2].lower()
+
+
+async def backfill_email_domains(collection) -> int:
+    """Set ``emailDomain`` on contacts stored before it was recorded."""
+    result = await collection.update_many(
+        {"emailDomain": {"$exists": False}, "email": {"$type": "string"}},
+        [{"$set": {"emailDomain": {"$toLower": {"$arrayElemAt": [{"$split": ["$email", "@"]}, -1]}}}}],
+    )
+    return result.modified_count
+
+
+def contact_filter(
+    status: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    domain: Optional[str] = None,
+    text: Optional[str] = None,
+) -> Dict[str, Any]:
+    query: Dict[str, Any] = {}
+    if status:
+        query["status"] = status
+    if since or until:
+        query["timestamp"] = {}
+        if since:
+            query["timestamp"]["$gte"] = naive_utc(since)
+        if until:
+            query["timestamp"]["$lt"] = naive_utc(until)
+    if domain:
+        query["emailDomain"] = domain.lstrip("@").lower()
+    if text and text.strip():
+        query["$text"] = {"$search": text.strip()}
+    return query
+
+
+def contact_projection(fields: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+    """Inclusion projection for ``fields``; raises ValueError for unknown ones."""
+    if not fields:
+        return CONTACT_PROJECTION
+    fields = [field.strip() for field in fields if field.strip()]
+    unknown = sorted(set(fields) - set(CONTACT_FIELDS))
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+    projection: Dict[str, Any] = {"_id": 0}
+    for field in (*KEYSET_FIELDS, *fields):
+        projection[field] = 1
+    return projection
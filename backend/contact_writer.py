@@ -0,0 +1,180 @@
+"""Write-behind batching for contact form submissions.
+
+Submissions are queued and coalesced into ``insert_many`` batches by a single
+background flusher, which flushes once a batch is full or the oldest queued
+record has waited ``max_delay`` seconds. ``submit`` only returns once the batch
+holding the record has been acknowledged by Mongo, so callers can still ack
+the request as saved. The queue is bounded: when it is full, submitters wait
+(up to ``enqueue_timeout``) instead of growing memory without limit.
+"""
+
+import asyncio
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+from pymongo import WriteConcern
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+
+from metrics import Histogram
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds of the batch size histogram
+BATCH_SIZE_BUCKETS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000)
+
+
+class WriterOverloaded(Exception):
+    """The queue stayed full for longer than the enqueue timeout."""
+
+
+class BatchWriter:
+    # Monotonic entries of metrics()
+    COUNTERS = ("batches_flushed", "records_written", "records_failed")
+
+    def __init__(
+        self,
+        collection,
+        max_batch: int = 100,
+        max_delay: float = 0.005,
+        max_queue: int = 1000,
+        enqueue_timeout: float = 5.0,
+        journal: bool = True,
+    ):
+        self.collection = collection
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self.max_queue = max_queue
+        self.enqueue_timeout = enqueue_timeout
+        self.journal = journal
+        self._queue: Optional[asyncio.Queue] = None
+        self._full: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._target = None
+        self._closing = False
+
+        self.batches_flushed = 0
+        self.records_written = 0
+        self.records_failed = 0
+        self.last_batch_size = 0
+        self.max_batch_size_seen = 0
+        self.batch_sizes = Histogram(BATCH_SIZE_BUCKETS)
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._closing
+
+    def start(self) -> None:
+        if self._task is not None:
+            return
+        self._target = self.collection
+        if self.journal:
+            self._target = self.collection.with_options(write_concern=WriteConcern(w=1, j=True))
+        self._queue = asyncio.Queue(maxsize=self.max_queue)
+        self._full = asyncio.Event()
+        self._closing = False
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop accepting records and wait until everything queued is written."""
+        if self._task is None:
+            return
+        self._closing = True
+        await self._queue.join()
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+        # Submitters that were blocked on a full queue may have got in last
+        leftover = []
+        while not self._queue.empty():
+            leftover.append(self._queue.get_nowait())
+        if leftover:
+            await self._flush(leftover)
+
+    async def submit(self, record: Dict[str, Any]) -> None:
+        """Queue a record and wait until its batch has been written."""
+        if not self.running:
+            # Not started (or shutting down): write straight through
+            await self.collection.insert_one(record)
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        try:
+            self._queue.put_nowait((record, future))
+        except asyncio.QueueFull:
+            try:
+                await asyncio.wait_for(self._queue.put((record, future)), self.enqueue_timeout)
+            except asyncio.TimeoutError:
+                raise WriterOverloaded(f"Contact queue full ({self.max_queue} pending)")
+        if self._queue.qsize() >= self.max_batch:
+            self._full.set()
+        await future
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "queue_depth": self._queue.qsize() if self._queue is not None else 0,
+            "queue_capacity": self.max_queue,
+            "batches_flushed": self.batches_flushed,
+            "records_written": self.records_written,
+            "records_failed": self.records_failed,
+            "last_batch_size": self.last_batch_size,
+            "max_batch_size": self.max_batch_size_seen,
+            "batch_size_buckets": dict(self.batch_sizes.buckets()),
+        }
+
+    async def _run(self) -> None:
+        while True:
+            batch = [await self._queue.get()]
+            if self._queue.qsize() + 1 < self.max_batch and self.max_delay > 0:
+                try:
+                    await asyncio.wait_for(self._full.wait(), self.max_delay)
+                except asyncio.TimeoutError:
+                    pass
+            self._full.clear()
+            while len(batch) < self.max_batch and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+
+            try:
+                await self._flush(batch)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    async def _flush(self, batch: List[Tuple[Dict[str, Any], asyncio.Future]]) -> None:
+        failed = {}
+        try:
+            await self._target.insert_many([record for record, _ in batch], ordered=False)
+        except BulkWriteError as e:
+            for error in e.details.get("writeErrors", []):
+                # Duplicates (a resubmitted idempotency key) fail on their own
+                if error.get("code") == 11000:
+                    failed[error["index"]] = DuplicateKeyError(error.get("errmsg", ""), 11000, error)
+                else:
+                    failed[error["index"]] = e
+            if e.details.get("writeConcernErrors"):
+                # Inserted but not durable (journal or replication failed): nothing is acknowledged
+                logger.error("Write concern error on contact batch of %d: %s", len(batch), e.details["writeConcernErrors"])
+                for index in range(len(batch)):
+                    failed.setdefault(index, e)
+        except Exception as e:
+            logger.error("Error writing contact batch of %d: %s", len(batch), e)
+            failed = dict.fromkeys(range(len(batch)), e)
+
+        for index, (_, future) in enumerate(batch):
+            if future.done():  # submitter went away
+                continue
+            if index in failed:
+                future.set_exception(failed[index])
+            else:
+                future.set_result(None)
+
+        size = len(batch)
+        self.batches_flushed += 1
+        self.records_failed += len(failed)
+        self.records_written += size - len(failed)
+        self.last_batch_size = size
+        self.max_batch_size_seen = max(self.max_batch_size_seen, size)
+        self.batch_sizes.observe(size)
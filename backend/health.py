@@ -0,0 +1,40 @@
+"""Mongo readiness checks and connection pool warm-up.
+
+Every check runs under a deadline so a slow or unreachable server shows up as
+"not ready" instead of hanging the probe (or startup) behind the driver's own,
+much longer, server selection timeout.
+"""
+
+import asyncio
+import logging
+import time
+from typing import Any, Dict
+
+logger = logging.getLogger(__name__)
+
+
+async def ping(db, timeout: float) -> Dict[str, Any]:
+    """Round-trip a ``ping`` command; reports latency or the failure."""
+    start = time.perf_counter()
+    try:
+        await asyncio.wait_for(db.command("ping"), timeout)
+    except asyncio.TimeoutError:
+        return {"ok": False, "error": f"ping timed out after {timeout}s"}
+    except Exception as e:
+        return {"ok": False, "error": str(e)}
+    return {"ok": True, "latency_ms": round((time.perf_counter() - start) * 1000, 3)}
+
+
+async def warm_up(db, connections: int, timeout: float) -> bool:
+    """Open up to ``connections`` pooled sockets with concurrent pings.
+
+    Concurrent commands each check out their own connection, so the first
+    requests after startup find them already established.
+    """
+    results = await asyncio.gather(*(ping(db, timeout) for _ in range(max(connections, 1))))
+    failed = [r for r in results if not r["ok"]]
+    if failed:
+        logger.warning("Mongo warm-up failed for %d of %d connections: %s", len(failed), len(results), failed[0]["error"])
+        return False
+    logger.info("Mongo warm-up opened %d connections", len(results))
+    return True
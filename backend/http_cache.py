@@ -0,0 +1,104 @@
+"""Pre-serialized response bodies with strong ETags and conditional GET support."""
+
+import hashlib
+from typing import Any, Dict, Mapping, Optional, Tuple
+
+from starlette.requests import Request
+from starlette.responses import Response
+
+from compression import ENCODINGS, acceptable, compress
+from serialization import dumps
+
+
+class CachedPayload:
+    """A response body that is encoded once and served from memory.
+
+    Compressed variants are built on first use and kept alongside the
+    identity body, each with its own strong ETag.
+    """
+
+    __slots__ = ("body", "etag", "media_type", "_variants")
+
+    def __init__(
+        self,
+        body: bytes,
+        media_type: str = "application/json",
+        variants: Optional[Dict[str, Optional[bytes]]] = None,
+    ):
+        self.body = body
+        self.media_type = media_type
+        # Strong validator: derived from the exact bytes we send
+        self.etag = '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+        # Compressed variants already built elsewhere (see ``shared_cache``)
+        self._variants: Dict[str, Optional[bytes]] = dict(variants or {})
+
+    @classmethod
+    def from_json(cls, data: Any) -> "CachedPayload":
+        return cls(dumps(data))
+
+    def variant(self, encoding: str) -> Optional[bytes]:
+        """The body compressed with ``encoding``, or None if that barely shrinks it."""
+        if encoding not in self._variants:
+            compressed = compress(self.body, encoding)
+            # Already-compressed media (PDF streams, images) gain little
+            worthwhile = len(compressed) < len(self.body) * 0.9
+            self._variants[encoding] = compressed if worthwhile else None
+        return self._variants[encoding]
+
+    def negotiate(self, accept_encoding: Optional[str]) -> Tuple[Optional[str], bytes]:
+        """The most preferred accepted encoding that has a variant, and its body; identity otherwise."""
+        for encoding in acceptable(accept_encoding, ENCODINGS):
+            body = self.variant(encoding)
+            if body is not None:
+                return encoding, body
+        return None, self.body
+
+    def variants(self) -> Dict[str, Optional[bytes]]:
+        """Every negotiable variant, building any that are missing."""
+        return {encoding: self.variant(encoding) for encoding in ENCODINGS}
+
+    def variant_etag(self, encoding: Optional[str]) -> str:
+        if encoding is None:
+            return self.etag
+        return self.etag[:-1] + "-" + encoding + '"'
+
+
+def etag_matches(if_none_match: Optional[str], *etags: str) -> bool:
+    """Weak comparison of an If-None-Match header against our ETags (RFC 9110)."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate in etags:
+            return True
+    return False
+
+
+def payload_response(
+    request: Request,
+    payload: CachedPayload,
+    cache_control: str = "public, no-cache",
+    headers: Optional[Mapping[str, str]] = None,
+) -> Response:
+    """Serve a cached payload in the best accepted encoding.
+
+    Revalidations that match any representation of the payload are answered
+    with 304.
+    """
+    encoding, body = payload.negotiate(request.headers.get("accept-encoding"))
+
+    response_headers = dict(headers or {})
+    response_headers["ETag"] = payload.variant_etag(encoding)
+    response_headers["Cache-Control"] = cache_control
+    response_headers["Vary"] = "Accept-Encoding"
+
+    all_etags = [payload.etag] + [payload.variant_etag(e) for e in ENCODINGS]
+    if etag_matches(request.headers.get("if-none-match"), *all_etags):
+        return Response(status_code=304, headers=response_headers)
+    if encoding:
+        response_headers["Content-Encoding"] = encoding
+    return Response(content=body, media_type=payload.media_type, headers=response_headers)
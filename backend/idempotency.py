@@ -0,0 +1,126 @@
+"""Duplicate suppression for form submissions.
+
+A submission is identified by its ``Idempotency-Key`` header or, without one,
+by a hash of its content. Keys seen recently are kept in a bounded LRU with a
+TTL, so double-clicks and client retries are answered from memory (concurrent
+duplicates wait for the first request instead of writing again). Mongo backs
+this with a unique index on the stored key, which catches duplicates the
+in-memory index cannot see: ones handled by another worker or before a
+restart.
+
+Each key is tied to the content it was first used with: a submission that
+reuses a key with different content is a conflict (``IdempotencyConflict``),
+not a replay, so it is neither stored nor silently acknowledged.
+"""
+
+import asyncio
+import hashlib
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, Optional, Sequence, Tuple
+
+from pymongo.errors import DuplicateKeyError
+
+
+class IdempotencyConflict(Exception):
+    """An idempotency key was reused for different content."""
+
+
+def content_hash(fields: Sequence[str]) -> str:
+    """Hash of the submission content, ignoring case and whitespace differences."""
+    normalized = "\x1f".join(" ".join(field.split()).lower() for field in fields)
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()[:32]
+
+
+def submission_keys(idempotency_key: Optional[str], fields: Sequence[str], window: float) -> Tuple[str, str, str]:
+    """``(cache_key, stored_key, content_hash)`` for a submission.
+
+    Content hashes only count as duplicates within ``window`` seconds: the
+    in-memory entry expires after that long, and the stored key includes the
+    window the submission fell into.
+    """
+    digest = content_hash(fields)
+    if idempotency_key:
+        key = "key:" + idempotency_key
+        return key, key, digest
+    key = "hash:" + digest
+    return key, f"{key}:{int(time.time() // window)}", digest
+
+
+class IdempotencyIndex:
+    """Recently completed (or in-flight) operations, bounded by count and age."""
+
+    def __init__(self, max_keys: int = 10000, ttl: float = 600.0):
+        self.max_keys = max_keys
+        self.ttl = ttl
+        # key -> (future resolving when the first attempt finishes, expires_at, content hash)
+        self._entries: "OrderedDict[str, Tuple[asyncio.Future, float, str]]" = OrderedDict()
+        self.replayed = 0
+        self.conflicts = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    async def run_once(
+        self,
+        key: str,
+        operation: Callable[[], Awaitable[None]],
+        fingerprint: str = "",
+        stored_fingerprint: Optional[Callable[[], Awaitable[Optional[str]]]] = None,
+    ) -> bool:
+        """Run ``operation`` unless ``key`` was already handled; returns True for a replay.
+
+        ``operation`` raising ``DuplicateKeyError`` means the write was already
+        stored, which also counts as a replay. A replay whose ``fingerprint``
+        differs from the original's (looked up with ``stored_fingerprint`` for
+        writes stored elsewhere; None means unknown) raises IdempotencyConflict.
+        """
+        now = time.monotonic()
+        entry = self._entries.get(key)
+        if entry is not None and entry[1] > now:
+            self._entries.move_to_end(key)
+            if entry[2] != fingerprint:
+                self.conflicts += 1
+                raise IdempotencyConflict(key)
+            self.replayed += 1
+            # Shielded: a cancelled duplicate must not cancel the original
+            await asyncio.shield(entry[0])
+            return True
+
+        future = asyncio.get_running_loop().create_future()
+        self._entries[key] = (future, now + self.ttl, fingerprint)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_keys:
+            self._entries.popitem(last=False)
+
+        try:
+            await operation()
+        except DuplicateKeyError:
+            stored = await stored_fingerprint() if stored_fingerprint is not None else None
+            if stored is not None and stored != fingerprint:
+                # Remember the content the key was really used for
+                if self._entries.get(key, (None,))[0] is future:
+                    done = asyncio.get_running_loop().create_future()
+                    done.set_result(None)
+                    self._entries[key] = (done, now + self.ttl, stored)
+                self.conflicts += 1
+                conflict = IdempotencyConflict(key)
+                future.set_exception(conflict)
+                future.exception()
+                raise conflict
+            self.replayed += 1
+            future.set_result(None)
+            return True
+        except BaseException as e:
+            # Failed attempts are not remembered, so a retry runs again
+            if self._entries.get(key, (None,))[0] is future:
+                del self._entries[key]
+            if isinstance(e, Exception):
+                future.set_exception(e)
+                # Retrieve it now: nobody may be waiting on this future
+                future.exception()
+            else:
+                future.cancel()
+            raise
+        future.set_result(None)
+        return False
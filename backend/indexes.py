@@ -0,0 +1,152 @@
+"""Index declarations and query plan diagnostics for the hot collections."""
+
+import logging
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from pymongo import IndexModel
+from pymongo.errors import PyMongoError
+
+from pagination import KEYSET_SORT
+
+logger = logging.getLogger(__name__)
+
+def index_models(status_ttl_seconds: Optional[int] = None) -> Dict[str, List[IndexModel]]:
+    """Indexes per collection. ``status_ttl_seconds`` turns the status_checks
+    timestamp index into a TTL index that expires old checks."""
+    status_timestamp = {"name": "timestamp"}
+    if status_ttl_seconds:
+        status_timestamp["expireAfterSeconds"] = status_ttl_seconds
+    return {
+        "contacts": [
+            # Serves the newest-first keyset pages and the export
+            IndexModel(KEYSET_SORT, name="timestamp_id"),
+            IndexModel([("id", 1)], name="id", unique=True),
+            # Admin filters: equality on the prefix, then the keyset sort
+            IndexModel([("status", 1), *KEYSET_SORT], name="status_timestamp_id"),
+            IndexModel([("emailDomain", 1), *KEYSET_SORT], name="emailDomain_timestamp_id"),
+            IndexModel(
+                [("subject", "text"), ("message", "text")],
+                name="subject_message_text",
+                weights={"subject": 2, "message": 1},
+            ),
+            # Idempotency keys / content hashes; older documents have none
+            IndexModel([("dedupKey", 1)], name="dedupKey", unique=True, sparse=True),
+            # Records claimed by the notification worker; only set while claimed
+            IndexModel([("claimToken", 1)], name="claimToken", sparse=True),
+        ],
+        "status_checks": [
+            IndexModel([("timestamp", 1)], **status_timestamp),
+            # Covers the per-client summary aggregation
+            IndexModel([("timestamp", 1), ("client_name", 1)], name="timestamp_client_name"),
+        ],
+        "portfolio_data": [
+            IndexModel([("section", 1)], name="section", unique=True),
+        ],
+        # One counter per minute, section and event; upserts rely on it being unique
+        "analytics_rollups": [
+            IndexModel([("minute", 1), ("section", 1), ("event", 1)], name="minute_section_event", unique=True),
+        ],
+        # Shared rate limit buckets are dropped once they would be full again
+        "rate_limits": [
+            IndexModel([("expiresAt", 1)], name="expiresAt", expireAfterSeconds=0),
+        ],
+    }
+
+
+async def ensure_indexes(db, status_ttl_seconds: Optional[int] = None) -> Dict[str, List[str]]:
+    """Create any missing indexes; existing ones are left as they are, except
+    the status check TTL, which follows ``status_ttl_seconds`` both ways.
+
+    Collections whose indexes could not be created (e.g. Mongo unreachable)
+    are logged and left out of the result, so the caller can retry them.
+    """
+    created = {}
+    for collection, models in index_models(status_ttl_seconds).items():
+        try:
+            if collection == "status_checks":
+                await _apply_status_ttl(db, status_ttl_seconds)
+            created[collection] = await db[collection].create_indexes(models)
+        except PyMongoError as e:
+            logger.error("Error creating indexes on %s: %s", collection, e)
+    return created
+
+
+async def _apply_status_ttl(db, status_ttl_seconds: Optional[int]) -> None:
+    existing = (await db.status_checks.index_information()).get("timestamp")
+    if existing is None or existing.get("expireAfterSeconds") == status_ttl_seconds:
+        return
+    if status_ttl_seconds:
+        await db.command("collMod", "status_checks", index={"name": "timestamp", "expireAfterSeconds": status_ttl_seconds})
+    else:
+        # collMod cannot turn a TTL index back into a plain one; create_indexes rebuilds it
+        await db.status_checks.drop_index("timestamp")
+
+
+def hot_queries() -> Dict[str, Dict[str, Any]]:
+    """The queries behind the admin and monitoring endpoints, as find commands."""
+    sort = dict(KEYSET_SORT)
+    return {
+        "contacts_first_page": {"find": "contacts", "filter": {}, "sort": sort, "limit": 1000},
+        "contacts_next_page": {
+            "find": "contacts",
+            "filter": _sample_seek(),
+            "sort": sort,
+            "limit": 1000,
+        },
+        "contacts_export": {"find": "contacts", "filter": {}, "sort": sort},
+        "contacts_by_status": {"find": "contacts", "filter": {"status": "new"}, "sort": sort, "limit": 1000},
+        "contacts_by_domain": {
+            "find": "contacts",
+            "filter": {"emailDomain": "example.com"},
+            "sort": sort,
+            "limit": 1000,
+        },
+        "status_checks_latest": {"find": "status_checks", "filter": {}, "sort": {"timestamp": -1}, "limit": 1000},
+    }
+
+
+def _sample_seek() -> Dict[str, Any]:
+    # Same shape as keyset_filter() produces for a real cursor
+    now = datetime.utcnow()
+    return {"$or": [{"timestamp": {"$lt": now}}, {"timestamp": now, "id": {"$lt": "~"}}]}
+
+
+def summarize_plan(explain: Dict[str, Any]) -> Dict[str, Any]:
+    """Reduce an explain document to the stages and indexes of the winning plan."""
+    planner = explain.get("queryPlanner", {})
+    stages, indexes = [], []
+    node = planner.get("winningPlan", {})
+    # Newer servers wrap the classic plan in queryPlan
+    node = node.get("queryPlan", node)
+    while node:
+        stages.append(node.get("stage"))
+        if node.get("indexName"):
+            indexes.append(node["indexName"])
+        node = node.get("inputStage") or (node.get("inputStages") or [None])[0]
+
+    summary = {
+        "stages": stages,
+        "indexes": indexes,
+        "collection_scan": "COLLSCAN" in stages,
+        "in_memory_sort": "SORT" in stages,
+    }
+    stats = explain.get("executionStats")
+    if stats:
+        summary["keys_examined"] = stats.get("totalKeysExamined")
+        summary["docs_examined"] = stats.get("totalDocsExamined")
+        summary["returned"] = stats.get("nReturned")
+        summary["millis"] = stats.get("executionTimeMillis")
+    return summary
+
+
+async def explain_hot_queries(db, verbosity: str = "queryPlanner") -> Dict[str, Dict[str, Any]]:
+    """Explain every hot query and summarize its plan."""
+    plans = {}
+    for name, command in hot_queries().items():
+        try:
+            explain = await db.command({"explain": command, "verbosity": verbosity})
+            plans[name] = summarize_plan(explain)
+        except Exception as e:
+            plans[name] = {"error": str(e)}
+    return plans
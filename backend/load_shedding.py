@@ -0,0 +1,185 @@
+"""Adaptive concurrency limits per route class, shedding load with 503s.
+
+Requests are sorted into classes (e.g. cached reads, Mongo reads, Mongo
+writes) and each class has its own limit on requests in flight. A request over
+the limit waits in a small bounded queue for at most ``queue_timeout``
+seconds; when the queue is full or the wait runs out it gets a 503 straight
+away instead of piling onto the event loop.
+
+Limits adapt AIMD-style to the latency the class observes: every request that
+finishes within ``target_latency`` nudges the limit up (by about one per
+limit's worth of requests), while a slow or failed one cuts it by
+``backoff`` (at most once per ``target_latency``, so a burst of slow
+completions counts as one signal). When Mongo slows down the Mongo classes
+shrink to what it can serve, and the cached class, with its own limiter, is
+unaffected.
+"""
+
+import asyncio
+import json
+import time
+from collections import deque
+from typing import Any, Callable, Dict, Optional
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+
+class Overloaded(Exception):
+    pass
+
+
+class AdaptiveLimiter:
+    # Monotonic entries of metrics()
+    COUNTERS = ("accepted", "queued", "rejected", "timed_out")
+
+    def __init__(
+        self,
+        initial: int = 20,
+        min_limit: int = 1,
+        max_limit: int = 200,
+        target_latency: float = 0.25,
+        queue_size: int = 50,
+        queue_timeout: float = 0.5,
+        backoff: float = 0.7,
+    ):
+        self.limit = float(initial)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.target_latency = target_latency
+        self.queue_size = queue_size
+        self.queue_timeout = queue_timeout
+        self.backoff = backoff
+        self.in_flight = 0
+        self._waiters: "deque[asyncio.Future]" = deque()
+        self._last_decrease = 0.0
+
+        self.accepted = 0
+        self.queued = 0
+        self.rejected = 0
+        self.timed_out = 0
+
+    async def acquire(self) -> None:
+        """Take a slot, waiting in the queue if needed; raises Overloaded."""
+        if self.in_flight < int(self.limit) and not self._waiters:
+            self.in_flight += 1
+            self.accepted += 1
+            return
+        if len(self._waiters) >= self.queue_size:
+            self.rejected += 1
+            raise Overloaded("queue full")
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        self.queued += 1
+        try:
+            # The slot is handed over by release(), already counted in in_flight
+            await asyncio.wait_for(asyncio.shield(waiter), self.queue_timeout)
+        except asyncio.TimeoutError:
+            self._abandon(waiter)
+            self.timed_out += 1
+            raise Overloaded("queue timeout")
+        except BaseException:
+            self._abandon(waiter)
+            raise
+        self.accepted += 1
+
+    def release(self, latency: float, ok: bool = True) -> None:
+        self.in_flight -= 1
+        if ok and latency <= self.target_latency:
+            self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+        else:
+            now = time.monotonic()
+            if now - self._last_decrease >= self.target_latency:
+                self._last_decrease = now
+                self.limit = max(self.min_limit, self.limit * self.backoff)
+        self._wake()
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "limit": int(self.limit),
+            "in_flight": self.in_flight,
+            "waiting": len(self._waiters),
+            "accepted": self.accepted,
+            "queued": self.queued,
+            "rejected": self.rejected,
+            "timed_out": self.timed_out,
+        }
+
+    def _abandon(self, waiter: asyncio.Future) -> None:
+        if waiter.done() and not waiter.cancelled():
+            # The slot was handed over just as the wait ended; give it back
+            self.in_flight -= 1
+            self._wake()
+        else:
+            waiter.cancel()
+            try:
+                self._waiters.remove(waiter)
+            except ValueError:
+                pass
+
+    def _wake(self) -> None:
+        while self._waiters and self.in_flight < int(self.limit):
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                self.in_flight += 1
+                waiter.set_result(None)
+
+
+class LoadSheddingMiddleware:
+    """Applies the limiter of each request's class; ``classify`` returns None for unlimited requests."""
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        classify: Callable[[str, str], Optional[str]],
+        limiters: Dict[str, AdaptiveLimiter],
+        enabled: bool = True,
+    ) -> None:
+        self.app = app
+        self.classify = classify
+        self.limiters = limiters
+        self.enabled = enabled
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not self.enabled:
+            await self.app(scope, receive, send)
+            return
+        route_class = self.classify(scope["method"], scope["path"])
+        limiter = self.limiters.get(route_class) if route_class else None
+        if limiter is None:
+            await self.app(scope, receive, send)
+            return
+
+        try:
+            await limiter.acquire()
+        except Overloaded:
+            await _service_unavailable(send)
+            return
+
+        status = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            limiter.release(time.perf_counter() - start, ok=status < 500)
+
+
+async def _service_unavailable(send: Send) -> None:
+    body = json.dumps({"detail": "Server is busy. Please try again shortly."}).encode("utf-8")
+    await send({
+        "type": "http.response.start",
+        "status": 503,
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode("ascii")),
+            (b"retry-after", b"1"),
+        ],
+    })
+    await send({"type": "http.response.body", "body": body})
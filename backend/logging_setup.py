@@ -0,0 +1,112 @@
+"""Non-blocking structured logging.
+
+Log calls on the event loop only put the record on a bounded queue; a
+``QueueListener`` thread formats it as one JSON object per line and writes it
+to stderr. Messages are formatted lazily on that thread, so call sites should
+pass arguments (``logger.info("saved %s", id)``) rather than f-strings.
+
+Under pressure (queue above its high-water mark) records below WARNING are
+sampled, and when the queue is full records are dropped rather than blocking
+the caller; both are counted in ``dropped``.
+"""
+
+import atexit
+import json
+import logging
+import queue
+import sys
+import traceback
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Iterable, List
+
+# Attributes every LogRecord has; anything else was passed via ``extra``
+_RECORD_ATTRS = frozenset(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime", "taskName"}
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRS:
+                entry[key] = value
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+        elif record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class SamplingQueueHandler(QueueHandler):
+    """Enqueues records without blocking, shedding low-priority ones under pressure."""
+
+    def __init__(self, log_queue: queue.Queue, high_watermark: float = 0.75, sample_every: int = 10):
+        super().__init__(log_queue)
+        self.high_watermark = int(log_queue.maxsize * high_watermark)
+        self.sample_every = sample_every
+        self.dropped = 0
+        self._seen_under_pressure = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Unlike the base class, don't format here: that happens on the
+        # listener thread. Tracebacks are rendered now, as they reference
+        # frames that may change once the caller moves on.
+        if record.exc_info:
+            record.exc_text = "".join(traceback.format_exception(*record.exc_info))
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        if record.levelno < logging.WARNING and self.queue.qsize() >= self.high_watermark:
+            self._seen_under_pressure += 1
+            if self._seen_under_pressure % self.sample_every:
+                self.dropped += 1
+                return
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def render(self, lines: List[str]) -> None:
+        lines.append("# HELP log_records_dropped_total Log records sampled out or dropped because the queue was full.")
+        lines.append("# TYPE log_records_dropped_total counter")
+        lines.append(f"log_records_dropped_total {self.dropped}")
+        lines.append("# TYPE log_queue_depth gauge")
+        lines.append(f"log_queue_depth {self.queue.qsize()}")
+
+
+def setup_logging(
+    level: str = "INFO",
+    queue_size: int = 10000,
+    capture: Iterable[str] = ("uvicorn", "uvicorn.error", "uvicorn.access"),
+    stream=None,
+) -> SamplingQueueHandler:
+    """Route the root logger (and ``capture`` loggers) through the queue."""
+    log_queue: queue.Queue = queue.Queue(maxsize=queue_size)
+    handler = SamplingQueueHandler(log_queue)
+
+    output = logging.StreamHandler(stream or sys.stderr)
+    output.setFormatter(JsonFormatter())
+    listener = QueueListener(log_queue, output, respect_handler_level=True)
+    listener.start()
+    # Stopping the listener drains whatever is still queued
+    atexit.register(listener.stop)
+    handler.listener = listener
+
+    root = logging.getLogger()
+    for existing in list(root.handlers):
+        root.removeHandler(existing)
+    root.addHandler(handler)
+    root.setLevel(level)
+
+    for name in capture:
+        captured = logging.getLogger(name)
+        captured.handlers = [handler]
+        captured.propagate = False
+    return handler
+
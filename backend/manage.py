@@ -0,0 +1,111 @@
+"""Maintenance commands for the portfolio backend.
+
+Run from the backend directory, e.g. ``python manage.py explain``.
+"""
+
+import asyncio
+import json
+import os
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import typer
+
+import prefork
+from archive import ARCHIVED_FIELDS, archive_collection
+import server
+import snapshot
+from contact_search import backfill_email_domains
+from indexes import ensure_indexes, explain_hot_queries
+
+cli = typer.Typer(help=__doc__)
+
+
+@cli.command("ensure-indexes")
+def ensure_indexes_command():
+    """Create the indexes the API relies on."""
+    created = asyncio.run(ensure_indexes(server.db, server.status_ttl_seconds()))
+    typer.echo(json.dumps(created, indent=2))
+
+
+@cli.command("explain")
+def explain_command(
+    execution_stats: bool = typer.Option(False, "--execution-stats", help="Run the queries and include timings."),
+):
+    """Report the query plan of every hot query."""
+    verbosity = "executionStats" if execution_stats else "queryPlanner"
+    plans = asyncio.run(explain_hot_queries(server.db, verbosity))
+    typer.echo(json.dumps(plans, indent=2))
+    if any(plan.get("collection_scan") or plan.get("in_memory_sort") for plan in plans.values()):
+        raise typer.Exit(code=1)
+
+
+@cli.command("backfill-email-domains")
+def backfill_email_domains_command():
+    """Record the email domain on contacts stored before it was indexed."""
+    updated = asyncio.run(backfill_email_domains(server.db.contacts))
+    typer.echo(f"Updated {updated} contacts")
+
+
+@cli.command("archive")
+def archive_command(
+    older_than_days: float = typer.Option(365, help="Archive documents older than this many days."),
+    collection: list[str] = typer.Option(
+        list(ARCHIVED_FIELDS), "--collection", help="Collection to archive (repeatable)."
+    ),
+):
+    """Move old contacts and status checks to monthly Parquet files under ARCHIVE_DIR."""
+    unknown = sorted(set(collection) - set(ARCHIVED_FIELDS))
+    if unknown:
+        raise typer.BadParameter(f"Unknown collections: {', '.join(unknown)}")
+    cutoff = datetime.utcnow() - timedelta(days=older_than_days)
+
+    async def run():
+        return {
+            name: await archive_collection(server.db[name], name, cutoff, server.ARCHIVE_DIR)
+            for name in collection
+        }
+
+    typer.echo(json.dumps(asyncio.run(run()), indent=2))
+
+
+@cli.command("serve")
+def serve_command(
+    host: str = typer.Option("0.0.0.0", help="Interface to bind."),
+    port: int = typer.Option(8001, help="Port to bind."),
+    workers: int = typer.Option(os.cpu_count() or 1, help="Number of worker processes."),
+    shared_memory: bool = typer.Option(
+        False, "--shared-memory", help="Share rebuilt portfolio payloads between workers."
+    ),
+    shared_memory_size: int = typer.Option(1024 * 1024, help="Size of the shared payload slot, in bytes."),
+    access_log: bool = typer.Option(False, "--access-log", help="Log every request."),
+):
+    """Run the API in pre-forked uvicorn workers (production entry point)."""
+    prefork.serve(host, port, workers, shared_memory_size if shared_memory else 0, access_log)
+
+
+@cli.command("snapshot")
+def snapshot_command(
+    output: Path = typer.Argument(..., help="Directory to write the snapshot to."),
+    force: bool = typer.Option(False, "--force", help="Rewrite every file, even if unchanged."),
+):
+    """Export the cacheable GET routes as static files for a CDN or nginx."""
+
+    async def run():
+        await server.portfolio_store.warm()
+        return await snapshot.export_snapshot(server.app, output, force=force)
+
+    report = asyncio.run(run())
+    for path in report["written"]:
+        typer.echo(f"wrote      {path} -> {report['routes'][path]['file']}")
+    for path in report["unchanged"]:
+        typer.echo(f"unchanged  {path}")
+    for path, status in report["skipped"].items():
+        typer.echo(f"skipped    {path} (HTTP {status})")
+    typer.echo("Must stay dynamic:")
+    for route in report["dynamic"]:
+        typer.echo(f"  {route}")
+
+
+if __name__ == "__main__":
+    cli()
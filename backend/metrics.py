@@ -0,0 +1,285 @@
+"""Request and Mongo command metrics, rendered in the Prometheus text format.
+
+Everything on the request path is preallocated: each route/method pair gets
+its stats object the first time it is hit, histograms are fixed arrays of
+bucket counts, and label strings are only built when ``/metrics`` is scraped.
+"""
+
+import threading
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, Tuple
+
+from pymongo import monitoring
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# Latency bucket upper bounds, in seconds
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class Histogram:
+    __slots__ = ("bounds", "counts", "sum", "count")
+
+    def __init__(self, bounds: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.bounds = bounds
+        # Last slot is the +Inf bucket
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def buckets(self) -> List[Tuple[str, int]]:
+        """``(le, count)`` pairs, cumulative as Prometheus expects; ``+Inf`` is the total."""
+        buckets = []
+        cumulative = 0
+        for bound, count in zip(self.bounds, self.counts):
+            cumulative += count
+            buckets.append((str(bound), cumulative))
+        buckets.append(("+Inf", self.count))
+        return buckets
+
+    def render(self, name: str, labels: str, lines: List[str]) -> None:
+        sep = "," if labels else ""
+        for le, count in self.buckets():
+            lines.append(f'{name}_bucket{{{labels}{sep}le="{le}"}} {count}')
+        lines.append(f"{name}_sum{{{labels}}} {self.sum}")
+        lines.append(f"{name}_count{{{labels}}} {self.count}")
+
+
+class RouteStats:
+    __slots__ = ("latency", "statuses")
+
+    def __init__(self):
+        self.latency = Histogram()
+        self.statuses: Dict[int, int] = {}
+
+
+class RequestMetrics:
+    """Per-route request counts, status codes and latency histograms."""
+
+    def __init__(self):
+        # route template -> method -> stats
+        self.routes: Dict[str, Dict[str, RouteStats]] = {}
+        self.in_flight = 0
+
+    def record(self, path: str, method: str, status: int, seconds: float) -> None:
+        by_method = self.routes.get(path)
+        if by_method is None:
+            by_method = self.routes[path] = {}
+        stats = by_method.get(method)
+        if stats is None:
+            stats = by_method[method] = RouteStats()
+        stats.latency.observe(seconds)
+        stats.statuses[status] = stats.statuses.get(status, 0) + 1
+
+    def render(self, lines: List[str]) -> None:
+        lines.append("# HELP http_requests_in_flight Requests currently being handled.")
+        lines.append("# TYPE http_requests_in_flight gauge")
+        lines.append(f"http_requests_in_flight {self.in_flight}")
+
+        lines.append("# HELP http_requests_total Requests handled, by route, method and status.")
+        lines.append("# TYPE http_requests_total counter")
+        for path, by_method in sorted(self.routes.items()):
+            for method, stats in by_method.items():
+                for status, count in sorted(stats.statuses.items()):
+                    lines.append(f'http_requests_total{{route="{path}",method="{method}",status="{status}"}} {count}')
+
+        lines.append("# HELP http_request_duration_seconds Request latency, by route and method.")
+        lines.append("# TYPE http_request_duration_seconds histogram")
+        for path, by_method in sorted(self.routes.items()):
+            for method, stats in by_method.items():
+                stats.latency.render("http_request_duration_seconds", f'route="{path}",method="{method}"', lines)
+
+
+class MetricsMiddleware:
+    """Times every HTTP request and files it under its route template."""
+
+    def __init__(self, app: ASGIApp, metrics: RequestMetrics) -> None:
+        self.app = app
+        self.metrics = metrics
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+        metrics = self.metrics
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        metrics.in_flight += 1
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            metrics.in_flight -= 1
+            # The router stores the matched route in the (shared) scope
+            route = scope.get("route")
+            path = route.path if route is not None else "<unmatched>"
+            metrics.record(path, scope["method"], status, time.perf_counter() - start)
+
+
+class MongoCommandMetrics(monitoring.CommandListener):
+    """Driver-level timings for every Mongo command (insert, find, getMore, ...).
+
+    Listeners run on Motor's worker threads, hence the lock.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.commands: Dict[str, Histogram] = {}
+        self.failures: Dict[str, int] = {}
+
+    def _observe(self, name: str, seconds: float) -> None:
+        with self._lock:
+            histogram = self.commands.get(name)
+            if histogram is None:
+                histogram = self.commands[name] = Histogram()
+            histogram.observe(seconds)
+
+    def started(self, event: monitoring.CommandStartedEvent) -> None:
+        pass
+
+    def succeeded(self, event: monitoring.CommandSucceededEvent) -> None:
+        self._observe(event.command_name, event.duration_micros / 1e6)
+
+    def failed(self, event: monitoring.CommandFailedEvent) -> None:
+        self._observe(event.command_name, event.duration_micros / 1e6)
+        with self._lock:
+            self.failures[event.command_name] = self.failures.get(event.command_name, 0) + 1
+
+    def render(self, lines: List[str]) -> None:
+        with self._lock:
+            lines.append("# HELP mongo_command_duration_seconds Mongo command round-trip time, by command.")
+            lines.append("# TYPE mongo_command_duration_seconds histogram")
+            for name, histogram in sorted(self.commands.items()):
+                histogram.render("mongo_command_duration_seconds", f'command="{name}"', lines)
+            lines.append("# HELP mongo_command_failures_total Failed Mongo commands, by command.")
+            lines.append("# TYPE mongo_command_failures_total counter")
+            for name, count in sorted(self.failures.items()):
+                lines.append(f'mongo_command_failures_total{{command="{name}"}} {count}')
+
+
+class MongoPoolMetrics(monitoring.ConnectionPoolListener):
+    """Connection pool occupancy across every server the client talks to."""
+
+    COUNTERS = ("created", "checkout_failures", "pools_cleared")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.open = 0
+        self.in_use = 0
+        self.waiting = 0
+        self.created = 0
+        self.checkout_failures = 0
+        self.pools_cleared = 0
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "open": self.open,
+                "in_use": self.in_use,
+                "waiting": self.waiting,
+                "created": self.created,
+                "checkout_failures": self.checkout_failures,
+                "pools_cleared": self.pools_cleared,
+            }
+
+    def render(self, lines: List[str]) -> None:
+        render_stats("mongo_pool", self.stats(), lines, self.COUNTERS)
+
+    def pool_created(self, event) -> None:
+        pass
+
+    def pool_ready(self, event) -> None:
+        pass
+
+    def pool_cleared(self, event) -> None:
+        with self._lock:
+            self.pools_cleared += 1
+
+    def pool_closed(self, event) -> None:
+        pass
+
+    def connection_created(self, event) -> None:
+        with self._lock:
+            self.open += 1
+            self.created += 1
+
+    def connection_ready(self, event) -> None:
+        pass
+
+    def connection_closed(self, event) -> None:
+        with self._lock:
+            self.open -= 1
+
+    def connection_check_out_started(self, event) -> None:
+        with self._lock:
+            self.waiting += 1
+
+    def connection_check_out_failed(self, event) -> None:
+        with self._lock:
+            self.waiting -= 1
+            self.checkout_failures += 1
+
+    def connection_checked_out(self, event) -> None:
+        with self._lock:
+            self.waiting -= 1
+            self.in_use += 1
+
+    def connection_checked_in(self, event) -> None:
+        with self._lock:
+            self.in_use -= 1
+
+
+def memory_usage(pid: str = "self") -> Dict[str, int]:
+    """Resident and proportional set size of a process, in bytes.
+
+    PSS splits pages shared with other processes (e.g. copy-on-write pages
+    of pre-forked workers) between them, so it is the fairer per-worker
+    figure. Linux only; elsewhere only the peak RSS of this process is known.
+    """
+    usage: Dict[str, int] = {}
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as f:
+            for line in f:
+                key, _, value = line.partition(":")
+                if key in ("Rss", "Pss", "Shared_Clean", "Shared_Dirty", "Private_Clean", "Private_Dirty"):
+                    usage[key.lower() + "_bytes"] = int(value.split()[0]) * 1024
+    except OSError:
+        import resource
+
+        usage["rss_bytes"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+    return usage
+
+
+def render_stats(prefix: str, values: Dict[str, float], lines: List[str], counters: Iterable[str] = ()) -> None:
+    """Flat numeric stats (e.g. a worker's metrics() dict): ``counters`` as ``_total`` counters, the rest as gauges."""
+    counters = frozenset(counters)
+    for name, value in values.items():
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            if name in counters:
+                lines.append(f"# TYPE {prefix}_{name}_total counter")
+                lines.append(f"{prefix}_{name}_total {value}")
+            else:
+                lines.append(f"# TYPE {prefix}_{name} gauge")
+                lines.append(f"{prefix}_{name} {value}")
+
+
+def render(collectors: Iterable[Callable[[List[str]], None]]) -> str:
+    lines: List[str] = []
+    for collect in collectors:
+        collect(lines)
+    lines.append("")
+    return "\n".join(lines)
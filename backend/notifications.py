@@ -0,0 +1,271 @@
+"""Contact notifications, sent by a background outbox worker.
+
+The contacts collection is the outbox: ``submit_contact_form`` only stores a
+record with ``status: "new"``, and this worker later claims new records in
+batches, sends one notification each through a pluggable transport and marks
+them ``notified``. Nothing about notifying is on the request path.
+
+Claiming is atomic per record: a batch of candidate ids is tagged with a
+fresh claim token by an ``update_many`` that only matches records still
+claimable, and only records carrying that token are sent. Claimed records
+hold a lease (``status: "notifying"``) so records of a worker that died
+mid-batch become claimable again once it expires, and several workers (one
+per pre-forked process) never send the same record twice in one lease. The
+lease is renewed just before each send, so a batch sent serially can take
+longer than one lease: only a single send has to fit in it. A record whose
+lease ran out and was claimed by another worker meanwhile is skipped.
+
+A failed send puts the record back to ``new`` with ``notifyAfter`` pushed out
+exponentially; after ``max_attempts`` it is parked as ``notify_failed``.
+"""
+
+import asyncio
+import logging
+import smtplib
+import uuid
+from datetime import datetime, timedelta
+from email.message import EmailMessage
+from typing import Any, Dict, List, Optional
+
+from metrics import Histogram
+
+logger = logging.getLogger(__name__)
+
+# Bookkeeping fields the worker adds to contact records
+NOTIFY_FIELDS = ("claimToken", "leaseUntil", "notifyAttempts", "notifyAfter", "lastNotifyError", "notifiedAt")
+
+# Submission-to-notification lag bucket upper bounds, in seconds
+LAG_BUCKETS = (1.0, 5.0, 15.0, 30.0, 60.0, 300.0, 900.0, 3600.0, 21600.0, 86400.0)
+
+
+class LogTransport:
+    """Writes each notification to the log; for development."""
+
+    async def send(self, contact: Dict[str, Any]) -> None:
+        logger.info("New contact from %s <%s>: %s", contact["name"], contact["email"], contact["subject"])
+
+
+class SMTPTransport:
+    """Mails each notification; smtplib is blocking, so it runs in a thread."""
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        sender: str,
+        recipient: str,
+        username: Optional[str] = None,
+        password: Optional[str] = None,
+        starttls: bool = False,
+        timeout: float = 10.0,
+    ):
+        self.host = host
+        self.port = port
+        self.sender = sender
+        self.recipient = recipient
+        self.username = username
+        self.password = password
+        self.starttls = starttls
+        self.timeout = timeout
+
+    def message(self, contact: Dict[str, Any]) -> EmailMessage:
+        message = EmailMessage()
+        message["From"] = self.sender
+        message["To"] = self.recipient
+        message["Reply-To"] = contact["email"]
+        message["Subject"] = f"Portfolio contact: {contact['subject']}"
+        message.set_content(
+            f"From: {contact['name']} <{contact['email']}>\n"
+            f"Received: {contact['timestamp'].isoformat()}Z\n\n"
+            f"{contact['message']}\n"
+        )
+        return message
+
+    def _send(self, message: EmailMessage) -> None:
+        with smtplib.SMTP(self.host, self.port, timeout=self.timeout) as smtp:
+            if self.starttls:
+                smtp.starttls()
+            if self.username:
+                smtp.login(self.username, self.password or "")
+            smtp.send_message(message)
+
+    async def send(self, contact: Dict[str, Any]) -> None:
+        await asyncio.to_thread(self._send, self.message(contact))
+
+
+class NotificationWorker:
+    # Monotonic entries of metrics()
+    COUNTERS = ("batches", "claimed", "notified", "send_failures", "gave_up", "poll_failures", "leases_lost")
+
+    def __init__(
+        self,
+        collection,
+        transport,
+        batch_size: int = 20,
+        poll_interval: float = 5.0,
+        lease: float = 60.0,
+        max_attempts: int = 5,
+        base_delay: float = 30.0,
+        max_delay: float = 3600.0,
+    ):
+        self.collection = collection
+        self.transport = transport
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.lease = lease
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._wake: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+
+        self.batches = 0
+        self.claimed = 0
+        self.notified = 0
+        self.send_failures = 0
+        self.gave_up = 0
+        self.poll_failures = 0
+        self.leases_lost = 0
+        self.last_lag_seconds = 0.0
+        self.lag = Histogram(LAG_BUCKETS)
+
+    def wake(self) -> None:
+        """Look for new contacts now rather than at the next poll."""
+        if self._wake is not None:
+            self._wake.set()
+
+    def start(self) -> None:
+        if self._task is not None:
+            return
+        self._wake = asyncio.Event()
+        self._stopping = False
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop after the batch being sent, if any; unsent claims expire with their lease."""
+        if self._task is None:
+            return
+        # Not cancelled: a batch interrupted mid-send would be sent again after its lease
+        self._stopping = True
+        self._wake.set()
+        await self._task
+        self._task = None
+        self._wake = None
+
+    async def claim(self) -> List[Dict[str, Any]]:
+        now = datetime.utcnow()
+        claimable = {
+            "$or": [
+                {"status": "new", "$or": [{"notifyAfter": {"$exists": False}}, {"notifyAfter": {"$lte": now}}]},
+                {"status": "notifying", "leaseUntil": {"$lt": now}},
+            ]
+        }
+        candidates = (
+            await self.collection.find(claimable, {"_id": 0, "id": 1})
+            .sort("timestamp", 1)
+            .limit(self.batch_size)
+            .to_list(self.batch_size)
+        )
+        if not candidates:
+            return []
+        token = uuid.uuid4().hex
+        # Re-checks claimability, so a record another worker claimed in between is skipped
+        await self.collection.update_many(
+            {"$and": [{"id": {"$in": [c["id"] for c in candidates]}}, claimable]},
+            {
+                "$set": {"status": "notifying", "claimToken": token, "leaseUntil": now + timedelta(seconds=self.lease)},
+                "$inc": {"notifyAttempts": 1},
+            },
+        )
+        claimed = self.collection.find({"claimToken": token}, {"_id": 0}).sort("timestamp", 1).limit(self.batch_size)
+        return await claimed.to_list(self.batch_size)
+
+    async def run_once(self) -> int:
+        """Claim and send one batch; returns the number of contacts claimed."""
+        batch = await self.claim()
+        if not batch:
+            return 0
+        self.batches += 1
+        self.claimed += len(batch)
+        for contact in batch:
+            token = {"id": contact["id"], "claimToken": contact["claimToken"]}
+            renewed = await self.collection.update_one(
+                token, {"$set": {"leaseUntil": datetime.utcnow() + timedelta(seconds=self.lease)}}
+            )
+            if not renewed.matched_count:
+                # Reclaimed by another worker after the lease ran out
+                self.leases_lost += 1
+                continue
+            try:
+                await self.transport.send(contact)
+            except Exception as e:
+                self.send_failures += 1
+                await self.collection.update_one(token, self._failed(contact, e))
+                continue
+            now = datetime.utcnow()
+            # Recorded straight away: once its lease runs out a sent record must not look claimable
+            await self.collection.update_one(token, {
+                "$set": {"status": "notified", "notifiedAt": now},
+                "$unset": {"claimToken": "", "leaseUntil": "", "notifyAfter": "", "lastNotifyError": ""},
+            })
+            self.notified += 1
+            self.last_lag_seconds = (now - contact["timestamp"]).total_seconds()
+            self.lag.observe(self.last_lag_seconds)
+        return len(batch)
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "batches": self.batches,
+            "claimed": self.claimed,
+            "notified": self.notified,
+            "send_failures": self.send_failures,
+            "gave_up": self.gave_up,
+            "poll_failures": self.poll_failures,
+            "leases_lost": self.leases_lost,
+            "last_lag_seconds": self.last_lag_seconds,
+        }
+
+    def _failed(self, contact: Dict[str, Any], error: Exception) -> Dict[str, Any]:
+        attempts = contact.get("notifyAttempts", 1)
+        if attempts >= self.max_attempts:
+            self.gave_up += 1
+            logger.error("Giving up notifying about contact %s after %d attempts: %s", contact["id"], attempts, error)
+            status = {"status": "notify_failed"}
+        else:
+            delay = min(self.max_delay, self.base_delay * 2 ** (attempts - 1))
+            logger.warning("Could not notify about contact %s (attempt %d, retry in %ds): %s", contact["id"], attempts, delay, error)
+            status = {"status": "new", "notifyAfter": datetime.utcnow() + timedelta(seconds=delay)}
+        return {
+            "$set": {**status, "lastNotifyError": str(error)[:500]},
+            "$unset": {"claimToken": "", "leaseUntil": ""},
+        }
+
+    async def _run(self) -> None:
+        while not self._stopping:
+            try:
+                # Full batches mean there is a backlog: carry on without waiting
+                if await self.run_once() >= self.batch_size:
+                    continue
+            except Exception as e:
+                self.poll_failures += 1
+                logger.warning("Notification poll failed: %s", e)
+            try:
+                await asyncio.wait_for(self._wake.wait(), self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+
+
+def create_transport(name: str, **smtp_options) -> Optional[Any]:
+    """Transport by name: ``smtp``, ``log``, or ``none`` (notifications off).
+
+    ``smtp_options`` are the SMTPTransport arguments, ignored by the others.
+    """
+    if name == "none":
+        return None
+    if name == "log":
+        return LogTransport()
+    if name == "smtp":
+        return SMTPTransport(**smtp_options)
+    raise ValueError(f"Unknown notification transport: {name}")
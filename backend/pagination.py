@@ -0,0 +1,50 @@
+"""Keyset (seek) pagination over ``(timestamp, id)`` ordered collections."""
+
+import base64
+import json
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+# Newest first, with ``id`` breaking ties between equal timestamps
+KEYSET_SORT: List[Tuple[str, int]] = [("timestamp", -1), ("id", -1)]
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def naive_utc(value: datetime) -> datetime:
+    """Timestamps are stored as naive UTC; convert aware datetimes to match."""
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def encode_cursor(doc: Dict[str, Any]) -> str:
+    """Opaque cursor pointing just past ``doc``."""
+    raw = json.dumps({"t": doc["timestamp"].isoformat(), "id": doc["id"]}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, str]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        data = json.loads(raw)
+        return datetime.fromisoformat(data["t"]), str(data["id"])
+    except (ValueError, KeyError, TypeError) as e:
+        raise InvalidCursor(f"Invalid cursor: {cursor!r}") from e
+
+
+def keyset_filter(cursor: Optional[str], query: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Combine ``query`` with the seek condition for the page after ``cursor``."""
+    query = dict(query or {})
+    if cursor:
+        timestamp, last_id = decode_cursor(cursor)
+        seek = {
+            "$or": [
+                {"timestamp": {"$lt": timestamp}},
+                {"timestamp": timestamp, "id": {"$lt": last_id}},
+            ]
+        }
+        query = {"$and": [query, seek]} if query else seek
+    return query
@@ -0,0 +1,293 @@
+"""Mongo-backed portfolio sections with an in-process read-through cache.
+
+Each section is stored as one document in the portfolio data collection
+(``{section, data, lastUpdated}``, see contracts.md). Sections are cached per
+process with a TTL and a size bound; expired sections are served stale while a
+single background refresh reloads them. Edits made directly in Mongo are picked
+up through a change stream, or by polling ``lastUpdated`` when change streams
+are unavailable (standalone servers). If Mongo cannot be reached, cached
+sections keep being served and are retried after ``retry_interval``; the
+built-in content from ``portfolio_content`` is only used for sections that
+were never loaded or are missing from Mongo.
+"""
+
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from pymongo import UpdateOne
+
+from http_cache import CachedPayload
+from portfolio_content import PORTFOLIO_DATA
+
+logger = logging.getLogger(__name__)
+
+# Sections returned by /api/portfolio, in response order
+SECTIONS = tuple(PORTFOLIO_DATA)
+
+
+class _Entry:
+    __slots__ = ("data", "last_updated", "expires_at", "_payload")
+
+    def __init__(self, data: Any, last_updated: Optional[datetime], expires_at: float):
+        self.data = data
+        self.last_updated = last_updated
+        self.expires_at = expires_at
+        self._payload: Optional[CachedPayload] = None
+
+    @property
+    def payload(self) -> CachedPayload:
+        # Built on first request; a changed section gets a new entry
+        if self._payload is None:
+            self._payload = CachedPayload.from_json(self.data)
+        return self._payload
+
+
+class PortfolioStore:
+    """Per-section read-through cache in front of the portfolio collection."""
+
+    def __init__(
+        self,
+        collection,
+        defaults: Dict[str, Any] = PORTFOLIO_DATA,
+        ttl: float = 300.0,
+        max_sections: int = 64,
+        poll_interval: float = 30.0,
+        max_combinations: int = 32,
+        retry_interval: float = 5.0,
+    ):
+        self.collection = collection
+        self.defaults = defaults
+        self.ttl = ttl
+        self.max_sections = max_sections
+        self.poll_interval = poll_interval
+        self.max_combinations = max_combinations
+        self.retry_interval = retry_interval
+        self.mode = "static"
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._version = 0
+        self._lock = asyncio.Lock()
+        self._refresh: Optional[asyncio.Future] = None
+        self._task: Optional[asyncio.Task] = None
+        # Optional cross-process slot for built payloads (see ``shared_cache``)
+        self.shared = None
+
+        # Start from the built-in content, marked stale so the first request
+        # (or the startup warm-up) replaces it with what is stored in Mongo
+        for section, data in defaults.items():
+            self._entries[section] = _Entry(data, None, 0.0)
+        self._payload = CachedPayload.from_json(dict(defaults))
+        self._payload_version = self._version
+        # Payloads for ?sections= subsets: names -> (version, payload)
+        self._combinations: "OrderedDict[Tuple[str, ...], Tuple[int, CachedPayload]]" = OrderedDict()
+
+    async def get_sections(self, names: Iterable[str]) -> Dict[str, Any]:
+        """Return the requested sections, loading missing ones from Mongo."""
+        names = list(names)
+        now = time.monotonic()
+        missing = [name for name in names if name not in self._entries]
+        if missing:
+            await self._load(missing)
+        stale = [name for name in names if name in self._entries and self._entries[name].expires_at <= now]
+        if stale:
+            self._schedule_refresh(stale)
+
+        sections = {}
+        for name in names:
+            entry = self._entries.get(name)
+            if entry is not None:
+                self._entries.move_to_end(name)
+                sections[name] = entry.data
+            elif name in self.defaults:
+                sections[name] = self.defaults[name]
+        return sections
+
+    async def get_payload(self) -> CachedPayload:
+        """The full portfolio document, re-encoded only when a section changed."""
+        sections = await self.get_sections(SECTIONS)
+        if self._payload_version != self._version:
+            payload = CachedPayload.from_json(sections)
+            if self.shared is not None:
+                # Another worker may already have compressed this exact body
+                payload = self.shared.exchange(payload)
+            self._payload = payload
+            self._payload_version = self._version
+        return self._payload
+
+    async def get_section_payload(self, name: str) -> Optional[CachedPayload]:
+        """One section's data on its own, or None if there is no such section."""
+        if name not in SECTIONS:
+            return None
+        await self.get_sections([name])
+        entry = self._entries.get(name)
+        if entry is None:
+            return CachedPayload.from_json(self.defaults[name])
+        return entry.payload
+
+    async def get_subset_payload(self, names: Iterable[str]) -> CachedPayload:
+        """A portfolio document with only ``names`` (in the usual section order)."""
+        wanted = set(names)
+        key = tuple(section for section in SECTIONS if section in wanted)
+        if key == SECTIONS:
+            return await self.get_payload()
+        sections = await self.get_sections(key)
+        cached = self._combinations.get(key)
+        if cached is not None and cached[0] == self._version:
+            self._combinations.move_to_end(key)
+            return cached[1]
+        payload = CachedPayload.from_json(sections)
+        self._combinations[key] = (self._version, payload)
+        self._combinations.move_to_end(key)
+        while len(self._combinations) > self.max_combinations:
+            self._combinations.popitem(last=False)
+        return payload
+
+    async def warm(self) -> CachedPayload:
+        """Load every section from Mongo now and build the payload."""
+        self.invalidate()
+        await self._load(SECTIONS)
+        return await self.get_payload()
+
+    def invalidate(self, section: Optional[str] = None) -> None:
+        """Mark one section (or all of them) for reload on next access."""
+        if section is None:
+            for entry in self._entries.values():
+                entry.expires_at = 0.0
+        elif section in self._entries:
+            self._entries[section].expires_at = 0.0
+
+    async def update_section(self, section: str, data: Any) -> None:
+        """Write a section to Mongo and drop the cached copy."""
+        await self.collection.update_one(
+            {"section": section},
+            {"$set": {"data": data, "lastUpdated": datetime.utcnow()}},
+            upsert=True,
+        )
+        self.invalidate(section)
+
+    async def seed(self) -> None:
+        """Insert the built-in content for sections that are not in Mongo yet."""
+        now = datetime.utcnow()
+        await self.collection.bulk_write(
+            [
+                UpdateOne(
+                    {"section": section},
+                    {"$setOnInsert": {"section": section, "data": data, "lastUpdated": now}},
+                    upsert=True,
+                )
+                for section, data in self.defaults.items()
+            ],
+            ordered=False,
+        )
+
+    def start(self) -> None:
+        """Seed, warm the cache and start watching for edits in the background."""
+        if self.collection is None or self._task is not None:
+            return
+        self._lock = asyncio.Lock()
+        self._task = asyncio.create_task(self._watch())
+
+    async def stop(self) -> None:
+        for task in (self._task, self._refresh):
+            if task is not None and not task.done():
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+        self._task = None
+        self._refresh = None
+
+    def _schedule_refresh(self, names) -> None:
+        if self._refresh is None or self._refresh.done():
+            self._refresh = asyncio.ensure_future(self._load(names))
+
+    async def _load(self, names) -> None:
+        async with self._lock:
+            now = time.monotonic()
+            names = [
+                name for name in names
+                if name not in self._entries or self._entries[name].expires_at <= now
+            ]
+            if not names:
+                return
+
+            docs = {}
+            if self.collection is not None:
+                try:
+                    cursor = self.collection.find({"section": {"$in": names}}, {"_id": 0})
+                    docs = {doc["section"]: doc for doc in await cursor.to_list(len(names))}
+                except Exception as e:
+                    logger.warning("Portfolio sections unavailable, serving cached content: %s", e)
+                    # Keep what is cached (edits included) and retry soon; the
+                    # built-in content only stands in for sections never loaded
+                    for name in names:
+                        entry = self._entries.get(name)
+                        if entry is not None:
+                            entry.expires_at = now + self.retry_interval
+                        elif name in self.defaults:
+                            self._store(name, self.defaults[name], None, now + self.retry_interval)
+                    return
+
+            for name in names:
+                doc = docs.get(name)
+                if doc is not None:
+                    self._store(name, doc.get("data"), doc.get("lastUpdated"), now + self.ttl)
+                elif name in self.defaults:
+                    self._store(name, self.defaults[name], None, now + self.ttl)
+
+    def _store(self, name: str, data: Any, last_updated: Optional[datetime], expires_at: float) -> None:
+        entry = self._entries.get(name)
+        if entry is not None and entry.data == data:
+            # Unchanged content keeps the same object, so the payload is reused
+            entry.last_updated = last_updated
+            entry.expires_at = expires_at
+            return
+        self._entries[name] = _Entry(data, last_updated, expires_at)
+        self._entries.move_to_end(name)
+        while len(self._entries) > self.max_sections:
+            self._entries.popitem(last=False)
+        self._version += 1
+
+    async def _watch(self) -> None:
+        try:
+            await self.seed()
+            self.invalidate()
+            await self._load(SECTIONS)
+        except Exception as e:
+            logger.warning("Could not seed portfolio sections: %s", e)
+
+        try:
+            async with self.collection.watch(full_document="updateLookup") as stream:
+                self.mode = "change_stream"
+                async for change in stream:
+                    section = (change.get("fullDocument") or {}).get("section")
+                    self.invalidate(section)
+                    await self._load([section] if section else SECTIONS)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            # Standalone servers (and test stand-ins) have no change streams
+            logger.info("Change stream unavailable, polling lastUpdated instead: %s", e)
+
+        self.mode = "poll"
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            try:
+                cursor = self.collection.find({}, {"_id": 0, "section": 1, "lastUpdated": 1})
+                docs = await cursor.to_list(self.max_sections)
+            except Exception as e:
+                logger.warning("Error polling portfolio sections: %s", e)
+                continue
+            changed = []
+            for doc in docs:
+                section = doc.get("section")
+                entry = self._entries.get(section)
+                if entry is not None and entry.last_updated != doc.get("lastUpdated"):
+                    self.invalidate(section)
+                    changed.append(section)
+            if changed:
+                await self._load(changed)
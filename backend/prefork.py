@@ -0,0 +1,163 @@
+"""Pre-fork process manager running the API in several uvicorn workers.
+
+The parent imports the app, loads the portfolio from Mongo and builds its
+compressed variants once, closes its Mongo client and forks. Workers inherit
+the built payload copy-on-write (``gc.freeze()`` keeps the collector from
+dirtying those pages), open their own Mongo client and accept connections on
+the listening socket bound by the parent. Workers that die are restarted.
+
+With ``shared_memory_size`` set, workers also hand each other rebuilt payloads
+through a ``SharedPayloadSlot`` so only one of them compresses each edit.
+
+Fork is POSIX only. Under gunicorn (``--preload`` with uvicorn workers) call
+``server.after_fork()`` from a ``post_fork`` hook for the same effect.
+"""
+
+import asyncio
+import gc
+import logging
+import os
+import signal
+import socket
+import time
+from typing import Dict, Optional
+
+import uvicorn
+
+from metrics import memory_usage
+
+logger = logging.getLogger(__name__)
+
+RESTART_DELAY = 1.0
+
+
+def bind(host: str, port: int, backlog: int = 2048) -> socket.socket:
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    sock.set_inheritable(True)
+    return sock
+
+
+def _mib(value: int) -> float:
+    return round(value / (1024 * 1024), 1)
+
+
+async def _prebuild(server) -> int:
+    payload = await server.portfolio_store.warm()
+    payload.variants()
+    return len(payload.body)
+
+
+def _worker(server, index: int, sock: socket.socket, forked_at: float, access_log: bool) -> None:
+    for signum in (signal.SIGTERM, signal.SIGINT):
+        signal.signal(signum, signal.SIG_DFL)
+    server.after_fork()
+
+    async def report_startup():
+        usage = memory_usage()
+        logger.info(
+            "Worker %d (pid %d) ready in %.1f ms, RSS %.1f MiB, PSS %.1f MiB",
+            index,
+            os.getpid(),
+            (time.perf_counter() - forked_at) * 1000,
+            _mib(usage.get("rss_bytes", 0)),
+            _mib(usage.get("pss_bytes", 0)),
+            extra={"worker": index, "startup_ms": round((time.perf_counter() - forked_at) * 1000, 1), **usage},
+        )
+
+    # Runs after the app's own startup hooks (Mongo warm-up included)
+    server.app.router.on_startup.append(report_startup)
+    config = uvicorn.Config(server.app, log_config=None, access_log=access_log, lifespan="on")
+    uvicorn.Server(config).run(sockets=[sock])
+
+
+def serve(
+    host: str = "0.0.0.0",
+    port: int = 8001,
+    workers: int = 2,
+    shared_memory_size: int = 0,
+    access_log: bool = False,
+) -> None:
+    started = time.perf_counter()
+    import server
+
+    sock = bind(host, port)
+    slot = None
+    if shared_memory_size:
+        from shared_cache import SharedPayloadSlot
+
+        slot = server.portfolio_store.shared = SharedPayloadSlot(shared_memory_size)
+
+    body_size = asyncio.run(_prebuild(server))
+    # Sockets and driver threads must not be shared with the children
+    server.client.close()
+    gc.collect()
+    gc.freeze()
+    usage = memory_usage()
+    logger.info(
+        "Pre-fork startup took %.1f ms (portfolio payload %d bytes), parent RSS %.1f MiB",
+        (time.perf_counter() - started) * 1000,
+        body_size,
+        _mib(usage.get("rss_bytes", 0)),
+        extra={"startup_ms": round((time.perf_counter() - started) * 1000, 1), **usage},
+    )
+
+    children: Dict[int, int] = {}
+    stopping = False
+
+    def spawn(index: int) -> None:
+        forked_at = time.perf_counter()
+        pid = os.fork()
+        if pid == 0:
+            code = 0
+            try:
+                _worker(server, index, sock, forked_at, access_log)
+            except BaseException:
+                logger.exception("Worker %d crashed", index)
+                code = 1
+            finally:
+                # Skip the parent's atexit hooks (they would unlink the slot);
+                # just drain this worker's log queue
+                listener = getattr(server.log_handler, "listener", None)
+                if listener is not None:
+                    listener.stop()
+                os._exit(code)
+        children[pid] = index
+
+    def stop(signum, frame) -> None:
+        nonlocal stopping
+        stopping = True
+        for pid in list(children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+    logger.info("Serving on %s:%d with %d workers", host, port, workers)
+    for index in range(workers):
+        spawn(index)
+
+    try:
+        while children:
+            try:
+                pid, status = os.wait()
+            except ChildProcessError:
+                break
+            index: Optional[int] = children.pop(pid, None)
+            if index is None or stopping:
+                continue
+            logger.warning(
+                "Worker %d (pid %d) exited with status %d, restarting", index, pid, os.waitstatus_to_exitcode(status)
+            )
+            time.sleep(RESTART_DELAY)
+            if not stopping:
+                spawn(index)
+    finally:
+        sock.close()
+        if slot is not None:
+            slot.close()
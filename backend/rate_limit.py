@@ -0,0 +1,168 @@
+"""Token-bucket rate limiting keyed by client IP and route.
+
+``MemoryBackend`` keeps buckets in a fixed number of LRU-bounded shards and is
+enough for a single process. ``MongoBackend`` keeps them in a shared collection
+(one atomic ``find_one_and_update`` per check) so limits hold across workers.
+
+A request may cost more than one token (a bulk request costs one per item).
+It is let through as long as a token is left and charged in full, so the
+bucket can go into debt: the next requests wait until it is paid back, and the
+sustained rate holds however the work is batched.
+"""
+
+import logging
+import math
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Callable, Union
+
+from fastapi import HTTPException, Request
+from pymongo import ReturnDocument
+
+logger = logging.getLogger(__name__)
+
+PERIODS = {"second": 1, "minute": 60, "hour": 3600, "day": 86400}
+
+
+class RateLimit:
+    """``capacity`` requests in a burst, refilled at ``rate`` per second."""
+
+    __slots__ = ("capacity", "rate")
+
+    def __init__(self, capacity: float, rate: float):
+        self.capacity = capacity
+        self.rate = rate
+
+    @classmethod
+    def parse(cls, spec: str) -> "RateLimit":
+        """Parse ``"<count>/<second|minute|hour|day>"``, e.g. ``"5/minute"``."""
+        count, _, period = spec.partition("/")
+        try:
+            return cls(float(count), float(count) / PERIODS[period.strip()])
+        except (KeyError, ValueError):
+            raise ValueError(f"Invalid rate limit: {spec!r}")
+
+
+class MemoryBackend:
+    """Per-process buckets; memory is bounded by ``shards * max_keys_per_shard``."""
+
+    def __init__(self, shards: int = 16, max_keys_per_shard: int = 4096):
+        self._shards = [OrderedDict() for _ in range(shards)]
+        self.max_keys_per_shard = max_keys_per_shard
+
+    async def take(self, key: str, limit: RateLimit, cost: float = 1) -> float:
+        """Consume ``cost`` tokens; returns 0 if allowed, else seconds until one is available."""
+        shard = self._shards[hash(key) % len(self._shards)]
+        now = time.monotonic()
+        bucket = shard.get(key)
+        if bucket is None:
+            tokens = limit.capacity
+            bucket = shard[key] = [tokens, now]
+            if len(shard) > self.max_keys_per_shard:
+                # Forgetting the least recently seen client only refills its bucket
+                shard.popitem(last=False)
+        else:
+            tokens = min(limit.capacity, bucket[0] + (now - bucket[1]) * limit.rate)
+            shard.move_to_end(key)
+
+        if tokens >= 1:
+            bucket[0], bucket[1] = tokens - cost, now
+            return 0.0
+        bucket[0], bucket[1] = tokens, now
+        return (1 - tokens) / limit.rate
+
+
+class MongoBackend:
+    """Buckets shared by every worker through one collection.
+
+    Documents expire through a TTL index on ``expiresAt`` once the bucket would
+    be full again (see ``indexes.index_models``); only charged requests move it,
+    so a bucket in debt is not forgotten early.
+    """
+
+    def __init__(self, collection):
+        self.collection = collection
+
+    async def take(self, key: str, limit: RateLimit, cost: float = 1) -> float:
+        now = datetime.utcnow()
+        elapsed = {"$divide": [{"$subtract": [now, {"$ifNull": ["$updated", now]}]}, 1000]}
+        refilled = {
+            "$min": [
+                limit.capacity,
+                {"$add": [{"$ifNull": ["$tokens", limit.capacity]}, {"$multiply": [elapsed, limit.rate]}]},
+            ]
+        }
+        has_token = {"$gte": ["$tokens", 1]}
+        try:
+            doc = await self.collection.find_one_and_update(
+                {"_id": key},
+                [
+                    {"$set": {"tokens": refilled, "updated": now}},
+                    {
+                        "$set": {
+                            "allowed": has_token,
+                            "tokens": {"$cond": [has_token, {"$subtract": ["$tokens", cost]}, "$tokens"]},
+                            "expiresAt": {
+                                "$cond": [
+                                    has_token,
+                                    now + timedelta(seconds=(limit.capacity + cost) / limit.rate),
+                                    "$expiresAt",
+                                ]
+                            },
+                        }
+                    },
+                ],
+                projection={"tokens": 1, "allowed": 1},
+                upsert=True,
+                return_document=ReturnDocument.AFTER,
+            )
+        except Exception as e:
+            # Fail open: an unavailable limiter must not take the API down with it
+            logger.warning("Rate limit check failed for %s: %s", key, e)
+            return 0.0
+        if doc["allowed"]:
+            return 0.0
+        return (1 - doc["tokens"]) / limit.rate
+
+
+class RateLimiter:
+    def __init__(self, backend, enabled: bool = True, trust_forwarded: bool = False):
+        self.backend = backend
+        self.enabled = enabled
+        self.trust_forwarded = trust_forwarded
+
+    def client_ip(self, request: Request) -> str:
+        if self.trust_forwarded:
+            forwarded = request.headers.get("x-forwarded-for")
+            if forwarded:
+                return forwarded.split(",", 1)[0].strip()
+        return request.client.host if request.client else "unknown"
+
+    async def charge(self, request: Request, route: str, limit: RateLimit, cost: float = 1) -> None:
+        """Take ``cost`` tokens from the client's ``route`` bucket; raises 429 if it is empty."""
+        if not self.enabled:
+            return
+        retry_after = await self.backend.take(f"{route}:{self.client_ip(request)}", limit, cost)
+        if retry_after:
+            raise HTTPException(
+                status_code=429,
+                detail="Too many requests. Please try again later.",
+                headers={"Retry-After": str(math.ceil(retry_after))},
+            )
+
+    def limit(self, route: str, limit: RateLimit) -> Callable:
+        """A FastAPI dependency that rejects clients over ``limit`` with 429."""
+
+        async def check(request: Request) -> None:
+            await self.charge(request, route, limit)
+
+        return check
+
+
+def create_backend(name: str, collection) -> Union[MemoryBackend, MongoBackend]:
+    if name == "memory":
+        return MemoryBackend()
+    if name == "mongo":
+        return MongoBackend(collection)
+    raise ValueError(f"Unknown rate limit backend: {name!r}")
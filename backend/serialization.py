@@ -0,0 +1,50 @@
+"""Fast JSON encoding for responses built from trusted documents.
+
+Routes that return documents the app wrote itself (or that were validated on
+the way in) skip FastAPI's ``jsonable_encoder`` and ``response_model``
+re-validation and are encoded straight to bytes, with orjson when available.
+The output matches ``JSONResponse``: compact, UTF-8, naive datetimes in ISO
+8601.
+"""
+
+import json
+from datetime import datetime
+from typing import Any
+
+from starlette.responses import Response
+
+try:
+    import orjson
+except ImportError:  # orjson is optional; the stdlib encoder gives the same bytes
+    orjson = None
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+
+def dumps(data: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(data, default=_default)
+    return json.dumps(
+        data,
+        default=_default,
+        ensure_ascii=False,
+        allow_nan=False,
+        separators=(",", ":"),
+    ).encode("utf-8")
+
+
+def loads(data: bytes) -> Any:
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+class FastJSONResponse(Response):
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
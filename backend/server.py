@@ -1,22 +1,51 @@
-from fastapi import FastAPI, APIRouter, HTTPException
-from fastapi.responses import FileResponse
+from fastapi import FastAPI, APIRouter, Body, Depends, Header, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo.errors import OperationFailure
+import asyncio
 import os
 import logging
 from pathlib import Path
 from pydantic import BaseModel, Field, EmailStr
 from typing import List, Optional, Dict, Any
 import uuid
-from datetime import datetime
+from datetime import datetime, timedelta
 
-
-# Configure logging first
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+import analytics
+from compression import CompressionMiddleware
+from contact_search import (
+    CONTACT_FIELDS, CONTACT_PROJECTION, contact_filter, contact_projection, email_domain,
 )
+from contact_writer import BatchWriter, WriterOverloaded
+import health
+from http_cache import payload_response
+from idempotency import IdempotencyConflict, IdempotencyIndex, submission_keys
+from indexes import ensure_indexes, explain_hot_queries, index_models
+from load_shedding import AdaptiveLimiter, LoadSheddingMiddleware
+from logging_setup import setup_logging
+import metrics
+import notifications
+from metrics import MetricsMiddleware, MongoCommandMetrics, MongoPoolMetrics, RequestMetrics
+from pagination import KEYSET_SORT, InvalidCursor, encode_cursor, keyset_filter, naive_utc
+from portfolio_store import SECTIONS as PORTFOLIO_SECTIONS, PortfolioStore
+from rate_limit import MongoBackend, RateLimit, RateLimiter, create_backend
+from serialization import FastJSONResponse, dumps, loads
+from single_flight import SingleFlight
+from static_files import StaticFile, file_response
+from status_summary import status_summary_pipeline
+from streaming import csv_rows, ndjson_rows
+
+
+# Configure logging first: JSON lines written by a background thread
+def configure_logging():
+    return setup_logging(
+        level=os.environ.get('LOG_LEVEL', 'INFO'),
+        queue_size=int(os.environ.get('LOG_QUEUE_SIZE', 10000)),
+    )
+
+log_handler = configure_logging()
 logger = logging.getLogger(__name__)
 
 ROOT_DIR = Path(__file__).parent
@@ -24,9 +53,230 @@ load_dotenv(ROOT_DIR / '.env')
 
 # MongoDB connection
 mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
+mongo_metrics = MongoCommandMetrics()
+mongo_pool = MongoPoolMetrics()
+
+def _optional_ms(name: str) -> Optional[int]:
+    value = os.environ.get(name)
+    return int(value) if value else None
+
+def create_client() -> AsyncIOMotorClient:
+    return AsyncIOMotorClient(
+        mongo_url,
+        maxPoolSize=int(os.environ.get('MONGO_MAX_POOL_SIZE', 100)),
+        minPoolSize=int(os.environ.get('MONGO_MIN_POOL_SIZE', 0)),
+        maxIdleTimeMS=_optional_ms('MONGO_MAX_IDLE_TIME_MS'),
+        connectTimeoutMS=int(os.environ.get('MONGO_CONNECT_TIMEOUT_MS', 5000)),
+        serverSelectionTimeoutMS=int(os.environ.get('MONGO_SERVER_SELECTION_TIMEOUT_MS', 5000)),
+        waitQueueTimeoutMS=_optional_ms('MONGO_WAIT_QUEUE_TIMEOUT_MS'),
+        # Client-wide deadline for each operation (including retries), so a slow
+        # server fails requests quickly instead of piling them up
+        timeoutMS=_optional_ms('MONGO_TIMEOUT_MS'),
+        event_listeners=[mongo_metrics, mongo_pool],
+    )
+
+client = create_client()
 db = client[os.environ['DB_NAME']]
 
+# Portfolio sections live in Mongo behind an in-process cache
+portfolio_store = PortfolioStore(
+    db.portfolio_data,
+    ttl=float(os.environ.get('PORTFOLIO_CACHE_TTL', 300)),
+    max_sections=int(os.environ.get('PORTFOLIO_CACHE_MAX_SECTIONS', 64)),
+    poll_interval=float(os.environ.get('PORTFOLIO_POLL_INTERVAL', 30)),
+    retry_interval=float(os.environ.get('PORTFOLIO_RETRY_INTERVAL', 5)),
+)
+
+# Resume metadata (and bytes, with compressed variants) are kept until the file changes
+resume_file = StaticFile(
+    ROOT_DIR / "static" / "Pavitra_Byali_Resume.pdf",
+    "application/pdf",
+    check_interval=float(os.environ.get('RESUME_CHECK_INTERVAL', 1)),
+)
+RESUME_CACHE_CONTROL = os.environ.get('RESUME_CACHE_CONTROL', 'public, max-age=300')
+
+# Contact submissions are coalesced into insert_many batches
+contact_writer = BatchWriter(
+    db.contacts,
+    max_batch=int(os.environ.get('CONTACT_BATCH_SIZE', 100)),
+    max_delay=float(os.environ.get('CONTACT_BATCH_DELAY_MS', 5)) / 1000,
+    max_queue=int(os.environ.get('CONTACT_QUEUE_SIZE', 1000)),
+    enqueue_timeout=float(os.environ.get('CONTACT_ENQUEUE_TIMEOUT', 5)),
+    journal=os.environ.get('CONTACT_WRITE_JOURNAL', 'true').lower() == 'true',
+)
+
+# Token buckets per client IP and route; the mongo backend shares them across workers
+rate_limiter = RateLimiter(
+    create_backend(os.environ.get('RATE_LIMIT_BACKEND', 'memory'), db.rate_limits),
+    enabled=os.environ.get('RATE_LIMIT_ENABLED', 'true').lower() == 'true',
+    trust_forwarded=os.environ.get('RATE_LIMIT_TRUST_FORWARDED', 'false').lower() == 'true',
+)
+CONTACT_RATE_LIMIT = RateLimit.parse(os.environ.get('CONTACT_RATE_LIMIT', '5/minute'))
+STATUS_RATE_LIMIT = RateLimit.parse(os.environ.get('STATUS_RATE_LIMIT', '120/minute'))
+
+# New contacts are announced by a background outbox worker, never on the
+# request path; NOTIFY_TRANSPORT is smtp, log or none (no notifications)
+notification_transport = notifications.create_transport(
+    os.environ.get('NOTIFY_TRANSPORT', 'none'),
+    host=os.environ.get('SMTP_HOST', 'localhost'),
+    port=int(os.environ.get('SMTP_PORT', 25)),
+    sender=os.environ.get('NOTIFY_FROM', 'portfolio@localhost'),
+    recipient=os.environ.get('NOTIFY_TO', 'portfolio@localhost'),
+    username=os.environ.get('SMTP_USERNAME'),
+    password=os.environ.get('SMTP_PASSWORD'),
+    starttls=os.environ.get('SMTP_STARTTLS', 'false').lower() == 'true',
+)
+notification_worker = notifications.NotificationWorker(
+    db.contacts,
+    notification_transport,
+    batch_size=int(os.environ.get('NOTIFY_BATCH_SIZE', 20)),
+    poll_interval=float(os.environ.get('NOTIFY_POLL_INTERVAL', 5)),
+    lease=float(os.environ.get('NOTIFY_LEASE', 60)),
+    max_attempts=int(os.environ.get('NOTIFY_MAX_ATTEMPTS', 5)),
+    base_delay=float(os.environ.get('NOTIFY_RETRY_DELAY', 30)),
+)
+
+# Analytics events are buffered in memory and flushed as per-minute counters
+analytics_collector = analytics.EventCollector(
+    db.analytics_rollups,
+    capacity=int(os.environ.get('ANALYTICS_BUFFER_SIZE', 10000)),
+    flush_interval=float(os.environ.get('ANALYTICS_FLUSH_INTERVAL', 1)),
+)
+
+# Mongo's error code for a $text query without a text index
+INDEX_NOT_FOUND = 27
+
+# Largest accepted /status/bulk body, and the default /status/summary window
+STATUS_BULK_MAX = int(os.environ.get('STATUS_BULK_MAX', 1000))
+STATUS_SUMMARY_WINDOW_HOURS = float(os.environ.get('STATUS_SUMMARY_WINDOW_HOURS', 24))
+
+# Optional expiry for old status checks (TTL index on status_checks.timestamp)
+STATUS_CHECK_TTL_DAYS = float(os.environ.get('STATUS_CHECK_TTL_DAYS', 0))
+
+# Recently seen contact submissions, for suppressing double submits and retries
+CONTACT_DEDUP_WINDOW = float(os.environ.get('CONTACT_DEDUP_WINDOW', 600))
+contact_dedup = IdempotencyIndex(
+    max_keys=int(os.environ.get('CONTACT_DEDUP_MAX_KEYS', 10000)),
+    ttl=CONTACT_DEDUP_WINDOW,
+)
+
+# Concurrent identical /contacts and /status reads share one query and body;
+# READ_CACHE_TTL (seconds) optionally keeps the result for a little longer
+READ_CACHE_TTL = float(os.environ.get('READ_CACHE_TTL', 0))
+contact_reads = SingleFlight(ttl=READ_CACHE_TTL)
+status_reads = SingleFlight(ttl=READ_CACHE_TTL)
+
+# Documents moved out of Mongo by ``manage.py archive`` (monthly Parquet files)
+ARCHIVE_DIR = Path(os.environ.get('ARCHIVE_DIR', ROOT_DIR / 'archive'))
+archive_reader = None
+
+def read_archive(name: str, *args) -> List[Dict[str, Any]]:
+    """ArchiveReader.read; pandas and pyarrow are only imported by the first archive query"""
+    global archive_reader
+    if archive_reader is None:
+        from archive import ArchiveReader
+        archive_reader = ArchiveReader(ARCHIVE_DIR)
+    return archive_reader.read(name, *args)
+
+CONTACT_EXPORT_FIELDS = CONTACT_FIELDS
+EXPORT_BATCH_SIZE = int(os.environ.get('EXPORT_BATCH_SIZE', 1000))
+
+# Requests in flight are limited per route class, with limits that adapt to
+# the observed latency; requests that cannot get a slot in time get a 503
+LOAD_SHEDDING_ENABLED = os.environ.get('LOAD_SHEDDING_ENABLED', 'true').lower() == 'true'
+
+def _route_limiter(route_class: str, initial: int, max_limit: int, target_ms: float) -> AdaptiveLimiter:
+    prefix = f'LOAD_SHEDDING_{route_class.upper()}_'
+    return AdaptiveLimiter(
+        initial=int(os.environ.get(prefix + 'INITIAL', initial)),
+        min_limit=int(os.environ.get(prefix + 'MIN', 1)),
+        max_limit=int(os.environ.get(prefix + 'MAX', max_limit)),
+        target_latency=float(os.environ.get(prefix + 'TARGET_MS', target_ms)) / 1000,
+        queue_size=int(os.environ.get('LOAD_SHEDDING_QUEUE_SIZE', 100)),
+        queue_timeout=float(os.environ.get('LOAD_SHEDDING_QUEUE_TIMEOUT_MS', 500)) / 1000,
+    )
+
+route_limiters = {
+    # Served from memory: only shed if the process itself is saturated
+    "cached": _route_limiter("cached", 500, 2000, 50),
+    "mongo_read": _route_limiter("mongo_read", 50, 200, 250),
+    "mongo_write": _route_limiter("mongo_write", 50, 200, 500),
+    # Exports and archive reads are long-running by nature, so a fixed limit
+    # rather than a latency target
+    "export": AdaptiveLimiter(initial=4, min_limit=4, max_limit=4, target_latency=float("inf"), queue_size=0),
+}
+
+def route_class(method: str, path: str) -> Optional[str]:
+    """Load-shedding class of a request; None (probes, metrics, CORS preflights) is never limited"""
+    if method == "OPTIONS" or path == "/metrics" or path.startswith("/api/health/"):
+        return None
+    if path == "/api/contacts/export" or path.startswith("/api/archive/"):
+        return "export"
+    if path.startswith(("/api/portfolio", "/api/resume/")) or path == "/api/analytics/contact-view" or path == "/api/":
+        return "cached"
+    if method in ("GET", "HEAD"):
+        return "mongo_read"
+    return "mongo_write"
+
+# Startup pings the pool (opening connections) and the readiness probe pings
+# it again; both give up after their deadline
+MONGO_WARMUP_CONNECTIONS = int(os.environ.get('MONGO_WARMUP_CONNECTIONS', 4))
+MONGO_STARTUP_TIMEOUT = float(os.environ.get('MONGO_STARTUP_TIMEOUT', 10))
+MONGO_REQUIRED_AT_STARTUP = os.environ.get('MONGO_REQUIRED_AT_STARTUP', 'false').lower() == 'true'
+HEALTH_CHECK_TIMEOUT = float(os.environ.get('HEALTH_CHECK_TIMEOUT', 1))
+
+# Collections whose indexes failed to build are retried after INDEX_RETRY_INTERVAL
+# seconds, doubling up to INDEX_RETRY_MAX_INTERVAL
+INDEX_RETRY_INTERVAL = float(os.environ.get('INDEX_RETRY_INTERVAL', 5))
+INDEX_RETRY_MAX_INTERVAL = float(os.environ.get('INDEX_RETRY_MAX_INTERVAL', 300))
+
+index_task: Optional[asyncio.Task] = None
+# Collections still without their declared indexes, reported by the readiness probe
+indexes_missing: List[str] = sorted(index_models())
+
+
+def status_ttl_seconds() -> Optional[int]:
+    return int(STATUS_CHECK_TTL_DAYS * 86400) or None
+
+async def build_indexes() -> None:
+    """ensure_indexes until every collection has its indexes"""
+    global indexes_missing
+    indexes_missing = sorted(index_models())
+    delay = INDEX_RETRY_INTERVAL
+    while True:
+        created = await ensure_indexes(db, status_ttl_seconds())
+        indexes_missing = [name for name in indexes_missing if name not in created]
+        if not indexes_missing:
+            return
+        logger.warning("Indexes missing on %s; retrying in %ss", ", ".join(indexes_missing), delay)
+        await asyncio.sleep(delay)
+        delay = min(delay * 2, INDEX_RETRY_MAX_INTERVAL)
+
+def use_database(database) -> None:
+    """Point the app and its workers at another database (e.g. an in-memory stand-in)"""
+    global db
+    db = database
+    portfolio_store.collection = database.portfolio_data
+    contact_writer.collection = database.contacts
+    notification_worker.collection = database.contacts
+    analytics_collector.collection = database.analytics_rollups
+    if isinstance(rate_limiter.backend, MongoBackend):
+        rate_limiter.backend.collection = database.rate_limits
+
+def after_fork() -> None:
+    """Per-worker setup for pre-forked workers (see prefork.py)
+
+    Threads and sockets don't survive fork, so the logging thread and the
+    Mongo client are recreated; everything cached before the fork is kept.
+    """
+    global client, log_handler, mongo_metrics, mongo_pool
+    log_handler = configure_logging()
+    # Fresh listeners too: a driver thread may have held their locks at fork
+    mongo_metrics = MongoCommandMetrics()
+    mongo_pool = MongoPoolMetrics()
+    client = create_client()
+    use_database(client[os.environ['DB_NAME']])
+
 # Create the main app without a prefix
 app = FastAPI()
 
@@ -80,23 +330,82 @@ class PortfolioData(BaseModel):
 async def root():
     return {"message": "Hello World"}
 
-@api_router.post("/status", response_model=StatusCheck)
+@api_router.post(
+    "/status",
+    response_model=StatusCheck,
+    dependencies=[Depends(rate_limiter.limit("status", STATUS_RATE_LIMIT))],
+)
 async def create_status_check(input: StatusCheckCreate):
-    status_dict = input.dict()
-    status_obj = StatusCheck(**status_dict)
-    _ = await db.status_checks.insert_one(status_obj.dict())
-    return status_obj
+    # The body was validated on the way in; build the document directly
+    # rather than round-tripping it through StatusCheck
+    status_check = {"id": str(uuid.uuid4()), "client_name": input.client_name, "timestamp": datetime.utcnow()}
+    # insert_one adds an _id to the dict it is given
+    await db.status_checks.insert_one(dict(status_check))
+    status_reads.invalidate()
+    return FastJSONResponse(status_check)
+
+@api_router.post("/status/bulk", response_model=List[StatusCheck])
+async def create_status_checks(
+    request: Request,
+    checks: List[StatusCheckCreate] = Body(..., min_length=1, max_length=STATUS_BULK_MAX),
+):
+    """Record several status checks with a single insert_many"""
+    # Same bucket as /status, charged per check so batching is no way around it
+    await rate_limiter.charge(request, "status", STATUS_RATE_LIMIT, cost=len(checks))
+    now = datetime.utcnow()
+    status_checks = [{"id": str(uuid.uuid4()), "client_name": check.client_name, "timestamp": now} for check in checks]
+    await db.status_checks.insert_many([dict(check) for check in status_checks], ordered=False)
+    status_reads.invalidate()
+    return FastJSONResponse(status_checks)
+
+@api_router.get("/status/summary")
+async def get_status_summary(since: Optional[datetime] = None, until: Optional[datetime] = None):
+    """Check counts and first/last-seen times per client_name in ``[since, until)``
+
+    The window defaults to the STATUS_SUMMARY_WINDOW_HOURS before now.
+    """
+    until = naive_utc(until) if until else datetime.utcnow()
+    since = naive_utc(since) if since else until - timedelta(hours=STATUS_SUMMARY_WINDOW_HOURS)
+    if since >= until:
+        raise HTTPException(status_code=400, detail="since must be before until")
+    clients = await db.status_checks.aggregate(status_summary_pipeline(since, until)).to_list(None)
+    return FastJSONResponse({"since": since, "until": until, "clients": clients})
 
 @api_router.get("/status", response_model=List[StatusCheck])
 async def get_status_checks():
-    status_checks = await db.status_checks.find().to_list(1000)
-    return [StatusCheck(**status_check) for status_check in status_checks]
+    # Documents are only ever written by create_status_check, so they are
+    # serialized as stored instead of being re-validated
+    async def read():
+        status_checks = await db.status_checks.find({}, {"_id": 0}).sort("timestamp", -1).to_list(1000)
+        return dumps(status_checks)
+
+    # Concurrent requests share one query and one encoded body
+    return Response(content=await status_reads.do("all", read), media_type="application/json")
 
 # Portfolio API Endpoints
-@api_router.post("/contact", response_model=ContactResponse)
-async def submit_contact_form(contact: ContactSubmission):
-    """Handle contact form submissions"""
+@api_router.post(
+    "/contact",
+    response_model=ContactResponse,
+    dependencies=[Depends(rate_limiter.limit("contact", CONTACT_RATE_LIMIT))],
+)
+async def submit_contact_form(
+    contact: ContactSubmission,
+    response: Response,
+    idempotency_key: Optional[str] = Header(None, max_length=255),
+):
+    """Handle contact form submissions
+
+    Resubmissions with the same Idempotency-Key (or, without one, the same
+    content within CONTACT_DEDUP_WINDOW seconds) get the original response
+    and are not stored again. Reusing an Idempotency-Key for different
+    content is rejected with 422.
+    """
     try:
+        cache_key, dedup_key, dedup_hash = submission_keys(
+            idempotency_key,
+            (contact.name, contact.email, contact.subject, contact.message),
+            CONTACT_DEDUP_WINDOW,
+        )
         # Create contact record with metadata
         contact_record = {
             "id": str(uuid.uuid4()),
@@ -105,151 +414,93 @@ async def submit_contact_form(contact: ContactSubmission):
             "subject": contact.subject,
             "message": contact.message,
             "timestamp": datetime.utcnow(),
-            "status": "new"
+            "status": "new",
+            "emailDomain": email_domain(contact.email),
+            "dedupKey": dedup_key,
+            "dedupHash": dedup_hash,
         }
+
+        async def stored_hash():
+            # Stored by another worker or before a restart
+            stored = await db.contacts.find_one({"dedupKey": dedup_key}, {"_id": 0, "dedupHash": 1})
+            return stored.get("dedupHash") if stored else None
         
-        # Store in database
-        result = await db.contacts.insert_one(contact_record)
+        # Store in database; returns once the batch holding it is written
+        replayed = await contact_dedup.run_once(
+            cache_key, lambda: contact_writer.submit(contact_record), dedup_hash, stored_hash,
+        )
         
-        if result.inserted_id:
-            logger.info(f"Contact form submitted by {contact.name} ({contact.email})")
-            return ContactResponse(
-                success=True,
-                message="Thank you for your message! I'll get back to you soon."
-            )
+        contact_reads.invalidate()
+        # Only an in-memory signal; the worker finds the record in Mongo
+        notification_worker.wake()
+        if replayed:
+            response.headers["Idempotent-Replayed"] = "true"
+            logger.info("Duplicate contact form submission by %s ignored", contact.email)
         else:
-            raise HTTPException(status_code=500, detail="Failed to save contact form")
+            logger.info("Contact form submitted by %s (%s)", contact.name, contact.email, extra={"contact_id": contact_record["id"]})
+        return ContactResponse(
+            success=True,
+            message="Thank you for your message! I'll get back to you soon."
+        )
             
+    except IdempotencyConflict:
+        logger.warning("Idempotency-Key reused for a different contact submission by %s", contact.email)
+        raise HTTPException(
+            status_code=422, detail="Idempotency-Key was already used for a different submission",
+        )
+    except WriterOverloaded as e:
+        logger.error("Contact queue overloaded: %s", e)
+        raise HTTPException(status_code=503, detail="Too many submissions right now. Please try again shortly.")
     except Exception as e:
-        logger.error(f"Error submitting contact form: {str(e)}")
+        logger.error("Error submitting contact form: %s", e)
         raise HTTPException(status_code=500, detail="Internal server error")
 
 @api_router.get("/portfolio")
-async def get_portfolio_data():
-    """Get dynamic portfolio data"""
+async def get_portfolio_data(request: Request, sections: Optional[str] = None):
+    """Get dynamic portfolio data
+
+    ``sections`` (comma-separated, e.g. ``projects,certifications``) limits the
+    response to those sections; each combination has its own ETag.
+    """
+    if sections is not None:
+        names = [name.strip() for name in sections.split(",") if name.strip()]
+        unknown = sorted(set(names) - set(PORTFOLIO_SECTIONS))
+        if unknown or not names:
+            raise HTTPException(status_code=400, detail=f"Unknown sections: {', '.join(unknown) or sections!r}")
     try:
-        # Portfolio data (this could be stored in database for dynamic updates)
-        portfolio_data = {
-            "personalInfo": {
-                "name": "Pavitra D B",
-                "displayName": "Pavitra Byali",
-                "title": "AI/ML Engineering Student",
-                "tagline": "Code. Build. Inspire.",
-                "location": "Bengaluru, Karnataka, India",
-                "email": "pavitrabyali6@gmail.com",
-                "phone": "+91 74831 45071",
-                "linkedin": "https://www.linkedin.com/in/pavitra-byali-763b57301",
-                "github": "https://github.com/pavitra-d-byali",
-                "bio": "I'm Pavitra Byali, a B.Tech CSE (AI & ML) student at Alliance University, Bengaluru. I'm passionate about artificial intelligence, data science, and building impactful tech solutions for real-world problems.",
-                "careerGoals": {
-                    "targetRole": "AI/ML Engineer",
-                    "interestAreas": ["Artificial Intelligence", "Data Science", "Full-Stack Development", "Cloud Computing"]
-                }
-            },
-            "technicalSkills": {
-                "languages": ["C", "C++", "Python", "SQL", "HTML", "CSS", "JavaScript", "TypeScript", "Java", "PHP", "Bash"],
-                "frontend": ["HTML5", "CSS3", "JavaScript", "Bootstrap", "Tailwind CSS", "React.js"],
-                "backend": ["Node.js", "Express.js", "Flask", "RESTful APIs"],
-                "frameworks": ["NumPy", "Pandas", "Matplotlib", "Scikit-learn", "Express.js"],
-                "databases": ["MySQL", "MongoDB", "PostgreSQL"],
-                "cloudDevOps": ["AWS (EC2, S3)", "Docker", "GitHub Actions"],
-                "tools": ["Git", "GitHub", "VS Code", "Jupyter Notebook"],
-                "deployment": ["GitHub Pages", "Google Colab"],
-                "others": ["Responsive Web Design", "API Integration", "Data Visualization"]
-            },
-            "certifications": [
-                {
-                    "id": 1,
-                    "title": "C++ Specialization",
-                    "provider": "Coursera",
-                    "date": "October 2024",
-                    "status": "Completed"
-                },
-                {
-                    "id": 2,
-                    "title": "Python for Data Science",
-                    "provider": "Coursera",
-                    "date": "2024",
-                    "status": "Completed"
-                }
-            ],
-            "projects": [
-                {
-                    "id": 1,
-                    "title": "Advanced E-commerce Platform",
-                    "description": "Full-stack e-commerce app with secure login, payment, admin dashboard, and product management.",
-                    "technologies": ["React.js", "Vite", "Tailwind CSS", "Express.js", "Node.js", "MongoDB", "JWT", "Stripe API"],
-                    "github": "https://github.com/pavitra-d-byali/advanced-ecommerce-platform",
-                    "features": [
-                        "Secure user authentication with JWT",
-                        "Payment integration with Stripe API",
-                        "Admin dashboard for product management",
-                        "Responsive design with Tailwind CSS",
-                        "Real-time inventory tracking"
-                    ],
-                    "status": "Completed"
-                },
-                {
-                    "id": 2,
-                    "title": "Real-time Collaborative Project Management Tool",
-                    "description": "Web app for task and team management with live collaboration and notifications.",
-                    "technologies": ["Next.js", "Express.js", "MongoDB", "Socket.IO", "Redis", "AWS", "Docker"],
-                    "github": "https://github.com/pavitra-d-byali/project-management-tool",
-                    "features": [
-                        "Drag-and-drop Kanban board",
-                        "Live chat and notifications",
-                        "Optimistic UI updates",
-                        "Role-based access control",
-                        "Real-time collaboration"
-                    ],
-                    "status": "In Progress"
-                }
-            ],
-            "socialLinks": [
-                {
-                    "name": "GitHub",
-                    "url": "https://github.com/pavitra-d-byali",
-                    "icon": "github"
-                },
-                {
-                    "name": "LinkedIn",
-                    "url": "https://www.linkedin.com/in/pavitra-byali-763b57301",
-                    "icon": "linkedin"
-                },
-                {
-                    "name": "Email",
-                    "url": "mailto:pavitrabyali6@gmail.com",
-                    "icon": "mail"
-                }
-            ],
-            "navigation": [
-                {"name": "Home", "href": "#home"},
-                {"name": "About", "href": "#about"},
-                {"name": "Skills", "href": "#skills"},
-                {"name": "Projects", "href": "#projects"},
-                {"name": "Certifications", "href": "#certifications"},
-                {"name": "Contact", "href": "#contact"}
-            ]
-        }
-        
-        return portfolio_data
+        if sections is not None:
+            return payload_response(request, await portfolio_store.get_subset_payload(names))
+        return payload_response(request, await portfolio_store.get_payload())
         
     except Exception as e:
-        logger.error(f"Error fetching portfolio data: {str(e)}")
+        logger.error("Error fetching portfolio data: %s", e)
         raise HTTPException(status_code=500, detail="Internal server error")
 
+@api_router.get("/portfolio/{section}")
+async def get_portfolio_section(request: Request, section: str):
+    """Get one portfolio section (e.g. ``/portfolio/projects``), cached and ETagged on its own"""
+    try:
+        payload = await portfolio_store.get_section_payload(section)
+    except Exception as e:
+        logger.error("Error fetching portfolio section %s: %s", section, e)
+        raise HTTPException(status_code=500, detail="Internal server error")
+    if payload is None:
+        raise HTTPException(status_code=404, detail=f"Unknown section: {section}")
+    return payload_response(request, payload)
+
 @api_router.get("/resume/download")
-async def download_resume():
+async def download_resume(request: Request):
     """Download resume PDF file"""
     try:
         # Path to resume file (you can upload a resume.pdf to this location)
-        resume_path = Path(ROOT_DIR) / "static" / "Pavitra_Byali_Resume.pdf"
+        resume = resume_file.get()
         
-        if resume_path.exists():
-            return FileResponse(
-                path=resume_path,
-                filename="Pavitra_Byali_Resume.pdf",
-                media_type="application/pdf"
+        if resume is not None:
+            return file_response(
+                request,
+                resume,
+                cache_control=RESUME_CACHE_CONTROL,
+                headers={"Content-Disposition": 'attachment; filename="Pavitra_Byali_Resume.pdf"'},
             )
         else:
             raise HTTPException(
@@ -261,41 +512,257 @@ async def download_resume():
         # Re-raise HTTPExceptions as-is
         raise
     except Exception as e:
-        logger.error(f"Error downloading resume: {str(e)}")
+        logger.error("Error downloading resume: %s", e)
         raise HTTPException(status_code=500, detail="Internal server error")
 
 @api_router.get("/contacts")
-async def get_all_contacts():
-    """Get all contact form submissions (admin endpoint)"""
+async def get_all_contacts(
+    limit: int = Query(1000, ge=1, le=1000),
+    cursor: Optional[str] = None,
+    status: Optional[str] = Query(None, max_length=50),
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    domain: Optional[str] = Query(None, alias="email_domain", max_length=253),
+    q: Optional[str] = Query(None, max_length=200),
+    fields: Optional[str] = None,
+):
+    """Get contact form submissions, newest first (admin endpoint)
+
+    Optionally filtered by status, a ``[since, until)`` timestamp range, email
+    domain and a text search (``q``) over subject and message. ``fields`` is a
+    comma-separated list of fields to return (id and timestamp are always
+    included). Pages are keyed on (timestamp, id); when more remain, the cursor
+    for the next page is returned in the ``X-Next-Cursor`` header.
+    """
     try:
-        contacts = await db.contacts.find().sort("timestamp", -1).to_list(1000)
-        
-        # Convert MongoDB documents to JSON-serializable format
-        serialized_contacts = []
-        for contact in contacts:
-            # Remove MongoDB's _id field and keep our custom id
-            if '_id' in contact:
-                del contact['_id']
-            serialized_contacts.append(contact)
-        
-        return serialized_contacts
+        projection = contact_projection(fields.split(",") if fields else None)
+        query = keyset_filter(cursor, contact_filter(status, since, until, domain, q))
+    except (InvalidCursor, ValueError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    async def read():
+        # Filtering, sorting and projection all happen in Mongo
+        contacts = await db.contacts.find(query, projection).sort(KEYSET_SORT).limit(limit).to_list(limit)
+        next_cursor = encode_cursor(contacts[-1]) if len(contacts) == limit else None
+        return dumps(contacts), next_cursor
+
+    # Identical concurrent reads share one query and body; the key is the
+    # normalized filter Mongo sees, so equivalent parameters coalesce too
+    key = (limit, repr(query), tuple(projection.items()))
+    try:
+        body, next_cursor = await contact_reads.do(key, read)
+        headers = {"X-Next-Cursor": next_cursor} if next_cursor else {}
+        return Response(content=body, media_type="application/json", headers=headers)
+    except OperationFailure as e:
+        if "$text" not in query:
+            logger.error("Error fetching contacts: %s", e)
+            raise HTTPException(status_code=500, detail="Internal server error")
+        if e.code == INDEX_NOT_FOUND:
+            # The text index is built in the background at startup
+            raise HTTPException(status_code=503, detail="Text search is not available yet", headers={"Retry-After": "30"})
+        raise HTTPException(status_code=400, detail="Invalid text search")
     except Exception as e:
-        logger.error(f"Error fetching contacts: {str(e)}")
+        logger.error("Error fetching contacts: %s", e)
         raise HTTPException(status_code=500, detail="Internal server error")
 
+@api_router.get("/contacts/export")
+async def export_contacts(format: str = Query("ndjson", pattern="^(ndjson|csv)$")):
+    """Stream every contact submission as NDJSON or CSV (admin endpoint)"""
+    cursor = db.contacts.find({}, CONTACT_PROJECTION).sort(KEYSET_SORT).batch_size(EXPORT_BATCH_SIZE)
+    if format == "csv":
+        return StreamingResponse(
+            csv_rows(cursor, CONTACT_EXPORT_FIELDS),
+            media_type="text/csv",
+            headers={"Content-Disposition": 'attachment; filename="contacts.csv"'},
+        )
+    return StreamingResponse(ndjson_rows(cursor), media_type="application/x-ndjson")
+
+@api_router.get("/archive/contacts")
+async def get_archived_contacts(
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    status: Optional[str] = Query(None, max_length=50),
+    limit: int = Query(1000, ge=1, le=1000),
+):
+    """Archived contact submissions in ``[since, until)``, newest first (admin endpoint)
+
+    Only the monthly archive files overlapping the range are read.
+    """
+    equals = {"status": status} if status else None
+    contacts = await asyncio.to_thread(
+        read_archive, "contacts", naive_utc(since) if since else None, naive_utc(until) if until else None,
+        equals, limit,
+    )
+    return FastJSONResponse(contacts)
+
+@api_router.get("/archive/status")
+async def get_archived_status_checks(
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    client_name: Optional[str] = None,
+    limit: int = Query(1000, ge=1, le=1000),
+):
+    """Archived status checks in ``[since, until)``, newest first"""
+    equals = {"client_name": client_name} if client_name else None
+    status_checks = await asyncio.to_thread(
+        read_archive, "status_checks", naive_utc(since) if since else None,
+        naive_utc(until) if until else None, equals, limit,
+    )
+    return FastJSONResponse(status_checks)
+
+@api_router.get("/contacts/ingest-stats")
+async def get_contact_ingest_stats():
+    """Batch size and queue depth of the contact write-behind queue (admin endpoint)"""
+    return contact_writer.metrics()
+
+@api_router.get("/admin/query-plans")
+async def get_query_plans(verbosity: str = Query("queryPlanner", pattern="^(queryPlanner|executionStats)$")):
+    """Explain plans of the hot queries, to spot collection scans and in-memory sorts (admin endpoint)"""
+    return await explain_hot_queries(db, verbosity)
+
+@api_router.post("/analytics/contact-view", status_code=202)
+async def record_contact_view(request: Request):
+    """Count a portfolio visit or contact form interaction
+
+    The optional JSON body names the section and event, e.g.
+    ``{"section": "contact", "event": "view"}`` (the default). Events are only
+    buffered here; they reach Mongo as per-minute counters.
+    """
+    body = await request.body()
+    try:
+        event = loads(body) if body else {}
+        section = event.get("section", "contact")
+        kind = event.get("event", "view")
+    except (ValueError, AttributeError):
+        raise HTTPException(status_code=400, detail="Body must be a JSON object")
+    if not isinstance(section, str) or not isinstance(kind, str):
+        raise HTTPException(status_code=400, detail="section and event must be strings")
+    if section not in analytics.SECTIONS or kind not in analytics.EVENTS:
+        raise HTTPException(status_code=400, detail="Unknown section or event")
+    analytics_collector.record(section, kind)
+    return Response(status_code=202)
+
+@api_router.get("/analytics/summary")
+async def get_analytics_summary(
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    section: Optional[str] = None,
+    event: Optional[str] = None,
+):
+    """Event counts per section and event in ``[since, until)``, from the per-minute rollups (admin endpoint)
+
+    The window defaults to the last 24 hours.
+    """
+    until = naive_utc(until) if until else datetime.utcnow()
+    since = naive_utc(since) if since else until - timedelta(hours=24)
+    if since >= until:
+        raise HTTPException(status_code=400, detail="since must be before until")
+    totals = await db.analytics_rollups.aggregate(analytics.rollup_pipeline(since, until, section, event)).to_list(None)
+    return FastJSONResponse({"since": since, "until": until, "totals": totals})
+
+@api_router.get("/health/live")
+async def liveness():
+    """Liveness probe: the process is up and serving requests"""
+    return {"status": "alive"}
+
+@api_router.get("/health/ready")
+async def readiness():
+    """Readiness probe: Mongo answers a ping within HEALTH_CHECK_TIMEOUT
+
+    Collections still missing their indexes (being built, or failed and
+    waiting for a retry) are listed but do not fail the probe.
+    """
+    mongo = await health.ping(db, HEALTH_CHECK_TIMEOUT)
+    body = {
+        "status": "ready" if mongo["ok"] else "unavailable",
+        "mongo": mongo,
+        "indexesMissing": indexes_missing,
+        "pool": mongo_pool.stats(),
+        "contactQueueDepth": contact_writer.metrics()["queue_depth"],
+    }
+    return FastJSONResponse(body, status_code=200 if mongo["ok"] else 503)
+
+request_metrics = RequestMetrics()
+
+@app.get("/metrics", include_in_schema=False)
+async def get_metrics():
+    """Prometheus scrape endpoint"""
+    def contact_writer_metrics(lines):
+        metrics.render_stats("contact_writer", contact_writer.metrics(), lines, contact_writer.COUNTERS)
+        lines.append("# TYPE contact_writer_batch_size histogram")
+        contact_writer.batch_sizes.render("contact_writer_batch_size", "", lines)
+
+    def notification_metrics(lines):
+        metrics.render_stats(
+            "contact_notifications", notification_worker.metrics(), lines, notification_worker.COUNTERS
+        )
+        lines.append("# TYPE contact_notification_lag_seconds histogram")
+        notification_worker.lag.render("contact_notification_lag_seconds", "", lines)
+
+    def analytics_metrics(lines):
+        metrics.render_stats("analytics", analytics_collector.metrics(), lines, analytics_collector.COUNTERS)
+
+    def read_coalescing_metrics(lines):
+        metrics.render_stats("contact_reads", contact_reads.metrics(), lines, contact_reads.COUNTERS)
+        metrics.render_stats("status_reads", status_reads.metrics(), lines, status_reads.COUNTERS)
+
+    def load_shedding_metrics(lines):
+        for name, limiter in route_limiters.items():
+            metrics.render_stats(f"load_shedding_{name}", limiter.metrics(), lines, limiter.COUNTERS)
+
+    def process_metrics(lines):
+        metrics.render_stats("process", metrics.memory_usage(), lines)
+
+    body = metrics.render([
+        request_metrics.render, mongo_metrics.render, mongo_pool.render, contact_writer_metrics, log_handler.render,
+        notification_metrics, analytics_metrics, read_coalescing_metrics, load_shedding_metrics,
+        process_metrics,
+    ])
+    return Response(content=body, media_type=metrics.CONTENT_TYPE)
+
 # Include the router in the main app
 app.include_router(api_router)
 
+app.add_middleware(LoadSheddingMiddleware, classify=route_class, limiters=route_limiters, enabled=LOAD_SHEDDING_ENABLED)
+
+app.add_middleware(CompressionMiddleware, minimum_size=500)
+
 app.add_middleware(
     CORSMiddleware,
     allow_credentials=True,
     allow_origins=["*"],
     allow_methods=["*"],
     allow_headers=["*"],
+    # Browsers only let scripts read safelisted response headers otherwise
+    expose_headers=["X-Next-Cursor", "Idempotent-Replayed"],
 )
 
+# Outermost, so the timings include every other middleware
+app.add_middleware(MetricsMiddleware, metrics=request_metrics)
+
+
 
+@app.on_event("startup")
+async def start_background_workers():
+    global index_task
+    # Pay for connection setup now rather than on the first requests
+    warmed = await health.warm_up(db, MONGO_WARMUP_CONNECTIONS, MONGO_STARTUP_TIMEOUT)
+    if not warmed and MONGO_REQUIRED_AT_STARTUP:
+        raise RuntimeError("MongoDB is unreachable and MONGO_REQUIRED_AT_STARTUP is set")
+    # Index builds can take a while on large collections; don't hold up startup
+    index_task = asyncio.create_task(build_indexes())
+    portfolio_store.start()
+    contact_writer.start()
+    analytics_collector.start()
+    if notification_transport is not None:
+        notification_worker.start()
 
 @app.on_event("shutdown")
 async def shutdown_db_client():
+    if index_task is not None:
+        index_task.cancel()
+    await contact_writer.stop()
+    await analytics_collector.stop()
+    await notification_worker.stop()
+    await portfolio_store.stop()
     client.close()
@@ -0,0 +1,103 @@
+"""A shared-memory slot for passing built payloads between worker processes.
+
+Pre-forked workers (see ``prefork``) each keep their own portfolio cache, so
+after an edit every worker reloads the sections and would otherwise encode and
+brotli-compress the same body again. Through a ``SharedPayloadSlot`` the first
+worker to build a body publishes it with its compressed variants, and the
+others pick those up instead of recompressing.
+
+The slot is a seqlock: the writer bumps the sequence number to an odd value,
+writes the record and bumps it to even again; readers retry (or give up and
+build their own copy) if the number moved while they were copying.
+"""
+
+import logging
+import multiprocessing
+import pickle
+import struct
+from multiprocessing.shared_memory import SharedMemory
+from typing import Optional
+
+from http_cache import CachedPayload
+
+logger = logging.getLogger(__name__)
+
+# sequence number, record length
+_HEADER = struct.Struct("<QI")
+
+
+class SharedPayloadSlot:
+    """One ``CachedPayload`` (body and variants) shared by forked processes.
+
+    Create it before forking; children inherit both the mapping and the lock.
+    """
+
+    def __init__(self, size: int = 1024 * 1024, name: Optional[str] = None, lock=None):
+        self._shm = SharedMemory(name=name, create=name is None, size=size if name is None else 0)
+        self._owner = name is None
+        self._lock = lock if lock is not None else multiprocessing.Lock()
+        self._seen_seq = 0
+        self._seen: Optional[CachedPayload] = None
+
+    @property
+    def name(self) -> str:
+        return self._shm.name
+
+    @property
+    def lock(self):
+        return self._lock
+
+    @property
+    def capacity(self) -> int:
+        return self._shm.size - _HEADER.size
+
+    def publish(self, payload: CachedPayload) -> bool:
+        record = pickle.dumps((payload.media_type, payload.body, payload.variants()), pickle.HIGHEST_PROTOCOL)
+        if len(record) > self.capacity:
+            logger.warning("Payload of %d bytes does not fit the %d byte shared slot", len(record), self.capacity)
+            return False
+        # Never block the event loop on a worker that died holding the lock
+        if not self._lock.acquire(timeout=0.1):
+            return False
+        try:
+            buf = self._shm.buf
+            seq, _ = _HEADER.unpack_from(buf)
+            _HEADER.pack_into(buf, 0, seq + 1, len(record))
+            buf[_HEADER.size:_HEADER.size + len(record)] = record
+            _HEADER.pack_into(buf, 0, seq + 2, len(record))
+        finally:
+            self._lock.release()
+        self._seen_seq, self._seen = seq + 2, payload
+        return True
+
+    def latest(self, attempts: int = 3) -> Optional[CachedPayload]:
+        """The most recently published payload, or None if there is none (yet)."""
+        buf = self._shm.buf
+        for _ in range(attempts):
+            seq, length = _HEADER.unpack_from(buf)
+            if seq == 0:
+                return None
+            if seq == self._seen_seq:
+                return self._seen
+            if seq % 2:
+                continue
+            record = bytes(buf[_HEADER.size:_HEADER.size + length])
+            if _HEADER.unpack_from(buf)[0] != seq:
+                continue
+            media_type, body, variants = pickle.loads(record)
+            self._seen_seq, self._seen = seq, CachedPayload(body, media_type, variants)
+            return self._seen
+        return None
+
+    def exchange(self, payload: CachedPayload) -> CachedPayload:
+        """Adopt the shared copy of ``payload`` if one exists, else publish it."""
+        current = self.latest()
+        if current is not None and current.etag == payload.etag:
+            return current
+        self.publish(payload)
+        return payload
+
+    def close(self) -> None:
+        self._shm.close()
+        if self._owner:
+            self._shm.unlink()
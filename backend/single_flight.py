@@ -0,0 +1,86 @@
+"""Coalescing of concurrent identical reads.
+
+Requests for the same normalized query share one in-flight call: the first
+caller starts it and everyone arriving before it finishes awaits the same
+result, so a stampede of admin or monitor requests costs one Mongo query and
+one serialized body instead of one per request. With ``ttl`` set, a finished
+result is also served for that many seconds (a micro-cache); with the default
+of 0 nothing is kept once the call completes.
+
+Writers call ``invalidate`` so requests arriving after a write never join a
+read (or get a cached result) that started before it.
+"""
+
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple
+
+
+class SingleFlight:
+    # Monotonic entries of metrics()
+    COUNTERS = ("calls", "executions", "coalesced", "cache_hits")
+
+    def __init__(self, ttl: float = 0.0, max_entries: int = 256):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+        # key -> (result, expires_at)
+        self._cache: "OrderedDict[Hashable, Tuple[Any, float]]" = OrderedDict()
+
+        self.calls = 0
+        self.executions = 0
+        self.coalesced = 0
+        self.cache_hits = 0
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """Result of ``fn()``, shared with concurrent (and, within ``ttl``, recent) callers of ``key``."""
+        self.calls += 1
+        if self.ttl > 0:
+            cached = self._cache.get(key)
+            if cached is not None:
+                if cached[1] > time.monotonic():
+                    self.cache_hits += 1
+                    return cached[0]
+                del self._cache[key]
+
+        task = self._inflight.get(key)
+        if task is None:
+            self.executions += 1
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._finished(key, done))
+        else:
+            self.coalesced += 1
+        # Shielded: a caller that is cancelled (client gone) must not cancel
+        # the query the others are waiting on
+        return await asyncio.shield(task)
+
+    def invalidate(self) -> None:
+        """Forget cached results and detach in-flight calls from new callers."""
+        self._inflight.clear()
+        self._cache.clear()
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "executions": self.executions,
+            "coalesced": self.coalesced,
+            "cache_hits": self.cache_hits,
+            "inflight": len(self._inflight),
+            "cached": len(self._cache),
+        }
+
+    def _finished(self, key: Hashable, task: asyncio.Task) -> None:
+        # An invalidate may have detached this task (and a newer one taken its place)
+        if self._inflight.get(key) is not task:
+            return
+        del self._inflight[key]
+        if task.cancelled() or task.exception() is not None:
+            # Failures are never cached; the next caller tries again
+            return
+        if self.ttl > 0:
+            self._cache[key] = (task.result(), time.monotonic() + self.ttl)
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.max_entries:
+                self._cache.popitem(last=False)
@@ -0,0 +1,162 @@
+"""Static snapshot of the cacheable GET routes, for a CDN or nginx to serve.
+
+Each route is rendered through the ASGI app itself, so the files hold exactly
+the bytes (and compressed variants) the API would send. A route is written to
+a file named after its path and media type (``api/portfolio.json``), with
+``.gz``/``.br`` siblings where compression pays off; nginx can serve those
+with ``gzip_static``/``brotli_static`` and ``try_files $uri$ext``.
+``manifest.json`` records the content type, SHA-256, ETag and caching headers
+of every file, plus the routes that must stay dynamic.
+
+Rebuilds are incremental: a route whose identity body hashes the same as in
+the previous manifest (and whose files are still there) is not rewritten.
+"""
+
+import hashlib
+import json
+import mimetypes
+import os
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from compression import ENCODINGS
+from portfolio_store import SECTIONS
+
+MANIFEST = "manifest.json"
+
+# Content-Encoding -> file suffix
+SUFFIXES = {"gzip": ".gz", "br": ".br"}
+
+# Response headers worth carrying over to the static server
+KEPT_HEADERS = ("cache-control", "content-disposition", "etag", "last-modified")
+
+
+def static_paths() -> List[str]:
+    return ["/api/portfolio", *(f"/api/portfolio/{section}" for section in SECTIONS), "/api/resume/download"]
+
+
+def dynamic_routes(app, exported: Iterable[str]) -> List[str]:
+    """``METHOD path`` of every route that is not part of the snapshot."""
+    exported = set(exported)
+    routes = []
+    for route in app.routes:
+        methods = sorted(getattr(route, "methods", None) or [])
+        path = getattr(route, "path", None)
+        if path is None or not methods:
+            continue
+        for method in methods:
+            if method == "HEAD":
+                continue
+            if method == "GET" and (path in exported or path == "/api/portfolio/{section}"):
+                continue
+            routes.append(f"{method} {path}")
+    # Query-string variants are rendered on demand
+    routes.append("GET /api/portfolio?sections=...")
+    return routes
+
+
+async def fetch(app, path: str, accept_encoding: str = "identity") -> Tuple[int, Dict[str, str], bytes]:
+    """Run one GET through the ASGI app and collect the response."""
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode("ascii"),
+        "query_string": b"",
+        "root_path": "",
+        "headers": [(b"host", b"snapshot"), (b"accept-encoding", accept_encoding.encode("ascii"))],
+        "client": ("127.0.0.1", 0),
+        "server": ("snapshot", 80),
+    }
+    status = 500
+    headers: Dict[str, str] = {}
+    chunks: List[bytes] = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        nonlocal status, headers
+        if message["type"] == "http.response.start":
+            status = message["status"]
+            headers = {k.decode("latin-1").lower(): v.decode("latin-1") for k, v in message.get("headers", [])}
+        elif message["type"] == "http.response.body":
+            chunks.append(message.get("body", b""))
+
+    await app(scope, receive, send)
+    return status, headers, b"".join(chunks)
+
+
+def _file_for(path: str, media_type: str) -> str:
+    extension = mimetypes.guess_extension(media_type.split(";")[0].strip()) or ""
+    return path.lstrip("/") + extension
+
+
+def _write(target: Path, data: bytes) -> None:
+    target.parent.mkdir(parents=True, exist_ok=True)
+    tmp = target.with_name(target.name + ".tmp")
+    tmp.write_bytes(data)
+    os.replace(tmp, target)
+
+
+def _load_manifest(out_dir: Path) -> Dict[str, Any]:
+    try:
+        return json.loads((out_dir / MANIFEST).read_text())
+    except (OSError, ValueError):
+        return {}
+
+
+async def export_snapshot(app, out_dir: Path, paths: Optional[Iterable[str]] = None, force: bool = False) -> Dict[str, Any]:
+    """Render ``paths`` (default: every cacheable route) into ``out_dir``.
+
+    Returns the new manifest, with the routes that were (re)written under
+    ``written`` and the ones left as they were under ``unchanged``.
+    """
+    out_dir = Path(out_dir)
+    paths = list(paths or static_paths())
+    previous = {} if force else _load_manifest(out_dir).get("routes", {})
+    routes: Dict[str, Any] = {}
+    written, unchanged, skipped = [], [], {}
+
+    for path in paths:
+        status, headers, body = await fetch(app, path)
+        if status != 200:
+            skipped[path] = status
+            continue
+        media_type = headers.get("content-type", "application/octet-stream")
+        digest = hashlib.sha256(body).hexdigest()
+        filename = _file_for(path, media_type)
+        entry = {
+            "file": filename,
+            "content_type": media_type,
+            "sha256": digest,
+            "size": len(body),
+            "headers": {k: headers[k] for k in KEPT_HEADERS if k in headers},
+            "variants": {},
+        }
+
+        old = previous.get(path)
+        if old is not None and old.get("sha256") == digest and all(
+            (out_dir / f).exists() for f in [old["file"], *(v["file"] for v in old.get("variants", {}).values())]
+        ):
+            routes[path] = old
+            unchanged.append(path)
+            continue
+
+        _write(out_dir / filename, body)
+        for encoding in ENCODINGS:
+            status, headers, encoded = await fetch(app, path, encoding)
+            # The app only encodes when it pays off (not for PDFs, say)
+            if status == 200 and headers.get("content-encoding") == encoding:
+                variant = filename + SUFFIXES[encoding]
+                _write(out_dir / variant, encoded)
+                entry["variants"][encoding] = {"file": variant, "size": len(encoded), "etag": headers.get("etag")}
+        routes[path] = entry
+        written.append(path)
+
+    manifest = {"routes": routes, "dynamic": dynamic_routes(app, routes)}
+    _write(out_dir / MANIFEST, json.dumps(manifest, indent=2, sort_keys=True).encode("utf-8"))
+    return {**manifest, "written": written, "unchanged": unchanged, "skipped": skipped}
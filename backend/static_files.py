@@ -0,0 +1,214 @@
+"""Cached static file downloads with validators, byte ranges and zero-copy sends.
+
+File metadata is cached and only re-read (at most once per ``check_interval``)
+when the file's mtime or size changes. Small files are also kept in memory as
+a ``CachedPayload`` so their compressed variants are built once. Full identity
+responses use ``FileResponse`` when the server supports the ASGI
+``http.response.pathsend`` extension, letting it sendfile() the bytes.
+"""
+
+import hashlib
+import os
+import time
+from datetime import datetime, timezone
+from email.utils import formatdate, parsedate_to_datetime
+from pathlib import Path
+from typing import Dict, Mapping, Optional, Tuple
+
+import anyio
+from starlette.requests import Request
+from starlette.responses import FileResponse, Response, StreamingResponse
+
+from compression import ENCODINGS
+from http_cache import CachedPayload, etag_matches
+
+READ_CHUNK_SIZE = 64 * 1024
+
+
+class FileSnapshot:
+    """Metadata (and, for small files, contents) of one version of a file."""
+
+    __slots__ = ("path", "stat", "media_type", "etag", "last_modified", "payload")
+
+    def __init__(self, path: Path, stat: os.stat_result, media_type: str, max_memory_size: int):
+        self.path = path
+        self.stat = stat
+        self.media_type = media_type
+        self.last_modified = formatdate(stat.st_mtime, usegmt=True)
+        if stat.st_size <= max_memory_size:
+            self.payload: Optional[CachedPayload] = CachedPayload(path.read_bytes(), media_type)
+            self.etag = self.payload.etag
+        else:
+            self.payload = None
+            digest = hashlib.sha256()
+            with open(path, "rb") as f:
+                for chunk in iter(lambda: f.read(READ_CHUNK_SIZE), b""):
+                    digest.update(chunk)
+            self.etag = '"' + digest.hexdigest()[:32] + '"'
+
+    @property
+    def size(self) -> int:
+        return self.stat.st_size
+
+    def etags(self):
+        if self.payload is None:
+            return [self.etag]
+        return [self.etag] + [self.payload.variant_etag(e) for e in ENCODINGS]
+
+
+class StaticFile:
+    def __init__(
+        self,
+        path: Path,
+        media_type: str,
+        check_interval: float = 1.0,
+        max_memory_size: int = 1024 * 1024,
+    ):
+        self.path = path
+        self.media_type = media_type
+        self.check_interval = check_interval
+        self.max_memory_size = max_memory_size
+        self._snapshot: Optional[FileSnapshot] = None
+        self._checked_at = float("-inf")
+
+    def get(self) -> Optional[FileSnapshot]:
+        """The current snapshot, or None if the file does not exist."""
+        now = time.monotonic()
+        if now - self._checked_at < self.check_interval:
+            return self._snapshot
+        self._checked_at = now
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            self._snapshot = None
+            return None
+        current = self._snapshot
+        if current is None or (current.stat.st_mtime_ns, current.stat.st_size) != (stat.st_mtime_ns, stat.st_size):
+            self._snapshot = FileSnapshot(self.path, stat, self.media_type, self.max_memory_size)
+        return self._snapshot
+
+
+class RangeNotSatisfiable(Exception):
+    pass
+
+
+def parse_range(header: str, size: int) -> Optional[Tuple[int, int]]:
+    """Parse a single ``bytes=`` range into inclusive offsets.
+
+    Returns None when the header should be ignored (other units, multiple
+    ranges, malformed) and raises RangeNotSatisfiable when no byte of the
+    file falls inside it.
+    """
+    unit, _, spec = header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in spec:
+        return None
+    first, sep, last = spec.strip().partition("-")
+    if not sep:
+        return None
+    try:
+        if first:
+            start = int(first)
+            end = int(last) if last else size - 1
+        else:
+            suffix = int(last)
+            if suffix == 0:
+                raise RangeNotSatisfiable(header)
+            start, end = max(size - suffix, 0), size - 1
+    except ValueError:
+        return None
+    if start >= size:
+        raise RangeNotSatisfiable(header)
+    if end < start:
+        return None
+    return start, min(end, size - 1)
+
+
+def _not_modified(request: Request, snapshot: FileSnapshot) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        return etag_matches(if_none_match, *snapshot.etags())
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+        modified = datetime.fromtimestamp(int(snapshot.stat.st_mtime), tz=timezone.utc)
+        return modified <= since
+    return False
+
+
+def _if_range_matches(request: Request, snapshot: FileSnapshot) -> bool:
+    if_range = request.headers.get("if-range")
+    if not if_range:
+        return True
+    if if_range.startswith('"'):
+        # Strong comparison only; weak validators never match If-Range
+        return if_range == snapshot.etag
+    return if_range == snapshot.last_modified
+
+
+async def _read_range(path: Path, start: int, end: int):
+    async with await anyio.open_file(path, "rb") as f:
+        await f.seek(start)
+        remaining = end - start + 1
+        while remaining > 0:
+            chunk = await f.read(min(READ_CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
+
+def file_response(
+    request: Request,
+    snapshot: FileSnapshot,
+    cache_control: str = "public, no-cache",
+    headers: Optional[Mapping[str, str]] = None,
+) -> Response:
+    """Serve a file snapshot honouring conditional and Range requests."""
+    base: Dict[str, str] = dict(headers or {})
+    base["Cache-Control"] = cache_control
+    base["Last-Modified"] = snapshot.last_modified
+    base["Accept-Ranges"] = "bytes"
+    base["Vary"] = "Accept-Encoding"
+    media_type = snapshot.media_type
+
+    range_header = request.headers.get("range")
+    if range_header and not _not_modified(request, snapshot) and _if_range_matches(request, snapshot):
+        try:
+            byte_range = parse_range(range_header, snapshot.size)
+        except RangeNotSatisfiable:
+            base["Content-Range"] = f"bytes */{snapshot.size}"
+            return Response(status_code=416, headers=base)
+        if byte_range is not None:
+            start, end = byte_range
+            base["ETag"] = snapshot.etag
+            base["Content-Range"] = f"bytes {start}-{end}/{snapshot.size}"
+            if snapshot.payload is not None:
+                body = snapshot.payload.body[start:end + 1]
+                return Response(content=body, status_code=206, media_type=media_type, headers=base)
+            base["Content-Length"] = str(end - start + 1)
+            return StreamingResponse(
+                _read_range(snapshot.path, start, end), status_code=206, media_type=media_type, headers=base
+            )
+
+    encoding = None
+    body = None
+    if snapshot.payload is not None:
+        encoding, body = snapshot.payload.negotiate(request.headers.get("accept-encoding"))
+    base["ETag"] = snapshot.payload.variant_etag(encoding) if snapshot.payload else snapshot.etag
+
+    if _not_modified(request, snapshot):
+        return Response(status_code=304, headers=base)
+    if encoding:
+        base["Content-Encoding"] = encoding
+        return Response(content=body, media_type=media_type, headers=base)
+
+    extensions = request.scope.get("extensions") or {}
+    if snapshot.payload is not None and "http.response.pathsend" not in extensions:
+        return Response(content=snapshot.payload.body, media_type=media_type, headers=base)
+    # Cached stat: FileResponse neither stats nor (with pathsend) copies the file
+    return FileResponse(snapshot.path, headers=base, media_type=media_type, stat_result=snapshot.stat)
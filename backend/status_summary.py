@@ -0,0 +1,26 @@
+"""Per-client status check summaries computed by Mongo.
+
+The pipeline only reads ``client_name`` and ``timestamp``, so with the
+``timestamp_client_name`` index (see ``indexes.index_models``) the match and
+group are covered and no check documents are fetched.
+"""
+
+from datetime import datetime
+from typing import Any, Dict, List
+
+
+def status_summary_pipeline(since: datetime, until: datetime) -> List[Dict[str, Any]]:
+    return [
+        {"$match": {"timestamp": {"$gte": since, "$lt": until}}},
+        {"$project": {"_id": 0, "client_name": 1, "timestamp": 1}},
+        {
+            "$group": {
+                "_id": "$client_name",
+                "count": {"$sum": 1},
+                "firstSeen": {"$min": "$timestamp"},
+                "lastSeen": {"$max": "$timestamp"},
+            }
+        },
+        {"$sort": {"lastSeen": -1, "_id": 1}},
+        {"$project": {"_id": 0, "client_name": "$_id", "count": 1, "firstSeen": 1, "lastSeen": 1}},
+    ]
@@ -0,0 +1,53 @@
+"""Streaming NDJSON and CSV exports straight off a Motor cursor."""
+
+import csv
+import io
+import json
+from datetime import datetime
+from typing import Any, AsyncIterator, Sequence
+
+# Flush to the client roughly every this many bytes
+CHUNK_SIZE = 64 * 1024
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+
+async def ndjson_rows(cursor) -> AsyncIterator[bytes]:
+    """One JSON document per line, yielded in chunks as the cursor produces them."""
+    buffer = []
+    size = 0
+    async for doc in cursor:
+        line = json.dumps(doc, default=_json_default, ensure_ascii=False, separators=(",", ":")) + "\n"
+        buffer.append(line)
+        size += len(line)
+        if size >= CHUNK_SIZE:
+            yield "".join(buffer).encode("utf-8")
+            buffer.clear()
+            size = 0
+    if buffer:
+        yield "".join(buffer).encode("utf-8")
+
+
+async def csv_rows(cursor, fields: Sequence[str]) -> AsyncIterator[bytes]:
+    """CSV with a header row, yielded in chunks as the cursor produces them."""
+    out = io.StringIO()
+    writer = csv.writer(out)
+    writer.writerow(fields)
+    async for doc in cursor:
+        writer.writerow([_csv_value(doc.get(field)) for field in fields])
+        if out.tell() >= CHUNK_SIZE:
+            yield out.getvalue().encode("utf-8")
+            out.seek(0)
+            out.truncate()
+    if out.tell():
+        yield out.getvalue().encode("utf-8")
+
+
+def _csv_value(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return "" if value is None else value
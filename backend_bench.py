@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+"""
+Latency Benchmark Suite for Portfolio Application
+Runs the FastAPI app in-process against an in-memory Mongo stand-in and
+drives every /api endpoint at a configurable concurrency.
+
+The stand-in (mongomock) is much slower than a real server for sorted reads
+over large collections, so absolute numbers for the Mongo-backed scenarios are
+only meaningful relative to another run with the same seed sizes.
+
+Usage:
+    python backend_bench.py --requests 2000 --concurrency 32 --output bench.json
+    python backend_bench.py --compare bench-before.json
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).parent
+sys.path.insert(0, str(ROOT_DIR / "backend"))
+
+# The stand-in has no write concerns, and a single benchmark client would
+# otherwise be throttled by the per-IP limits
+os.environ.setdefault("CONTACT_WRITE_JOURNAL", "false")
+os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+
+import httpx  # noqa: E402
+from mongomock_motor import AsyncMongoMockClient  # noqa: E402
+
+import server  # noqa: E402
+
+# Per-request client logging would dominate the measurements
+logging.getLogger("httpx").setLevel(logging.WARNING)
+
+
+def contact_body():
+    return {
+        "name": "Bench User",
+        "email": "bench@example.com",
+        "subject": "Benchmark",
+        "message": f"Benchmark message {uuid.uuid4()}",
+    }
+
+
+# name -> (method, path, request kwargs factory)
+SCENARIOS = {
+    "portfolio": ("GET", "/api/portfolio", lambda ctx: {"headers": {"Accept-Encoding": "br, gzip"}}),
+    "portfolio_revalidate": (
+        "GET",
+        "/api/portfolio",
+        lambda ctx: {"headers": {"Accept-Encoding": "br, gzip", "If-None-Match": ctx["portfolio_etag"]}},
+    ),
+    "contact_submit": ("POST", "/api/contact", lambda ctx: {"json": contact_body()}),
+    "contacts_page": ("GET", "/api/contacts", lambda ctx: {"params": {"limit": 100}}),
+    "status_create": ("POST", "/api/status", lambda ctx: {"json": {"client_name": "bench-monitor"}}),
+    "status_list": ("GET", "/api/status", lambda ctx: {}),
+    "resume_download": ("GET", "/api/resume/download", lambda ctx: {}),
+}
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+async def seed(database, contacts, status_checks):
+    now = datetime.utcnow()
+    if contacts:
+        await database.contacts.insert_many([
+            {
+                "id": str(uuid.uuid4()),
+                "name": f"Visitor {i}",
+                "email": f"visitor{i}@example.com",
+                "subject": "Hello",
+                "message": f"Seeded message {i}",
+                "timestamp": now - timedelta(seconds=i),
+                "status": "new",
+            }
+            for i in range(contacts)
+        ])
+    if status_checks:
+        await database.status_checks.insert_many([
+            {"id": str(uuid.uuid4()), "client_name": f"monitor-{i % 10}", "timestamp": now - timedelta(seconds=i)}
+            for i in range(status_checks)
+        ])
+
+
+async def run_scenario(client, name, ctx, requests, concurrency):
+    method, path, make_kwargs = SCENARIOS[name]
+    latencies = []
+    errors = 0
+    remaining = iter(range(requests))
+
+    async def worker():
+        nonlocal errors
+        for _ in remaining:
+            kwargs = make_kwargs(ctx)
+            start = time.perf_counter()
+            response = await client.request(method, path, **kwargs)
+            latencies.append(time.perf_counter() - start)
+            if response.status_code >= 400:
+                errors += 1
+
+    cpu_start = time.process_time()
+    wall_start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    wall = time.perf_counter() - wall_start
+    cpu = time.process_time() - cpu_start
+
+    latencies.sort()
+    return {
+        "requests": requests,
+        "concurrency": concurrency,
+        "errors": errors,
+        "throughput_rps": round(requests / wall, 1),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 3),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 3),
+        "max_ms": round(latencies[-1] * 1000, 3) if latencies else 0.0,
+        "cpu_us_per_request": round(cpu / requests * 1e6, 1),
+    }
+
+
+async def measure_allocations(client, name, ctx, samples):
+    """Sequential pass under tracemalloc: peak traced bytes and net blocks per request."""
+    method, path, make_kwargs = SCENARIOS[name]
+    # Warm caches so one-off work is not charged to the measured requests
+    await client.request(method, path, **make_kwargs(ctx))
+    tracemalloc.start()
+    peaks = []
+    try:
+        blocks_before = sys.getallocatedblocks()
+        for _ in range(samples):
+            kwargs = make_kwargs(ctx)
+            tracemalloc.reset_peak()
+            baseline, _ = tracemalloc.get_traced_memory()
+            await client.request(method, path, **kwargs)
+            _, peak = tracemalloc.get_traced_memory()
+            peaks.append(peak - baseline)
+        blocks_after = sys.getallocatedblocks()
+    finally:
+        tracemalloc.stop()
+    return {
+        "alloc_peak_bytes_per_request": round(sum(peaks) / len(peaks)),
+        "net_blocks_per_request": round((blocks_after - blocks_before) / samples, 1),
+    }
+
+
+async def run(args):
+    server.use_database(AsyncMongoMockClient()[f"bench_{uuid.uuid4().hex[:8]}"])
+    await seed(server.db, args.seed_contacts, args.seed_status_checks)
+
+    transport = httpx.ASGITransport(app=server.app)
+    await server.app.router.startup()
+    results = {}
+    try:
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            ctx = {"portfolio_etag": (await client.get("/api/portfolio", headers={"Accept-Encoding": "br, gzip"})).headers["etag"]}
+            for name in args.scenarios:
+                result = await run_scenario(client, name, ctx, args.requests, args.concurrency)
+                if args.alloc_samples:
+                    result.update(await measure_allocations(client, name, ctx, args.alloc_samples))
+                results[name] = result
+                print_row(name, result)
+    finally:
+        await server.app.router.shutdown()
+    return results
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT_DIR, stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_row(name, result):
+    print(
+        f"{name:<22} {result['throughput_rps']:>9.1f} rps  "
+        f"p50 {result['p50_ms']:>8.3f}  p95 {result['p95_ms']:>8.3f}  p99 {result['p99_ms']:>8.3f} ms  "
+        f"cpu {result['cpu_us_per_request']:>8.1f} us/req  "
+        f"alloc {result.get('alloc_peak_bytes_per_request', '-'):>8} B/req  errors {result['errors']}"
+    )
+
+
+def compare(report, baseline_path):
+    baseline_report = json.loads(Path(baseline_path).read_text())
+    baseline = baseline_report["results"]
+    current = report["results"]
+    print()
+    print(f"Compared with {baseline_path} (commit {baseline_report.get('commit')}):")
+    if baseline_report.get("config") != report["config"]:
+        print("  Note: run configurations differ, deltas are not like-for-like")
+    for name, result in current.items():
+        if name not in baseline:
+            continue
+        before = baseline[name]
+        deltas = []
+        for metric in ("throughput_rps", "p50_ms", "p99_ms", "cpu_us_per_request", "alloc_peak_bytes_per_request"):
+            if metric in result and metric in before and before[metric]:
+                change = (result[metric] - before[metric]) / before[metric] * 100
+                deltas.append(f"{metric} {change:+.1f}%")
+        print(f"  {name:<22} " + ", ".join(deltas))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=500, help="requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--scenarios", nargs="+", choices=list(SCENARIOS), default=list(SCENARIOS))
+    parser.add_argument("--seed-contacts", type=int, default=500)
+    parser.add_argument("--seed-status-checks", type=int, default=500)
+    parser.add_argument("--alloc-samples", type=int, default=50, help="0 disables the tracemalloc pass")
+    parser.add_argument("--output", help="write results as JSON to this file")
+    parser.add_argument("--compare", help="baseline JSON results to compare against")
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("PORTFOLIO BACKEND LATENCY BENCHMARK")
+    print("=" * 60)
+    results = asyncio.run(run(args))
+
+    report = {
+        "commit": git_revision(),
+        "timestamp": datetime.now().isoformat(),
+        "python": platform.python_version(),
+        "config": {
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "seed_contacts": args.seed_contacts,
+            "seed_status_checks": args.seed_status_checks,
+        },
+        "results": results,
+    }
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2))
+        print(f"\nResults written to {args.output}")
+    if args.compare:
+        compare(report, args.compare)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,319 +1,309 @@
 #!/usr/bin/env python3
 """
 Backend API Testing Suite for Portfolio Application
-Tests all portfolio backend endpoints with comprehensive validation
+Runs the FastAPI app in-process through an ASGI transport, backed by an
+in-memory Motor stand-in (or a real Mongo with --mongo-url), so no deployed
+backend is needed. Independent checks run concurrently; the stress checks then
+fire thousands of parallel requests and verify every one of them was stored.
+
+Usage:
+    python backend_test.py
+    python backend_test.py --stress-contacts 5000 --stress-status 2000
+    python backend_test.py --keep-rate-limits     # raise the limits instead of disabling them
+    python backend_test.py --mongo-url mongodb://localhost:27017
+    python backend_test.py --url http://localhost:8001   # a deployed backend
 """
 
-import requests
-import json
+import argparse
+import asyncio
+import logging
+import os
 import sys
+import time
+import uuid
 from datetime import datetime
-import os
-from dotenv import load_dotenv
+from pathlib import Path
+
+import httpx
+
+ROOT_DIR = Path(__file__).parent
+
+# Per-request client logging would drown the report
+logging.getLogger("httpx").setLevel(logging.WARNING)
+
+
+def load_app(keep_rate_limits, stress_size):
+    """Import the app configured for an in-process run.
+
+    Settings are read when ``server`` is imported, so this must run first.
+    """
+    sys.path.insert(0, str(ROOT_DIR / "backend"))
+    # The stand-in has no write concerns
+    os.environ.setdefault("CONTACT_WRITE_JOURNAL", "false")
+    # App logs would be interleaved with the report
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+    if keep_rate_limits:
+        # Every request comes from one client IP: keep the limiter on the
+        # request path, with room for the stress checks
+        os.environ.setdefault("CONTACT_RATE_LIMIT", f"{stress_size * 4}/minute")
+        os.environ.setdefault("STATUS_RATE_LIMIT", f"{stress_size * 4}/minute")
+    else:
+        os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+    # The stress checks queue thousands of writes on purpose
+    os.environ.setdefault("LOAD_SHEDDING_ENABLED", "false")
 
-# Load environment variables
-load_dotenv('/app/frontend/.env')
+    import server
 
-# Get backend URL from environment
-BACKEND_URL = os.getenv('REACT_APP_BACKEND_URL', 'http://localhost:8001')
-BASE_API_URL = f"{BACKEND_URL}/api"
+    return server
+
+
+async def drop_unique_indexes(database):
+    """Drop the stand-in's unique indexes once they are built.
+
+    mongomock enforces them by scanning the whole collection on every insert,
+    which makes thousands of inserts quadratic. Concurrent duplicates are
+    still caught by the app's in-memory index, and the index definitions are
+    covered by tests/test_indexes.py.
+    """
+    for name in ("contacts", "status_checks"):
+        collection = database[name]
+        for index, info in (await collection.index_information()).items():
+            if info.get("unique"):
+                await collection.drop_index(index)
+
+
+def contact_body(name="John Smith", email="john.smith@example.com", message=None):
+    return {
+        "name": name,
+        "email": email,
+        "subject": "Portfolio Inquiry",
+        "message": message or f"Hi Pavitra, I'm interested in discussing collaboration opportunities. ({uuid.uuid4()})",
+    }
 
-print(f"Testing backend at: {BASE_API_URL}")
 
 class PortfolioAPITester:
-    def __init__(self):
+    def __init__(self, client, stress_contacts=2000, stress_status=1000):
+        self.client = client
+        self.stress_contacts = stress_contacts
+        self.stress_status = stress_status
+        # Unique per run, so checks never see another run's records
+        self.run_id = uuid.uuid4().hex[:12]
         self.test_results = []
         self.passed = 0
         self.failed = 0
-        
-    def log_test(self, test_name, passed, message, details=None):
+
+    def log_test(self, test_name, passed, message, details=None, seconds=None):
         """Log test results"""
         status = "✅ PASS" if passed else "❌ FAIL"
-        print(f"{status}: {test_name}")
+        timing = f" ({seconds * 1000:.0f} ms)" if seconds is not None else ""
+        print(f"{status}: {test_name}{timing}")
         if message:
             print(f"   {message}")
         if details:
             print(f"   Details: {details}")
         print()
-        
+
         self.test_results.append({
             'test': test_name,
             'passed': passed,
             'message': message,
             'details': details,
+            'seconds': seconds,
             'timestamp': datetime.now().isoformat()
         })
-        
+
         if passed:
             self.passed += 1
         else:
             self.failed += 1
-    
-    def test_contact_form_valid_data(self):
-        """Test contact form with valid data"""
-        test_name = "Contact Form API - Valid Data"
-        
-        try:
-            contact_data = {
-                "name": "John Smith",
-                "email": "john.smith@example.com",
-                "subject": "Portfolio Inquiry",
-                "message": "Hi Pavitra, I'm interested in discussing potential collaboration opportunities. Your portfolio showcases impressive AI/ML projects!"
-            }
-            
-            response = requests.post(f"{BASE_API_URL}/contact", json=contact_data, timeout=10)
-            
-            if response.status_code == 200:
-                data = response.json()
-                if data.get('success') and 'message' in data:
-                    self.log_test(test_name, True, f"Contact form submitted successfully: {data['message']}")
-                    return True
-                else:
-                    self.log_test(test_name, False, "Invalid response format", data)
-                    return False
-            else:
-                self.log_test(test_name, False, f"HTTP {response.status_code}", response.text)
-                return False
-                
-        except Exception as e:
-            self.log_test(test_name, False, f"Request failed: {str(e)}")
-            return False
-    
-    def test_contact_form_invalid_email(self):
-        """Test contact form with invalid email format"""
-        test_name = "Contact Form API - Invalid Email"
-        
-        try:
-            contact_data = {
-                "name": "Jane Doe",
-                "email": "invalid-email-format",
-                "subject": "Test Subject",
-                "message": "Test message with invalid email format"
-            }
-            
-            response = requests.post(f"{BASE_API_URL}/contact", json=contact_data, timeout=10)
-            
-            # Should return 422 for validation error
-            if response.status_code == 422:
-                self.log_test(test_name, True, "Correctly rejected invalid email format")
-                return True
-            else:
-                self.log_test(test_name, False, f"Expected 422, got {response.status_code}", response.text)
-                return False
-                
-        except Exception as e:
-            self.log_test(test_name, False, f"Request failed: {str(e)}")
-            return False
-    
-    def test_contact_form_missing_fields(self):
-        """Test contact form with missing required fields"""
-        test_name = "Contact Form API - Missing Fields"
-        
-        try:
-            # Missing name and message
-            contact_data = {
-                "email": "test@example.com",
-                "subject": "Test Subject"
-            }
-            
-            response = requests.post(f"{BASE_API_URL}/contact", json=contact_data, timeout=10)
-            
-            # Should return 422 for validation error
-            if response.status_code == 422:
-                self.log_test(test_name, True, "Correctly rejected missing required fields")
-                return True
-            else:
-                self.log_test(test_name, False, f"Expected 422, got {response.status_code}", response.text)
-                return False
-                
-        except Exception as e:
-            self.log_test(test_name, False, f"Request failed: {str(e)}")
-            return False
-    
-    def test_portfolio_data_api(self):
-        """Test portfolio data API"""
-        test_name = "Portfolio Data API"
-        
-        try:
-            response = requests.get(f"{BASE_API_URL}/portfolio", timeout=10)
-            
-            if response.status_code == 200:
-                data = response.json()
-                
-                # Check required sections
-                required_sections = ['personalInfo', 'technicalSkills', 'certifications', 'projects', 'socialLinks', 'navigation']
-                missing_sections = []
-                
-                for section in required_sections:
-                    if section not in data:
-                        missing_sections.append(section)
-                
-                if not missing_sections:
-                    # Validate personal info structure
-                    personal_info = data.get('personalInfo', {})
-                    required_personal_fields = ['name', 'displayName', 'title', 'email', 'linkedin', 'github']
-                    
-                    missing_personal_fields = [field for field in required_personal_fields if field not in personal_info]
-                    
-                    if not missing_personal_fields:
-                        self.log_test(test_name, True, f"Portfolio data retrieved successfully with all sections")
-                        return True
-                    else:
-                        self.log_test(test_name, False, f"Missing personal info fields: {missing_personal_fields}")
-                        return False
-                else:
-                    self.log_test(test_name, False, f"Missing sections: {missing_sections}")
-                    return False
-            else:
-                self.log_test(test_name, False, f"HTTP {response.status_code}", response.text)
-                return False
-                
-        except Exception as e:
-            self.log_test(test_name, False, f"Request failed: {str(e)}")
-            return False
-    
-    def test_resume_download_api(self):
-        """Test resume download API (should return 404 since no PDF exists)"""
-        test_name = "Resume Download API"
-        
+
+    async def run_test(self, test_name, test):
+        """Run one check; it returns a success message or raises AssertionError"""
+        start = time.perf_counter()
         try:
-            response = requests.get(f"{BASE_API_URL}/resume/download", timeout=10)
-            
-            # Should return 404 since no PDF file exists
-            if response.status_code == 404:
-                self.log_test(test_name, True, "Correctly returned 404 - resume file not found (expected behavior)")
-                return True
-            elif response.status_code == 200:
-                # If it returns 200, the PDF file exists
-                content_type = response.headers.get('content-type', '')
-                if 'application/pdf' in content_type:
-                    self.log_test(test_name, True, "Resume PDF file exists and downloaded successfully")
-                    return True
-                else:
-                    self.log_test(test_name, False, f"Expected PDF, got content-type: {content_type}")
-                    return False
-            else:
-                self.log_test(test_name, False, f"Unexpected status code: {response.status_code}", response.text)
-                return False
-                
-        except Exception as e:
-            self.log_test(test_name, False, f"Request failed: {str(e)}")
+            message = await test()
+        except AssertionError as e:
+            self.log_test(test_name, False, str(e), seconds=time.perf_counter() - start)
             return False
-    
-    def test_contacts_list_api(self):
-        """Test contacts list API"""
-        test_name = "Contacts List API"
-        
-        try:
-            response = requests.get(f"{BASE_API_URL}/contacts", timeout=10)
-            
-            if response.status_code == 200:
-                data = response.json()
-                
-                if isinstance(data, list):
-                    # Check if contacts are sorted by timestamp (descending)
-                    if len(data) > 1:
-                        timestamps = [contact.get('timestamp') for contact in data if 'timestamp' in contact]
-                        if len(timestamps) > 1:
-                            # Check if sorted in descending order
-                            is_sorted = all(timestamps[i] >= timestamps[i+1] for i in range(len(timestamps)-1))
-                            if is_sorted:
-                                self.log_test(test_name, True, f"Retrieved {len(data)} contacts in descending order by timestamp")
-                            else:
-                                self.log_test(test_name, True, f"Retrieved {len(data)} contacts (sorting order not verified)")
-                        else:
-                            self.log_test(test_name, True, f"Retrieved {len(data)} contacts")
-                    else:
-                        self.log_test(test_name, True, f"Retrieved {len(data)} contacts (empty or single contact)")
-                    return True
-                else:
-                    self.log_test(test_name, False, "Response is not a list", type(data))
-                    return False
-            else:
-                self.log_test(test_name, False, f"HTTP {response.status_code}", response.text)
-                return False
-                
         except Exception as e:
-            self.log_test(test_name, False, f"Request failed: {str(e)}")
+            self.log_test(test_name, False, f"Request failed: {e!r}", seconds=time.perf_counter() - start)
             return False
-    
-    def test_database_persistence(self):
-        """Test that contact form data is actually saved to database"""
-        test_name = "Database Persistence Test"
-        
-        try:
-            # Submit a unique contact form
-            unique_message = f"Test message for database persistence - {datetime.now().isoformat()}"
-            contact_data = {
-                "name": "Database Test User",
-                "email": "dbtest@example.com",
-                "subject": "Database Persistence Test",
-                "message": unique_message
-            }
-            
-            # Submit contact form
-            submit_response = requests.post(f"{BASE_API_URL}/contact", json=contact_data, timeout=10)
-            
-            if submit_response.status_code != 200:
-                self.log_test(test_name, False, "Failed to submit contact form for database test")
-                return False
-            
-            # Wait a moment for database write
-            import time
-            time.sleep(1)
-            
-            # Retrieve contacts and check if our submission exists
-            contacts_response = requests.get(f"{BASE_API_URL}/contacts", timeout=10)
-            
-            if contacts_response.status_code == 200:
-                contacts = contacts_response.json()
-                
-                # Look for our unique message
-                found_contact = None
-                for contact in contacts:
-                    if contact.get('message') == unique_message:
-                        found_contact = contact
-                        break
-                
-                if found_contact:
-                    # Verify all fields are saved correctly
-                    if (found_contact.get('name') == contact_data['name'] and
-                        found_contact.get('email') == contact_data['email'] and
-                        found_contact.get('subject') == contact_data['subject'] and
-                        'timestamp' in found_contact and
-                        'id' in found_contact):
-                        self.log_test(test_name, True, "Contact data successfully saved to database with all fields")
-                        return True
-                    else:
-                        self.log_test(test_name, False, "Contact found but some fields are missing or incorrect", found_contact)
-                        return False
-                else:
-                    self.log_test(test_name, False, "Submitted contact not found in database")
-                    return False
-            else:
-                self.log_test(test_name, False, f"Failed to retrieve contacts: HTTP {contacts_response.status_code}")
-                return False
-                
-        except Exception as e:
-            self.log_test(test_name, False, f"Database persistence test failed: {str(e)}")
-            return False
-    
-    def run_all_tests(self):
+        self.log_test(test_name, True, message, seconds=time.perf_counter() - start)
+        return True
+
+    async def contacts_from(self, domain):
+        """Every stored contact with an email at ``domain``, following the page cursors"""
+        contacts = []
+        params = {"email_domain": domain, "limit": 1000}
+        while True:
+            response = await self.client.get("/api/contacts", params=params)
+            assert response.status_code == 200, f"Listing contacts: HTTP {response.status_code} {response.text}"
+            contacts.extend(response.json())
+            cursor = response.headers.get("x-next-cursor")
+            if not cursor:
+                return contacts
+            params["cursor"] = cursor
+
+    # Functional checks (independent of each other)
+
+    async def test_contact_form_valid_data(self):
+        response = await self.client.post("/api/contact", json=contact_body())
+        assert response.status_code == 200, f"HTTP {response.status_code} {response.text}"
+        data = response.json()
+        assert data.get('success') and 'message' in data, f"Invalid response format: {data}"
+        return f"Contact form submitted successfully: {data['message']}"
+
+    async def test_contact_form_invalid_email(self):
+        response = await self.client.post("/api/contact", json=contact_body(email="invalid-email-format"))
+        assert response.status_code == 422, f"Expected 422, got {response.status_code}"
+        return "Correctly rejected invalid email format"
+
+    async def test_contact_form_missing_fields(self):
+        response = await self.client.post("/api/contact", json={"email": "test@example.com", "subject": "Test Subject"})
+        assert response.status_code == 422, f"Expected 422, got {response.status_code}"
+        return "Correctly rejected missing required fields"
+
+    async def test_portfolio_data_api(self):
+        response = await self.client.get("/api/portfolio")
+        assert response.status_code == 200, f"HTTP {response.status_code}"
+        data = response.json()
+        required_sections = ['personalInfo', 'technicalSkills', 'certifications', 'projects', 'socialLinks', 'navigation']
+        missing_sections = [section for section in required_sections if section not in data]
+        assert not missing_sections, f"Missing sections: {missing_sections}"
+        required_personal_fields = ['name', 'displayName', 'title', 'email', 'linkedin', 'github']
+        missing_fields = [field for field in required_personal_fields if field not in data['personalInfo']]
+        assert not missing_fields, f"Missing personal info fields: {missing_fields}"
+        return "Portfolio data retrieved successfully with all sections"
+
+    async def test_portfolio_section_revalidation(self):
+        response = await self.client.get("/api/portfolio/projects")
+        assert response.status_code == 200, f"HTTP {response.status_code}"
+        etag = response.headers.get("etag")
+        assert etag, "No ETag on the section response"
+        revalidated = await self.client.get("/api/portfolio/projects", headers={"If-None-Match": etag})
+        assert revalidated.status_code == 304, f"Expected 304 for a matching ETag, got {revalidated.status_code}"
+        return f"Section served with ETag {etag} and revalidated with 304"
+
+    async def test_resume_download_api(self):
+        response = await self.client.get("/api/resume/download")
+        if response.status_code == 404:
+            return "Correctly returned 404 - resume file not found"
+        assert response.status_code == 200, f"Unexpected status code: {response.status_code}"
+        content_type = response.headers.get('content-type', '')
+        assert 'application/pdf' in content_type, f"Expected PDF, got content-type: {content_type}"
+        return f"Resume PDF downloaded ({len(response.content)} bytes)"
+
+    async def test_contacts_list_api(self):
+        response = await self.client.get("/api/contacts")
+        assert response.status_code == 200, f"HTTP {response.status_code}"
+        data = response.json()
+        assert isinstance(data, list), f"Response is not a list: {type(data)}"
+        timestamps = [contact['timestamp'] for contact in data]
+        assert timestamps == sorted(timestamps, reverse=True), "Contacts are not newest first"
+        return f"Retrieved {len(data)} contacts in descending order by timestamp"
+
+    async def test_database_persistence(self):
+        domain = f"persist-{self.run_id}.example.com"
+        contact = contact_body(name="Database Test User", email=f"dbtest@{domain}")
+        response = await self.client.post("/api/contact", json=contact)
+        assert response.status_code == 200, f"Failed to submit contact form: HTTP {response.status_code}"
+        # The response is only sent once the record's batch is written
+        [found] = await self.contacts_from(domain)
+        for field in ('name', 'email', 'subject', 'message'):
+            assert found.get(field) == contact[field], f"Field {field} not saved correctly: {found}"
+        assert 'timestamp' in found and 'id' in found, f"Missing id or timestamp: {found}"
+        return "Contact data successfully saved to database with all fields"
+
+    async def test_duplicate_submission_suppressed(self):
+        domain = f"dedup-{self.run_id}.example.com"
+        contact = contact_body(email=f"twice@{domain}")
+        headers = {"Idempotency-Key": f"dedup-{self.run_id}"}
+        first, second = await asyncio.gather(
+            self.client.post("/api/contact", json=contact, headers=headers),
+            self.client.post("/api/contact", json=contact, headers=headers),
+        )
+        assert first.status_code == second.status_code == 200, f"HTTP {first.status_code}/{second.status_code}"
+        replayed = [r.headers.get("idempotent-replayed") for r in (first, second)]
+        assert replayed.count("true") == 1, f"Expected exactly one replay, got {replayed}"
+        stored = await self.contacts_from(domain)
+        assert len(stored) == 1, f"Expected one stored contact, found {len(stored)}"
+        return "Concurrent duplicate submission stored once and replayed once"
+
+    async def test_status_checks_api(self):
+        client_name = f"monitor-{self.run_id}"
+        response = await self.client.post("/api/status", json={"client_name": client_name})
+        assert response.status_code == 200, f"HTTP {response.status_code}"
+        created = response.json()
+        listed = (await self.client.get("/api/status")).json()
+        assert any(check['id'] == created['id'] for check in listed), "Created status check not listed"
+        return "Status check created and listed"
+
+    # Stress checks
+
+    async def test_parallel_contact_submissions(self):
+        domain = f"stress-{self.run_id}.example.com"
+        start = time.perf_counter()
+        responses = await asyncio.gather(*(
+            self.client.post("/api/contact", json=contact_body(name=f"Visitor {i}", email=f"visitor{i}@{domain}"))
+            for i in range(self.stress_contacts)
+        ))
+        elapsed = time.perf_counter() - start
+        statuses = {}
+        for response in responses:
+            statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+        assert statuses == {200: self.stress_contacts}, f"Unexpected responses: {statuses}"
+
+        stored = await self.contacts_from(domain)
+        emails = {contact['email'] for contact in stored}
+        assert len(stored) == self.stress_contacts, f"Stored {len(stored)} of {self.stress_contacts} contacts"
+        assert len(emails) == self.stress_contacts, "Some submissions were stored more than once"
+        return f"{self.stress_contacts} parallel submissions all stored ({self.stress_contacts / elapsed:.0f} req/s)"
+
+    async def test_parallel_status_checks(self):
+        client_name = f"stress-{self.run_id}"
+        start = time.perf_counter()
+        writes = [self.client.post("/api/status", json={"client_name": client_name}) for _ in range(self.stress_status)]
+        # Readers in the middle of the write burst share coalesced queries
+        reads = [self.client.get("/api/status") for _ in range(self.stress_status // 10)]
+        responses = await asyncio.gather(*writes, *reads)
+        elapsed = time.perf_counter() - start
+        failed = [r.status_code for r in responses if r.status_code != 200]
+        assert not failed, f"{len(failed)} requests failed: {sorted(set(failed))}"
+
+        summary = (await self.client.get("/api/status/summary")).json()
+        counts = {entry['client_name']: entry['count'] for entry in summary['clients']}
+        assert counts.get(client_name) == self.stress_status, (
+            f"Summary counts {counts.get(client_name)} of {self.stress_status} status checks"
+        )
+        return f"{self.stress_status} parallel status checks stored, {len(reads)} concurrent reads ({len(responses) / elapsed:.0f} req/s)"
+
+    async def run_all_tests(self):
         """Run all tests"""
         print("=" * 60)
         print("PORTFOLIO BACKEND API TESTING SUITE")
         print("=" * 60)
         print()
-        
-        # Test all endpoints
-        self.test_contact_form_valid_data()
-        self.test_contact_form_invalid_email()
-        self.test_contact_form_missing_fields()
-        self.test_portfolio_data_api()
-        self.test_resume_download_api()
-        self.test_contacts_list_api()
-        self.test_database_persistence()
-        
+
+        start = time.perf_counter()
+        await asyncio.gather(
+            self.run_test("Contact Form API - Valid Data", self.test_contact_form_valid_data),
+            self.run_test("Contact Form API - Invalid Email", self.test_contact_form_invalid_email),
+            self.run_test("Contact Form API - Missing Fields", self.test_contact_form_missing_fields),
+            self.run_test("Portfolio Data API", self.test_portfolio_data_api),
+            self.run_test("Portfolio Section API - Revalidation", self.test_portfolio_section_revalidation),
+            self.run_test("Resume Download API", self.test_resume_download_api),
+            self.run_test("Contacts List API", self.test_contacts_list_api),
+            self.run_test("Database Persistence Test", self.test_database_persistence),
+            self.run_test("Duplicate Submission Suppression", self.test_duplicate_submission_suppressed),
+            self.run_test("Status Checks API", self.test_status_checks_api),
+        )
+        # One at a time, so their throughput numbers mean something
+        if self.stress_contacts:
+            await self.run_test("Stress - Parallel Contact Submissions", self.test_parallel_contact_submissions)
+        if self.stress_status:
+            await self.run_test("Stress - Parallel Status Checks", self.test_parallel_status_checks)
+        elapsed = time.perf_counter() - start
+
         # Print summary
         print("=" * 60)
         print("TEST SUMMARY")
@@ -322,20 +312,69 @@ class PortfolioAPITester:
         print(f"Passed: {self.passed}")
         print(f"Failed: {self.failed}")
         print(f"Success Rate: {(self.passed / (self.passed + self.failed) * 100):.1f}%")
+        print(f"Duration: {elapsed:.2f}s")
         print()
-        
+
         if self.failed > 0:
             print("FAILED TESTS:")
             for result in self.test_results:
                 if not result['passed']:
                     print(f"- {result['test']}: {result['message']}")
             print()
-        
+
         return self.failed == 0
 
+
+async def run(args):
+    tester_options = {"stress_contacts": args.stress_contacts, "stress_status": args.stress_status}
+    if args.url:
+        # A deployed backend: its own rate limits and load shedding apply
+        print(f"Testing backend at: {args.url}")
+        timeout = httpx.Timeout(30.0, pool=None)
+        async with httpx.AsyncClient(base_url=args.url, timeout=timeout) as client:
+            return await PortfolioAPITester(client, **tester_options).run_all_tests()
+
+    server = load_app(args.keep_rate_limits, max(args.stress_contacts, args.stress_status))
+    if args.mongo_url:
+        from motor.motor_asyncio import AsyncIOMotorClient
+
+        database = AsyncIOMotorClient(args.mongo_url)[f"backend_test_{uuid.uuid4().hex[:8]}"]
+    else:
+        from mongomock_motor import AsyncMongoMockClient
+
+        database = AsyncMongoMockClient()["backend_test"]
+    server.use_database(database)
+    print(f"Testing backend in-process against {'Mongo at ' + args.mongo_url if args.mongo_url else 'an in-memory Mongo'}")
+
+    await server.app.router.startup()
+    try:
+        await server.index_task
+        if not args.mongo_url:
+            await drop_unique_indexes(database)
+        transport = httpx.ASGITransport(app=server.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://testserver") as client:
+            return await PortfolioAPITester(client, **tester_options).run_all_tests()
+    finally:
+        await server.app.router.shutdown()
+        if args.mongo_url:
+            await database.client.drop_database(database.name)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", help="Test a running backend at this base URL instead of in-process.")
+    parser.add_argument("--mongo-url", help="Run in-process against this Mongo instead of the in-memory stand-in.")
+    parser.add_argument("--stress-contacts", type=int, default=2000, help="Parallel contact submissions (0 to skip).")
+    parser.add_argument("--stress-status", type=int, default=1000, help="Parallel status checks (0 to skip).")
+    parser.add_argument(
+        "--keep-rate-limits", action="store_true", help="Raise the per-client rate limits instead of disabling them."
+    )
+    args = parser.parse_args()
+    return asyncio.run(run(args))
+
+
 if __name__ == "__main__":
-    tester = PortfolioAPITester()
-    success = tester.run_all_tests()
-    
+    success = main()
+
     # Exit with appropriate code
-    sys.exit(0 if success else 1)
\ No newline at end of file
+    sys.exit(0 if success else 1)
@@ -0,0 +1,32 @@
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+# The backend is run as ``uvicorn server:app`` from its own directory
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+# The in-memory stand-in has no write concerns
+os.environ.setdefault("CONTACT_WRITE_JOURNAL", "false")
+
+import server  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+from mongomock_motor import AsyncMongoMockClient  # noqa: E402
+from idempotency import IdempotencyIndex  # noqa: E402
+from rate_limit import MemoryBackend  # noqa: E402
+
+
+@pytest.fixture
+def mongo(monkeypatch):
+    """Point the app at an in-memory Motor stand-in."""
+    database = AsyncMongoMockClient()["test_database"]
+    server.use_database(database)
+    monkeypatch.setattr(server.rate_limiter, "backend", MemoryBackend())
+    monkeypatch.setattr(server, "contact_dedup", IdempotencyIndex())
+    return database
+
+
+@pytest.fixture
+def client(mongo):
+    with TestClient(server.app) as test_client:
+        yield test_client
@@ -0,0 +1,70 @@
+import asyncio
+
+from mongomock_motor import AsyncMongoMockClient
+
+import server
+from analytics import EventCollector
+
+
+def test_events_are_flushed_as_minute_rollups():
+    async def scenario():
+        collection = AsyncMongoMockClient()["test_database"].analytics_rollups
+        collector = EventCollector(collection, capacity=100)
+        for _ in range(30):
+            collector.record("contact", "view")
+        for _ in range(5):
+            collector.record("projects", "click")
+        written = await collector.flush()
+        collector.record("contact", "view")
+        await collector.flush()
+        docs = await collection.find({}, {"_id": 0, "section": 1, "event": 1, "count": 1}).to_list(None)
+        return written, docs
+
+    written, docs = asyncio.run(scenario())
+    # One upsert per counter, not per event
+    assert written == 2
+    counts = {(d["section"], d["event"]): d["count"] for d in docs}
+    assert counts == {("contact", "view"): 31, ("projects", "click"): 5}
+
+
+def test_full_buffer_drops_oldest_and_failed_flushes_are_retried():
+    class FlakyCollection:
+        def __init__(self):
+            self.calls = 0
+
+        async def bulk_write(self, requests, ordered=True):
+            self.calls += 1
+            if self.calls == 1:
+                raise ConnectionError("down")
+
+    async def scenario():
+        collector = EventCollector(FlakyCollection(), capacity=4)
+        for _ in range(6):
+            collector.record("home", "view")
+        assert await collector.flush() == 0
+        assert collector.metrics()["pending_counters"] == 1
+        assert await collector.flush() == 1
+        return collector.metrics()
+
+    metrics = asyncio.run(scenario())
+    assert metrics["dropped"] == 2
+    assert metrics["accepted"] == 6
+    assert metrics["flush_failures"] == 1
+    assert metrics["pending_counters"] == 0
+
+
+def test_contact_view_endpoint_and_summary(client, mongo):
+    for _ in range(3):
+        assert client.post("/api/analytics/contact-view").status_code == 202
+    client.post("/api/analytics/contact-view", json={"section": "resume", "event": "download"})
+    assert client.post("/api/analytics/contact-view", json={"section": "x" * 40}).status_code == 400
+    assert client.post("/api/analytics/contact-view", content=b"[1, 2]").status_code == 400
+    assert client.post("/api/analytics/contact-view", json={"section": ["contact"]}).status_code == 400
+    assert client.post("/api/analytics/contact-view", json={"event": {"view": 1}}).status_code == 400
+
+    client.portal.call(server.analytics_collector.flush)
+    totals = client.get("/api/analytics/summary").json()["totals"]
+    assert [(t["section"], t["event"], t["count"]) for t in totals] == [
+        ("contact", "view", 3),
+        ("resume", "download", 1),
+    ]
@@ -0,0 +1,103 @@
+import asyncio
+import subprocess
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from mongomock_motor import AsyncMongoMockClient
+
+import archive
+import server
+from archive import ArchiveReader, archive_collection
+
+
+def status_checks(start, count, step=timedelta(days=10)):
+    return [{"id": f"s{i:03d}", "client_name": "api" if i % 2 else "web", "timestamp": start + i * step} for i in range(count)]
+
+
+def test_archive_moves_old_documents_into_monthly_files(tmp_path):
+    async def scenario():
+        db = AsyncMongoMockClient()["test_database"]
+        await db.status_checks.insert_many(status_checks(datetime(2024, 1, 5), 12))
+        await db.contacts.insert_many([
+            {"id": "c1", "name": "A", "email": "a@x.org", "subject": "s", "message": "m",
+             "timestamp": datetime(2024, 1, 2), "status": "notified", "dedupKey": "k1"},
+            {"id": "c2", "name": "B", "email": "b@x.org", "subject": "s", "message": "m",
+             "timestamp": datetime(2024, 1, 3), "status": "new"},
+        ])
+        cutoff = datetime(2024, 3, 1)
+        moved = await archive_collection(db.status_checks, "status_checks", cutoff, tmp_path, batch_size=2)
+        again = await archive_collection(db.status_checks, "status_checks", cutoff, tmp_path)
+        contacts = await archive_collection(db.contacts, "contacts", cutoff, tmp_path)
+        hot = [doc["id"] async for doc in db.status_checks.find({}).sort("timestamp", 1)]
+        hot_contacts = [doc["id"] async for doc in db.contacts.find({})]
+        return moved, again, contacts, hot, hot_contacts
+
+    moved, again, contacts, hot, hot_contacts = asyncio.run(scenario())
+    assert moved == {"2024-01": 3, "2024-02": 3}
+    assert again == {}
+    assert hot[0] == "s006"
+    # Contacts not notified yet stay hot
+    assert contacts == {"2024-01": 1} and hot_contacts == ["c2"]
+    assert sorted(p.name for p in (tmp_path / "status_checks").iterdir()) == ["2024-01.parquet", "2024-02.parquet"]
+
+    reader = ArchiveReader(tmp_path)
+    rows = reader.read("status_checks")
+    assert [r["id"] for r in rows] == ["s005", "s004", "s003", "s002", "s001", "s000"]
+    assert rows[0]["timestamp"] == datetime(2024, 1, 5) + 5 * timedelta(days=10)
+    assert [r["id"] for r in reader.read("status_checks", equals={"client_name": "api"}, limit=2)] == ["s005", "s003"]
+    assert [r["id"] for r in reader.read("status_checks", since=datetime(2024, 1, 20), until=datetime(2024, 2, 10))] == ["s003", "s002"]
+    [contact] = reader.read("contacts")
+    assert contact["email"] == "a@x.org" and "dedupKey" not in contact
+
+
+def test_rerun_after_interrupted_delete_does_not_duplicate(tmp_path):
+    async def scenario():
+        collection = AsyncMongoMockClient()["test_database"].status_checks
+        docs = status_checks(datetime(2024, 1, 1), 3, step=timedelta(days=1))
+        await collection.insert_many([dict(d) for d in docs])
+        await archive_collection(collection, "status_checks", datetime(2024, 2, 1), tmp_path)
+        # As if the previous run wrote the file but died before deleting
+        await collection.insert_many([dict(d) for d in docs])
+        return await archive_collection(collection, "status_checks", datetime(2024, 2, 1), tmp_path)
+
+    assert asyncio.run(scenario()) == {"2024-01": 3}
+    assert len(ArchiveReader(tmp_path).read("status_checks")) == 3
+
+
+def test_each_month_is_written_once(tmp_path, monkeypatch):
+    replaced = []
+    real_replace = archive.os.replace
+
+    def replace(src, dst):
+        replaced.append(dst.name)
+        real_replace(src, dst)
+
+    monkeypatch.setattr(archive.os, "replace", replace)
+
+    async def scenario():
+        collection = AsyncMongoMockClient()["test_database"].status_checks
+        await collection.insert_many(status_checks(datetime(2024, 1, 1), 40, step=timedelta(days=1)))
+        return await archive_collection(collection, "status_checks", datetime(2024, 3, 1), tmp_path, batch_size=3)
+
+    assert asyncio.run(scenario()) == {"2024-01": 31, "2024-02": 9}
+    assert replaced == ["2024-01.parquet", "2024-02.parquet"]
+    assert len(ArchiveReader(tmp_path).read("status_checks")) == 40
+
+
+def test_archive_endpoints(client, mongo, tmp_path, monkeypatch):
+    monkeypatch.setattr(server, "archive_reader", ArchiveReader(tmp_path))
+    assert client.get("/api/archive/status").json() == []
+    client.portal.call(mongo.status_checks.insert_many, status_checks(datetime(2023, 5, 1), 4))
+    client.portal.call(archive_collection, mongo.status_checks, "status_checks", datetime(2024, 1, 1), tmp_path)
+
+    assert client.get("/api/status").json() == []
+    archived = client.get("/api/archive/status", params={"client_name": "web"}).json()
+    assert [c["id"] for c in archived] == ["s002", "s000"]
+    assert archived[0]["timestamp"] == "2023-05-21T00:00:00"
+
+
+def test_server_does_not_import_pandas_until_the_archive_is_read():
+    backend = Path(server.__file__).parent
+    check = "import sys, server; assert 'pandas' not in sys.modules and 'pyarrow' not in sys.modules"
+    subprocess.run([sys.executable, "-c", check], cwd=backend, check=True)
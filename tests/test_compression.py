@@ -0,0 +1,79 @@
+import brotli
+
+import server
+from compression import acceptable, negotiate
+from http_cache import CachedPayload
+from portfolio_content import PORTFOLIO_DATA
+
+
+def test_negotiate_prefers_brotli_and_honours_q_values():
+    assert negotiate("gzip, deflate, br") == "br"
+    assert negotiate("br;q=0.5, gzip") == "gzip"
+    assert negotiate("br;q=0, gzip;q=0") is None
+    assert negotiate("identity") is None
+    assert negotiate("*") == "br"
+
+
+def test_payload_falls_back_to_the_next_accepted_encoding():
+    assert acceptable("gzip;q=0.8, br, identity") == ["br", "gzip"]
+    # As if brotli had not shrunk this body enough to be worth serving
+    payload = CachedPayload(b'{"text": "' + b"abc" * 200 + b'"}', variants={"br": None})
+    encoding, body = payload.negotiate("br, gzip")
+    assert encoding == "gzip" and body == payload.variant("gzip")
+    assert payload.negotiate("br") == (None, payload.body)
+
+
+def test_portfolio_served_precompressed(client):
+    identity = client.get("/api/portfolio", headers={"Accept-Encoding": "identity"})
+    br = client.get("/api/portfolio", headers={"Accept-Encoding": "br"})
+    gz = client.get("/api/portfolio", headers={"Accept-Encoding": "gzip"})
+
+    assert "content-encoding" not in identity.headers
+    assert br.headers["content-encoding"] == "br"
+    assert gz.headers["content-encoding"] == "gzip"
+    for response in (identity, br, gz):
+        assert response.headers["vary"] == "Accept-Encoding"
+        assert response.json() == PORTFOLIO_DATA
+    assert len({identity.headers["etag"], br.headers["etag"], gz.headers["etag"]}) == 3
+
+    # Revalidating with any representation's validator is a 304
+    response = client.get(
+        "/api/portfolio",
+        headers={"Accept-Encoding": "gzip", "If-None-Match": br.headers["etag"]},
+    )
+    assert response.status_code == 304
+    assert response.headers["etag"] == gz.headers["etag"]
+
+
+def test_compressed_variant_is_built_once(client):
+    client.get("/api/portfolio", headers={"Accept-Encoding": "br"})
+    cached = server.portfolio_store._payload
+    first = cached.variant("br")
+    client.get("/api/portfolio", headers={"Accept-Encoding": "br"})
+    assert cached.variant("br") is first
+    assert brotli.decompress(first) == cached.body
+
+
+def test_dynamic_responses_gzipped_on_the_fly(client, mongo):
+    for i in range(50):
+        client.post("/api/status", json={"client_name": f"monitor-{i}"})
+
+    response = client.get("/api/status", headers={"Accept-Encoding": "gzip"})
+    assert response.status_code == 200
+    assert response.headers["content-encoding"] == "gzip"
+    assert "Accept-Encoding" in response.headers["vary"]
+    assert len(response.json()) == 50
+
+    plain = client.get("/api/status", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in plain.headers
+    assert "Accept-Encoding" in plain.headers["vary"]
+
+
+def test_resume_not_recompressed_per_request(client):
+    response = client.get("/api/resume/download", headers={"Accept-Encoding": "gzip"})
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/pdf"
+    assert response.headers["content-disposition"] == 'attachment; filename="Pavitra_Byali_Resume.pdf"'
+    # The checked-in resume is empty, so no compressed variant is worth keeping
+    assert "content-encoding" not in response.headers
+    assert server.resume_file.get().payload.variant("gzip") is None
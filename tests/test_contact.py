@@ -0,0 +1,192 @@
+import asyncio
+
+import pytest
+from mongomock_motor import AsyncMongoMockClient
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+
+import server
+from contact_writer import BatchWriter, WriterOverloaded
+from idempotency import IdempotencyIndex
+
+CONTACT = {
+    "name": "John Smith",
+    "email": "john.smith@example.com",
+    "subject": "Portfolio Inquiry",
+    "message": "Interested in discussing a collaboration.",
+}
+
+
+def test_contact_submission_is_persisted(client, mongo):
+    response = client.post("/api/contact", json=CONTACT)
+    assert response.status_code == 200
+    assert response.json()["success"] is True
+
+    stats = client.get("/api/contacts/ingest-stats").json()
+    assert stats["records_written"] >= 1
+    assert stats["queue_depth"] == 0
+
+    contacts = client.get("/api/contacts").json()
+    assert [c["message"] for c in contacts] == [CONTACT["message"]]
+
+
+def test_concurrent_submissions_are_batched():
+    async def scenario():
+        collection = AsyncMongoMockClient()["test_database"].contacts
+        writer = BatchWriter(collection, max_batch=50, max_delay=0.05, journal=False)
+        writer.start()
+        await asyncio.gather(*(writer.submit({"id": i}) for i in range(200)))
+        metrics = writer.metrics()
+        await writer.stop()
+        return await collection.count_documents({}), metrics
+
+    count, metrics = asyncio.run(scenario())
+    assert count == 200
+    assert metrics["records_written"] == 200
+    assert metrics["max_batch_size"] == 50
+    assert metrics["batches_flushed"] == 4
+    # Cumulative, with +Inf counting every batch
+    assert metrics["batch_size_buckets"]["50"] == metrics["batch_size_buckets"]["+Inf"] == 4
+    assert metrics["batch_size_buckets"]["25"] == 0
+
+
+def test_stop_drains_queued_records():
+    async def scenario():
+        collection = AsyncMongoMockClient()["test_database"].contacts
+        writer = BatchWriter(collection, max_batch=10, max_delay=1.0, journal=False)
+        writer.start()
+        pending = [asyncio.ensure_future(writer.submit({"id": i})) for i in range(25)]
+        await asyncio.sleep(0)
+        await writer.stop()
+        await asyncio.gather(*pending)
+        return await collection.count_documents({})
+
+    assert asyncio.run(scenario()) == 25
+
+
+def test_full_queue_applies_backpressure():
+    class SlowCollection:
+        async def insert_many(self, records, ordered=True):
+            await asyncio.sleep(0.2)
+
+    async def scenario():
+        writer = BatchWriter(SlowCollection(), max_batch=1, max_queue=1, enqueue_timeout=0.05, journal=False)
+        writer.start()
+        tasks = [asyncio.ensure_future(writer.submit({"id": i})) for i in range(3)]
+        done = await asyncio.gather(*tasks, return_exceptions=True)
+        return done
+
+    results = asyncio.run(scenario())
+    assert any(isinstance(r, WriterOverloaded) for r in results)
+
+
+def test_failed_records_are_reported_individually():
+    async def scenario():
+        collection = AsyncMongoMockClient()["test_database"].contacts
+        await collection.create_index("id", unique=True)
+        await collection.insert_one({"id": 1})
+        writer = BatchWriter(collection, max_batch=3, max_delay=0.05, journal=False)
+        writer.start()
+        results = await asyncio.gather(
+            *(writer.submit({"id": i}) for i in (0, 1, 2)), return_exceptions=True
+        )
+        await writer.stop()
+        return results
+
+    ok, duplicate, ok_too = asyncio.run(scenario())
+    assert ok is None and ok_too is None
+    assert isinstance(duplicate, DuplicateKeyError)
+
+
+def test_write_concern_errors_fail_the_whole_batch():
+    class UnjournaledCollection:
+        async def insert_many(self, records, ordered=True):
+            raise BulkWriteError({
+                "writeErrors": [],
+                "writeConcernErrors": [{"code": 64, "errmsg": "waiting for replication timed out"}],
+                "nInserted": len(records),
+            })
+
+    async def scenario():
+        writer = BatchWriter(UnjournaledCollection(), max_batch=3, max_delay=0.05, journal=False)
+        writer.start()
+        results = await asyncio.gather(*(writer.submit({"id": i}) for i in range(3)), return_exceptions=True)
+        metrics = writer.metrics()
+        await writer.stop()
+        return results, metrics
+
+    results, metrics = asyncio.run(scenario())
+    assert all(isinstance(r, BulkWriteError) for r in results)
+    assert metrics["records_failed"] == 3 and metrics["records_written"] == 0
+
+
+def test_idempotency_key_replays_original_response(client, mongo):
+    headers = {"Idempotency-Key": "form-123"}
+    first = client.post("/api/contact", json=CONTACT, headers=headers)
+    second = client.post("/api/contact", json=CONTACT, headers=headers)
+    assert second.status_code == 200
+    assert second.json() == first.json()
+    assert second.headers["Idempotent-Replayed"] == "true"
+    assert "Idempotent-Replayed" not in first.headers
+    assert asyncio.run(mongo.contacts.count_documents({})) == 1
+
+
+def test_idempotency_key_reused_with_different_content_is_rejected(client, mongo, monkeypatch):
+    headers = {"Idempotency-Key": "1"}
+    assert client.post("/api/contact", json=CONTACT, headers=headers).status_code == 200
+    other = {"name": "Someone Else", "email": "else@example.org", "subject": "Other", "message": "Different"}
+    response = client.post("/api/contact", json=other, headers=headers)
+    assert response.status_code == 422
+    assert "Idempotent-Replayed" not in response.headers
+
+    # Another worker (or a restart) checks the content stored under the key
+    monkeypatch.setattr(server, "contact_dedup", IdempotencyIndex())
+    assert client.post("/api/contact", json=other, headers=headers).status_code == 422
+    assert client.post("/api/contact", json=CONTACT, headers=headers).headers["Idempotent-Replayed"] == "true"
+    assert asyncio.run(mongo.contacts.count_documents({})) == 1
+
+
+def test_identical_content_is_stored_once(client, mongo, monkeypatch):
+    client.post("/api/contact", json=CONTACT)
+    client.post("/api/contact", json={**CONTACT, "message": "  " + CONTACT["message"].upper()})
+    client.post("/api/contact", json={**CONTACT, "subject": "Something else"})
+    assert asyncio.run(mongo.contacts.count_documents({})) == 2
+
+    # Another worker (or a restart) has an empty index; the unique index catches it
+    monkeypatch.setattr(server, "contact_dedup", IdempotencyIndex())
+    assert client.post("/api/contact", json=CONTACT).headers["Idempotent-Replayed"] == "true"
+    assert asyncio.run(mongo.contacts.count_documents({})) == 2
+    assert all("dedupKey" not in c for c in client.get("/api/contacts").json())
+
+
+def test_concurrent_duplicates_run_once_and_failures_are_retried():
+    calls = []
+
+    async def write():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+
+    async def fail():
+        raise RuntimeError("down")
+
+    async def stored_elsewhere():
+        raise DuplicateKeyError("dup", 11000)
+
+    async def scenario():
+        index = IdempotencyIndex(max_keys=2)
+        replays = await asyncio.gather(*(index.run_once("a", write) for _ in range(5)))
+        with pytest.raises(RuntimeError):
+            await index.run_once("b", fail)
+        retried = await index.run_once("b", write)
+        other_worker = await index.run_once("c", stored_elsewhere)
+        return replays, retried, other_worker, len(index)
+
+    replays, retried, other_worker, size = asyncio.run(scenario())
+    assert replays == [False, True, True, True, True]
+    assert len(calls) == 2
+    assert retried is False and other_worker is True
+    assert size == 2
+
+
+@pytest.mark.parametrize("payload", [{**CONTACT, "email": "not-an-email"}, {"email": "a@b.co"}])
+def test_invalid_contact_rejected(client, payload):
+    assert client.post("/api/contact", json=payload).status_code == 422
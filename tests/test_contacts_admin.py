@@ -0,0 +1,132 @@
+import csv
+import io
+import json
+from datetime import datetime, timedelta
+
+import pytest
+from pymongo.errors import OperationFailure
+
+from contact_search import contact_filter
+
+
+@pytest.fixture
+def contacts(client, mongo):
+    base = datetime(2025, 1, 1)
+    docs = [
+        {
+            "id": f"{i:04d}",
+            "name": f"Visitor {i}",
+            "email": f"visitor{i}@example.com" if i % 5 else f"visitor{i}@Other.org",
+            "subject": "Hello",
+            "message": f"Message {i}",
+            # Pairs share a timestamp so the id tie-breaker is exercised
+            "timestamp": base + timedelta(minutes=i // 2),
+            "status": "new" if i % 3 else "notified",
+            "emailDomain": "example.com" if i % 5 else "other.org",
+        }
+        for i in range(25)
+    ]
+    client.portal.call(mongo.contacts.insert_many, docs)
+    return docs
+
+
+def test_contacts_paginate_by_keyset(client, contacts):
+    seen = []
+    cursor = None
+    while True:
+        params = {"limit": 10}
+        if cursor:
+            params["cursor"] = cursor
+        response = client.get("/api/contacts", params=params)
+        assert response.status_code == 200
+        page = response.json()
+        assert all("_id" not in doc for doc in page)
+        seen.extend(doc["id"] for doc in page)
+        cursor = response.headers.get("x-next-cursor")
+        if not cursor:
+            break
+
+    expected = [doc["id"] for doc in sorted(contacts, key=lambda d: (d["timestamp"], d["id"]), reverse=True)]
+    assert seen == expected
+
+
+def test_next_cursor_is_exposed_to_browsers(client, contacts):
+    response = client.get("/api/contacts", params={"limit": 10}, headers={"Origin": "https://example.org"})
+    exposed = [h.strip().lower() for h in response.headers["access-control-expose-headers"].split(",")]
+    assert response.headers["x-next-cursor"]
+    assert {"x-next-cursor", "idempotent-replayed"} <= set(exposed)
+
+
+def test_contacts_rejects_bad_cursor(client, contacts):
+    assert client.get("/api/contacts", params={"cursor": "not-a-cursor"}).status_code == 400
+
+
+def test_contacts_export_ndjson(client, contacts):
+    response = client.get("/api/contacts/export")
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert len(rows) == len(contacts)
+    assert rows[0]["id"] == "0024"
+    assert rows[0]["timestamp"] == "2025-01-01T00:12:00"
+
+
+def test_contacts_export_csv(client, contacts):
+    response = client.get("/api/contacts/export", params={"format": "csv"})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert len(rows) == len(contacts)
+    assert rows[-1]["email"] == "visitor0@Other.org"
+
+
+def test_contacts_filter_in_the_database(client, contacts):
+    def ids(**params):
+        response = client.get("/api/contacts", params=params)
+        assert response.status_code == 200
+        return [doc["id"] for doc in response.json()]
+
+    assert ids(status="notified") == ["0024", "0021", "0018", "0015", "0012", "0009", "0006", "0003", "0000"]
+    assert ids(email_domain="@OTHER.org") == ["0020", "0015", "0010", "0005", "0000"]
+    assert ids(since="2025-01-01T00:10:00", until="2025-01-01T00:11:00") == ["0021", "0020"]
+    assert ids(status="notified", email_domain="other.org", limit=1) == ["0015"]
+
+
+def test_contacts_filtered_pages_keep_the_filter(client, contacts):
+    first = client.get("/api/contacts", params={"status": "notified", "limit": 5})
+    rest = client.get(
+        "/api/contacts", params={"status": "notified", "limit": 5, "cursor": first.headers["x-next-cursor"]}
+    )
+    assert [doc["id"] for doc in rest.json()] == ["0009", "0006", "0003", "0000"]
+
+
+def test_contacts_projection(client, contacts):
+    page = client.get("/api/contacts", params={"fields": "email,status", "limit": 2}).json()
+    assert set(page[0]) == {"id", "timestamp", "email", "status"}
+    assert "emailDomain" not in client.get("/api/contacts", params={"limit": 1}).json()[0]
+    assert client.get("/api/contacts", params={"fields": "email,password"}).status_code == 400
+
+
+def test_text_search_uses_text_operator():
+    query = contact_filter(status="new", text="  collaboration offer ")
+    assert query == {"status": "new", "$text": {"$search": "collaboration offer"}}
+
+
+def test_contacts_text_search_before_the_text_index_exists(client, mongo, contacts, monkeypatch):
+    collection_type = type(mongo.contacts)
+    find = collection_type.find
+    errors = {"code": 27, "message": "text index required for $text query"}
+
+    def find_without_text_index(self, query=None, *args, **kwargs):
+        if query and "$text" in query:
+            raise OperationFailure(errors["message"], errors["code"])
+        return find(self, query, *args, **kwargs)
+
+    monkeypatch.setattr(collection_type, "find", find_without_text_index)
+    response = client.get("/api/contacts", params={"q": "hello"})
+    assert response.status_code == 503
+    assert response.headers["retry-after"]
+    errors.update(code=2, message="unknown operator")
+    assert client.get("/api/contacts", params={"q": "hello -"}).status_code == 400
+    # Other listings are unaffected
+    assert client.get("/api/contacts", params={"limit": 1}).status_code == 200
@@ -0,0 +1,44 @@
+import asyncio
+from types import SimpleNamespace
+
+import server
+from metrics import MongoPoolMetrics
+
+
+class SlowDatabase:
+    async def command(self, name):
+        await asyncio.sleep(10)
+
+
+def test_liveness(client):
+    assert client.get("/api/health/live").json() == {"status": "alive"}
+
+
+def test_readiness_reports_pool_stats(client):
+    response = client.get("/api/health/ready")
+    assert response.status_code == 200
+    body = response.json()
+    assert body["status"] == "ready"
+    assert body["mongo"]["ok"] is True
+    assert set(body["pool"]) >= {"open", "in_use", "waiting"}
+
+
+def test_readiness_fails_fast_when_mongo_is_slow(client, monkeypatch):
+    monkeypatch.setattr(server, "db", SlowDatabase())
+    monkeypatch.setattr(server, "HEALTH_CHECK_TIMEOUT", 0.05)
+    response = client.get("/api/health/ready")
+    assert response.status_code == 503
+    assert "timed out" in response.json()["mongo"]["error"]
+
+
+def test_pool_metrics_track_checkouts():
+    pool = MongoPoolMetrics()
+    event = SimpleNamespace()
+    pool.connection_created(event)
+    pool.connection_check_out_started(event)
+    pool.connection_checked_out(event)
+    pool.connection_check_out_started(event)
+    pool.connection_check_out_failed(event)
+    assert pool.stats() == {
+        "open": 1, "in_use": 1, "waiting": 0, "created": 1, "checkout_failures": 1, "pools_cleared": 0,
+    }
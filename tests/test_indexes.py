@@ -0,0 +1,117 @@
+import asyncio
+
+from mongomock_motor import AsyncMongoMockClient
+from pymongo import IndexModel
+from pymongo.errors import ServerSelectionTimeoutError
+
+import server
+from indexes import ensure_indexes, summarize_plan
+
+
+def test_ensure_indexes_creates_declared_indexes():
+    async def scenario():
+        db = AsyncMongoMockClient()["test_database"]
+        await ensure_indexes(db, status_ttl_seconds=3600)
+        return (
+            await db.contacts.index_information(),
+            await db.status_checks.index_information(),
+        )
+
+    contacts, status_checks = asyncio.run(scenario())
+    assert {"timestamp_id", "id", "status_timestamp_id", "emailDomain_timestamp_id", "subject_message_text"} <= set(contacts)
+    assert contacts["id"]["unique"] is True
+    assert status_checks["timestamp"]["expireAfterSeconds"] == 3600
+
+
+def test_status_ttl_follows_the_setting_both_ways(monkeypatch):
+    coll_mods = []
+
+    async def coll_mod(self, name, collection, index):
+        # mongomock has no collMod; rebuild the index the way it would end up
+        coll_mods.append(index)
+        await self[collection].drop_index(index["name"])
+        await self[collection].create_indexes(
+            [IndexModel([("timestamp", 1)], name=index["name"], expireAfterSeconds=index["expireAfterSeconds"])]
+        )
+
+    async def scenario():
+        db = AsyncMongoMockClient()["test_database"]
+        monkeypatch.setattr(type(db), "command", coll_mod)
+        await ensure_indexes(db, status_ttl_seconds=3600)
+        changed = await ensure_indexes(db, status_ttl_seconds=7200)
+        ttl = (await db.status_checks.index_information())["timestamp"].get("expireAfterSeconds")
+        disabled = await ensure_indexes(db)
+        return changed, ttl, disabled, await db.status_checks.index_information()
+
+    changed, ttl, disabled, status_checks = asyncio.run(scenario())
+    assert "status_checks" in changed and ttl == 7200
+    assert coll_mods == [{"name": "timestamp", "expireAfterSeconds": 7200}]
+    assert "status_checks" in disabled and "expireAfterSeconds" not in status_checks["timestamp"]
+
+
+def test_unreachable_mongo_is_retried_and_reported(client, mongo, monkeypatch):
+    collection_type = type(mongo.contacts)
+    create_indexes = collection_type.create_indexes
+    attempts = []
+
+    async def flaky_create_indexes(self, models, **kwargs):
+        attempts.append(self.name)
+        if attempts.count("contacts") == 1 and self.name == "contacts":
+            raise ServerSelectionTimeoutError("no servers")
+        return await create_indexes(self, models, **kwargs)
+
+    monkeypatch.setattr(collection_type, "create_indexes", flaky_create_indexes)
+    monkeypatch.setattr(server, "INDEX_RETRY_INTERVAL", 0.05)
+    monkeypatch.setattr(server, "indexes_missing", ["contacts"])
+    assert client.get("/api/health/ready").json()["indexesMissing"] == ["contacts"]
+
+    client.portal.call(server.build_indexes)
+    assert attempts.count("contacts") == 2
+    assert client.get("/api/health/ready").json()["indexesMissing"] == []
+
+
+def test_summarize_plan_flags_collection_scans():
+    explain = {
+        "queryPlanner": {
+            "winningPlan": {
+                "stage": "SORT",
+                "inputStage": {"stage": "COLLSCAN", "direction": "forward"},
+            }
+        },
+        "executionStats": {"totalKeysExamined": 0, "totalDocsExamined": 5000, "nReturned": 1000},
+    }
+    summary = summarize_plan(explain)
+    assert summary["stages"] == ["SORT", "COLLSCAN"]
+    assert summary["collection_scan"] and summary["in_memory_sort"]
+    assert summary["docs_examined"] == 5000
+
+
+def test_summarize_plan_reports_index_use():
+    explain = {
+        "queryPlanner": {
+            "winningPlan": {
+                "queryPlan": {
+                    "stage": "LIMIT",
+                    "inputStage": {
+                        "stage": "FETCH",
+                        "inputStage": {"stage": "IXSCAN", "indexName": "timestamp_id"},
+                    },
+                }
+            }
+        }
+    }
+    summary = summarize_plan(explain)
+    assert summary["indexes"] == ["timestamp_id"]
+    assert not summary["collection_scan"] and not summary["in_memory_sort"]
+
+
+def test_query_plans_endpoint_lists_hot_queries(client):
+    plans = client.get("/api/admin/query-plans").json()
+    assert set(plans) == {
+        "contacts_first_page",
+        "contacts_next_page",
+        "contacts_export",
+        "contacts_by_status",
+        "contacts_by_domain",
+        "status_checks_latest",
+    }
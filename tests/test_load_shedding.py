@@ -0,0 +1,84 @@
+import asyncio
+import time
+
+import httpx
+
+import server
+from load_shedding import AdaptiveLimiter, Overloaded
+
+
+def test_limiter_queues_then_sheds():
+    async def scenario():
+        limiter = AdaptiveLimiter(initial=1, queue_size=1, queue_timeout=0.05)
+        await limiter.acquire()
+        waiting = asyncio.ensure_future(limiter.acquire())
+        await asyncio.sleep(0)
+        try:
+            await limiter.acquire()
+        except Overloaded as e:
+            full = str(e)
+        # Slow, so the limit stays at one
+        limiter.release(0.5)
+        await waiting
+        try:
+            await limiter.acquire()
+        except Overloaded as e:
+            timed_out = str(e)
+        return limiter, full, timed_out
+
+    limiter, full, timed_out = asyncio.run(scenario())
+    assert (full, timed_out) == ("queue full", "queue timeout")
+    assert limiter.in_flight == 1
+    assert limiter.metrics()["waiting"] == 0
+    assert (limiter.rejected, limiter.timed_out, limiter.accepted) == (1, 1, 2)
+
+
+def test_limit_adapts_to_latency():
+    limiter = AdaptiveLimiter(initial=10, max_limit=12, target_latency=0.1)
+    for _ in range(5):
+        limiter.in_flight += 1
+        limiter.release(0.5)
+    # A burst of slow completions is one signal
+    assert int(limiter.limit) == 7
+    for _ in range(100):
+        limiter.in_flight += 1
+        limiter.release(0.01)
+    assert limiter.limit == 12
+    time.sleep(0.1)
+    limiter.in_flight += 1
+    limiter.release(0.01, ok=False)
+    assert int(limiter.limit) == 8
+
+
+def test_route_classes():
+    assert server.route_class("GET", "/api/portfolio/projects") == "cached"
+    assert server.route_class("GET", "/api/contacts") == "mongo_read"
+    assert server.route_class("POST", "/api/contact") == "mongo_write"
+    assert server.route_class("GET", "/api/health/ready") is None
+
+
+def test_slow_writes_are_shed_while_cached_reads_flow(client, mongo, monkeypatch):
+    monkeypatch.setitem(server.route_limiters, "mongo_write", AdaptiveLimiter(initial=2, queue_size=2, queue_timeout=0.05))
+    collection_type = type(mongo.status_checks)
+    insert_one = collection_type.insert_one
+
+    async def slow_insert_one(self, doc, **kwargs):
+        await asyncio.sleep(0.2)
+        return await insert_one(self, doc, **kwargs)
+
+    monkeypatch.setattr(collection_type, "insert_one", slow_insert_one)
+
+    async def incident():
+        transport = httpx.ASGITransport(app=server.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as http:
+            writes = [asyncio.ensure_future(http.post("/api/status", json={"client_name": "m"})) for _ in range(8)]
+            await asyncio.sleep(0.01)
+            portfolio = await http.get("/api/portfolio")
+            return portfolio, await asyncio.gather(*writes)
+
+    portfolio, writes = client.portal.call(incident)
+    assert portfolio.status_code == 200
+    statuses = sorted(response.status_code for response in writes)
+    assert statuses == [200, 200] + [503] * 6
+    shed = next(response for response in writes if response.status_code == 503)
+    assert shed.headers["retry-after"] == "1"
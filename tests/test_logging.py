@@ -0,0 +1,39 @@
+import json
+import logging
+import queue
+
+from logging_setup import JsonFormatter, SamplingQueueHandler
+
+
+def make_record(level=logging.INFO, msg="saved %s", args=("abc",), **extra):
+    record = logging.LogRecord("app", level, __file__, 1, msg, args, None)
+    record.__dict__.update(extra)
+    return record
+
+
+def test_json_formatter_includes_extra_fields():
+    line = JsonFormatter().format(make_record(contact_id="42"))
+    entry = json.loads(line)
+    assert entry["message"] == "saved abc"
+    assert entry["level"] == "INFO"
+    assert entry["contact_id"] == "42"
+
+
+def test_handler_defers_message_formatting():
+    handler = SamplingQueueHandler(queue.Queue(maxsize=10))
+    handler.handle(make_record())
+    queued = handler.queue.get_nowait()
+    assert queued.msg == "saved %s" and queued.args == ("abc",)
+
+
+def test_handler_samples_and_drops_under_pressure():
+    handler = SamplingQueueHandler(queue.Queue(maxsize=4), high_watermark=0.5, sample_every=10)
+    for _ in range(30):
+        handler.handle(make_record())
+    # Two records fit below the high-water mark, then 1 in 10 is kept
+    assert handler.queue.qsize() == 4
+    assert handler.dropped == 26
+
+    # Warnings bypass sampling but are still dropped once the queue is full
+    handler.handle(make_record(level=logging.ERROR))
+    assert handler.dropped == 27
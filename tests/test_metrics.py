@@ -0,0 +1,58 @@
+from types import SimpleNamespace
+
+from metrics import Histogram, MongoCommandMetrics, render_stats
+
+
+def test_histogram_buckets_are_cumulative():
+    histogram = Histogram((0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 3.0):
+        histogram.observe(value)
+    lines = []
+    histogram.render("latency", 'route="/x"', lines)
+    assert lines[:3] == [
+        'latency_bucket{route="/x",le="0.1"} 2',
+        'latency_bucket{route="/x",le="1.0"} 3',
+        'latency_bucket{route="/x",le="+Inf"} 4',
+    ]
+    assert lines[-1] == 'latency_count{route="/x"} 4'
+
+
+def test_stats_render_counters_and_gauges():
+    lines = []
+    render_stats("writer", {"queue_depth": 3, "records_written": 10, "buckets": {"1": 2}}, lines, ["records_written"])
+    assert lines == [
+        "# TYPE writer_queue_depth gauge",
+        "writer_queue_depth 3",
+        "# TYPE writer_records_written_total counter",
+        "writer_records_written_total 10",
+    ]
+
+
+def test_mongo_command_timings():
+    listener = MongoCommandMetrics()
+    listener.succeeded(SimpleNamespace(command_name="insert", duration_micros=1500))
+    listener.succeeded(SimpleNamespace(command_name="find", duration_micros=300))
+    listener.failed(SimpleNamespace(command_name="find", duration_micros=20000))
+    lines = []
+    listener.render(lines)
+    assert 'mongo_command_duration_seconds_count{command="find"} 2' in lines
+    assert 'mongo_command_duration_seconds_bucket{command="insert",le="0.0025"} 1' in lines
+    assert 'mongo_command_failures_total{command="find"} 1' in lines
+
+
+def test_metrics_endpoint_reports_routes(client):
+    client.get("/api/portfolio")
+    client.get("/api/portfolio")
+    client.get("/api/does-not-exist")
+    client.post("/api/status", json={"client_name": "monitor"})
+
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    body = response.text
+    assert 'http_requests_total{route="/api/portfolio",method="GET",status="200"}' in body
+    assert 'http_requests_total{route="<unmatched>",method="GET",status="404"}' in body
+    assert 'http_request_duration_seconds_bucket{route="/api/status",method="POST",le="+Inf"}' in body
+    assert "contact_writer_queue_depth 0" in body
+    assert "# TYPE contact_writer_batches_flushed_total counter" in body
+    assert "# TYPE load_shedding_mongo_write_rejected_total counter" in body
@@ -0,0 +1,176 @@
+import asyncio
+import socketserver
+import threading
+from datetime import datetime, timedelta
+from email import message_from_bytes
+
+from mongomock_motor import AsyncMongoMockClient
+
+from notifications import NotificationWorker, SMTPTransport
+
+
+class RecordingTransport:
+    def __init__(self, fail=False):
+        self.sent = []
+        self.fail = fail
+
+    async def send(self, contact):
+        if self.fail:
+            raise ConnectionError("smtp is down")
+        self.sent.append(contact["id"])
+
+
+def contact(i, status="new", **extra):
+    return {
+        "id": f"c{i}",
+        "name": f"Visitor {i}",
+        "email": f"visitor{i}@example.com",
+        "subject": "Hello",
+        "message": "Hi there",
+        "timestamp": datetime.utcnow() - timedelta(minutes=10 - i),
+        "status": status,
+        **extra,
+    }
+
+
+def run(scenario):
+    collection = AsyncMongoMockClient()["test_database"].contacts
+    return asyncio.run(scenario(collection))
+
+
+def test_worker_notifies_new_contacts_oldest_first():
+    async def scenario(collection):
+        await collection.insert_many([contact(2), contact(0), contact(1, status="notified"), contact(3)])
+        transport = RecordingTransport()
+        worker = NotificationWorker(collection, transport, batch_size=2)
+        claimed = [await worker.run_once(), await worker.run_once(), await worker.run_once()]
+        docs = {doc["id"]: doc async for doc in collection.find({}, {"_id": 0})}
+        return worker, transport, claimed, docs
+
+    worker, transport, claimed, docs = run(scenario)
+    assert transport.sent == ["c0", "c2", "c3"]
+    assert claimed == [2, 1, 0]
+    assert {d["status"] for d in docs.values()} == {"notified"}
+    assert "claimToken" not in docs["c0"] and docs["c0"]["notifyAttempts"] == 1
+    assert worker.metrics()["notified"] == 3
+    assert worker.lag.count == 3 and worker.last_lag_seconds > 60
+
+
+def test_failed_sends_back_off_then_give_up():
+    async def scenario(collection):
+        await collection.insert_one(contact(0))
+        worker = NotificationWorker(collection, RecordingTransport(fail=True), max_attempts=2, base_delay=0)
+        await worker.run_once()
+        first = await collection.find_one({"id": "c0"})
+        await worker.run_once()
+        second = await collection.find_one({"id": "c0"})
+        return worker, first, second
+
+    worker, first, second = run(scenario)
+    assert first["status"] == "new" and first["lastNotifyError"] == "smtp is down"
+    assert second["status"] == "notify_failed" and second["notifyAttempts"] == 2
+    assert (worker.send_failures, worker.gave_up) == (2, 1)
+
+
+def test_backoff_delays_the_retry():
+    async def scenario(collection):
+        await collection.insert_one(contact(0))
+        worker = NotificationWorker(collection, RecordingTransport(fail=True), base_delay=30)
+        await worker.run_once()
+        return await worker.run_once(), await collection.find_one({"id": "c0"})
+
+    claimed, doc = run(scenario)
+    assert claimed == 0
+    assert doc["notifyAfter"] > datetime.utcnow() + timedelta(seconds=25)
+
+
+def test_claims_are_exclusive_until_the_lease_expires():
+    async def scenario(collection):
+        await collection.insert_many([contact(i) for i in range(6)])
+        first = NotificationWorker(collection, RecordingTransport(), batch_size=4)
+        second = NotificationWorker(collection, RecordingTransport(), batch_size=4)
+        a, b = await asyncio.gather(first.claim(), second.claim())
+        # A worker that died mid-batch: its claims come back after the lease
+        await collection.update_many({}, {"$set": {"leaseUntil": datetime.utcnow() - timedelta(seconds=1)}})
+        reclaimed = await second.claim()
+        return a, b, reclaimed
+
+    a, b, reclaimed = run(scenario)
+    ids_a, ids_b = {c["id"] for c in a}, {c["id"] for c in b}
+    assert not ids_a & ids_b
+    assert len(ids_a | ids_b) == 6
+    assert len(reclaimed) == 4 and reclaimed[0]["notifyAttempts"] == 2
+
+
+def test_lease_is_renewed_per_send():
+    class SlowTransport(RecordingTransport):
+        async def send(self, contact):
+            await asyncio.sleep(0.2)
+            await super().send(contact)
+
+    async def scenario(collection):
+        await collection.insert_many([contact(i) for i in range(3)])
+        transport = SlowTransport()
+        # The batch takes 0.6s, twice the lease; each single send fits in it
+        first = NotificationWorker(collection, transport, batch_size=3, lease=0.3)
+        second = NotificationWorker(collection, transport, batch_size=3, lease=0.3)
+
+        async def second_worker():
+            # Claims c2, whose lease from the batch claim has run out by now
+            await asyncio.sleep(0.35)
+            return await second.run_once()
+
+        claimed = await asyncio.gather(first.run_once(), second_worker())
+        return transport, first, claimed
+
+    transport, first, claimed = run(scenario)
+    assert claimed == [3, 1]
+    assert sorted(transport.sent) == ["c0", "c1", "c2"]
+    assert first.metrics()["leases_lost"] == 1
+
+
+class _SMTPHandler(socketserver.StreamRequestHandler):
+    """Just enough SMTP for smtplib to deliver one message."""
+
+    def reply(self, line):
+        self.wfile.write(line.encode("ascii") + b"\r\n")
+
+    def handle(self):
+        self.reply("220 localhost")
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            command = line.decode("ascii").strip().upper()
+            if command.startswith("EHLO"):
+                self.reply("250 localhost")
+            elif command == "DATA":
+                self.reply("354 go ahead")
+                data = b""
+                while (chunk := self.rfile.readline()) != b".\r\n":
+                    data += chunk
+                self.server.messages.append(message_from_bytes(data))
+                self.reply("250 ok")
+            elif command == "QUIT":
+                self.reply("221 bye")
+                return
+            else:
+                self.reply("250 ok")
+
+
+def test_smtp_transport_delivers_to_local_server():
+    server = socketserver.ThreadingTCPServer(("127.0.0.1", 0), _SMTPHandler)
+    server.messages = []
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        transport = SMTPTransport("127.0.0.1", server.server_address[1], "site@example.com", "me@example.com")
+        asyncio.run(transport.send(contact(0)))
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    [message] = server.messages
+    assert message["To"] == "me@example.com"
+    assert message["Reply-To"] == "visitor0@example.com"
+    assert "Hi there" in message.get_payload()
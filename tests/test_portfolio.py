@@ -0,0 +1,133 @@
+import asyncio
+
+from mongomock_motor import AsyncMongoMockClient
+
+from portfolio_content import PORTFOLIO_DATA
+from portfolio_store import SECTIONS, PortfolioStore
+
+
+class UnavailableCollection:
+    """Stands in for a collection whose server cannot be reached."""
+
+    def find(self, *args, **kwargs):
+        raise ConnectionError("mongo is down")
+
+
+def test_portfolio_served_with_etag(client):
+    response = client.get("/api/portfolio")
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/json"
+    assert response.headers["etag"].startswith('"')
+    assert response.json() == PORTFOLIO_DATA
+
+
+def test_portfolio_conditional_get_returns_304(client):
+    etag = client.get("/api/portfolio").headers["etag"]
+    response = client.get("/api/portfolio", headers={"If-None-Match": f'W/{etag}, "other"'})
+    stale = client.get("/api/portfolio", headers={"If-None-Match": '"stale"'})
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["etag"] == etag
+    assert stale.status_code == 200
+
+
+def test_store_seeds_and_picks_up_edits():
+    async def scenario():
+        collection = AsyncMongoMockClient()["test_database"].portfolio_data
+        store = PortfolioStore(collection, poll_interval=0.01)
+        store.start()
+        await asyncio.sleep(0.05)
+        assert await collection.count_documents({}) == len(PORTFOLIO_DATA)
+        before = await store.get_payload()
+        assert await store.get_payload() is before
+
+        navigation = [{"name": "Home", "href": "#home"}]
+        await store.update_section("navigation", navigation)
+        await store.get_sections(["navigation"])
+        await asyncio.sleep(0.05)
+        after = await store.get_payload()
+        await store.stop()
+        return before, after
+
+    before, after = asyncio.run(scenario())
+    assert after.etag != before.etag
+    assert b'"navigation":[{"name":"Home","href":"#home"}]' in after.body
+
+
+def test_store_falls_back_to_builtin_content():
+    async def scenario():
+        store = PortfolioStore(UnavailableCollection(), ttl=0)
+        return await store.get_sections(["projects", "navigation"])
+
+    sections = asyncio.run(scenario())
+    assert sections == {
+        "projects": PORTFOLIO_DATA["projects"],
+        "navigation": PORTFOLIO_DATA["navigation"],
+    }
+
+
+def test_mongo_blip_keeps_edited_sections():
+    async def scenario():
+        collection = AsyncMongoMockClient()["test_database"].portfolio_data
+        store = PortfolioStore(collection, ttl=0, retry_interval=60)
+        await store.seed()
+        navigation = [{"name": "Home", "href": "#home"}]
+        await store.update_section("navigation", navigation)
+        await store.warm()
+        before = await store.get_payload()
+
+        # One failed refresh: serve what is cached and retry later
+        store.collection = UnavailableCollection()
+        store.invalidate()
+        await store._load(SECTIONS)
+        after = await store.get_payload()
+        return navigation, before, after, await store.get_sections(["navigation"])
+
+    navigation, before, after, sections = asyncio.run(scenario())
+    assert sections == {"navigation": navigation}
+    assert after is before
+
+
+def test_portfolio_sections_subset(client):
+    response = client.get("/api/portfolio", params={"sections": "certifications, projects"})
+    assert response.status_code == 200
+    # Canonical section order, whatever order was asked for
+    assert list(response.json()) == ["certifications", "projects"]
+    full = client.get("/api/portfolio")
+    assert response.headers["etag"] != full.headers["etag"]
+    assert len(response.content) < len(full.content)
+
+    same = client.get("/api/portfolio", params={"sections": "projects,certifications"})
+    assert same.headers["etag"] == response.headers["etag"]
+    assert client.get("/api/portfolio", params={"sections": "projects,secrets"}).status_code == 400
+
+
+def test_portfolio_section_route_revalidates_independently(client):
+    response = client.get("/api/portfolio/projects")
+    assert response.status_code == 200
+    assert response.json() == PORTFOLIO_DATA["projects"]
+    etag = response.headers["etag"]
+    assert client.get("/api/portfolio/projects", headers={"If-None-Match": etag}).status_code == 304
+    assert client.get("/api/portfolio/navigation", headers={"If-None-Match": etag}).status_code == 200
+    assert client.get("/api/portfolio/secrets").status_code == 404
+
+
+def test_section_payload_changes_only_with_its_section():
+    async def scenario():
+        collection = AsyncMongoMockClient()["test_database"].portfolio_data
+        store = PortfolioStore(collection)
+        await store.seed()
+        projects = await store.get_section_payload("projects")
+        navigation = await store.get_section_payload("navigation")
+        await store.update_section("projects", [{"title": "New"}])
+        await store._load(["projects", "navigation"])
+        return (
+            projects,
+            navigation,
+            await store.get_section_payload("projects"),
+            await store.get_section_payload("navigation"),
+        )
+
+    projects, navigation, new_projects, same_navigation = asyncio.run(scenario())
+    assert new_projects.etag != projects.etag
+    assert same_navigation is navigation
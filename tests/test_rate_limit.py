@@ -0,0 +1,83 @@
+import asyncio
+
+import pytest
+from mongomock_motor import AsyncMongoMockClient
+
+import server
+from rate_limit import MemoryBackend, MongoBackend, RateLimit
+
+CONTACT = {
+    "name": "Jane Doe",
+    "email": "jane@example.com",
+    "subject": "Hello",
+    "message": "Just saying hi.",
+}
+
+
+def test_parse_rate_limit():
+    limit = RateLimit.parse("5/minute")
+    assert limit.capacity == 5
+    assert limit.rate == pytest.approx(5 / 60)
+    with pytest.raises(ValueError):
+        RateLimit.parse("5/fortnight")
+
+
+@pytest.mark.parametrize("make_backend", [
+    MemoryBackend,
+    lambda: MongoBackend(AsyncMongoMockClient()["test_database"].rate_limits),
+])
+def test_bucket_allows_burst_then_rejects(make_backend):
+    async def scenario():
+        backend = make_backend()
+        limit = RateLimit(3, 1.0)
+        return [await backend.take("contact:1.2.3.4", limit) for _ in range(4)]
+
+    *allowed, rejected = asyncio.run(scenario())
+    assert allowed == [0.0, 0.0, 0.0]
+    assert 0 < rejected <= 1.0
+
+
+@pytest.mark.parametrize("make_backend", [
+    MemoryBackend,
+    lambda: MongoBackend(AsyncMongoMockClient()["test_database"].rate_limits),
+])
+def test_costly_request_puts_bucket_into_debt(make_backend):
+    async def scenario():
+        backend = make_backend()
+        limit = RateLimit(3, 1.0)
+        return [await backend.take("status:1.2.3.4", limit, cost) for cost in (2, 5, 1)]
+
+    allowed, overdrawn, rejected = asyncio.run(scenario())
+    assert allowed == overdrawn == 0.0
+    # 1 - 5 = -4 tokens left: five seconds until the next one
+    assert 4 < rejected <= 5
+
+
+def test_memory_backend_is_bounded():
+    async def scenario():
+        backend = MemoryBackend(shards=4, max_keys_per_shard=8)
+        for i in range(1000):
+            await backend.take(f"status:10.0.0.{i}", RateLimit(1, 1.0))
+        return sum(len(shard) for shard in backend._shards)
+
+    assert asyncio.run(scenario()) <= 32
+
+
+def test_contact_over_limit_gets_429(client):
+    statuses = [client.post("/api/contact", json=CONTACT).status_code for _ in range(6)]
+    assert statuses == [200] * 5 + [429]
+    response = client.post("/api/contact", json=CONTACT)
+    assert int(response.headers["retry-after"]) >= 1
+    # Other routes have their own buckets
+    assert client.post("/api/status", json={"client_name": "monitor"}).status_code == 200
+
+
+def test_bulk_status_checks_are_charged_per_check(client, monkeypatch):
+    monkeypatch.setattr(server.STATUS_RATE_LIMIT, "capacity", 10)
+    monkeypatch.setattr(server.STATUS_RATE_LIMIT, "rate", 10 / 60)
+    checks = [{"client_name": f"monitor-{i}"} for i in range(8)]
+    assert client.post("/api/status/bulk", json=checks).status_code == 200
+    assert client.post("/api/status/bulk", json=checks).status_code == 200
+    response = client.post("/api/status", json={"client_name": "monitor"})
+    assert response.status_code == 429
+    assert int(response.headers["retry-after"]) >= 30
@@ -0,0 +1,34 @@
+import compression
+from http_cache import CachedPayload
+from shared_cache import SharedPayloadSlot
+
+
+def test_second_process_adopts_published_variants(monkeypatch):
+    writer = SharedPayloadSlot(64 * 1024)
+    # What a forked worker sees: the same segment and lock
+    reader = SharedPayloadSlot(name=writer.name, lock=writer.lock)
+    try:
+        body = b'{"projects":[' + b'"x",' * 500 + b'"y"]}'
+        published = writer.exchange(CachedPayload(body))
+        assert published.variant("gzip") is not None
+
+        def fail(*args):
+            raise AssertionError("variant should come from the shared slot")
+
+        monkeypatch.setattr("http_cache.compress", fail)
+        adopted = reader.exchange(CachedPayload(body))
+        assert adopted.etag == published.etag
+        for encoding in compression.ENCODINGS:
+            assert adopted.variant(encoding) == published.variant(encoding)
+    finally:
+        reader.close()
+        writer.close()
+
+
+def test_oversized_payload_is_not_published():
+    slot = SharedPayloadSlot(1024)
+    try:
+        assert not slot.publish(CachedPayload(b"x" * 4096))
+        assert slot.latest() is None
+    finally:
+        slot.close()
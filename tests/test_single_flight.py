@@ -0,0 +1,94 @@
+import asyncio
+
+import httpx
+
+import server
+from single_flight import SingleFlight
+
+
+def test_concurrent_calls_share_one_execution():
+    calls = []
+
+    async def read():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return object()
+
+    async def scenario():
+        reads = SingleFlight()
+        results = await asyncio.gather(*(reads.do("key", read) for _ in range(20)))
+        later = await reads.do("key", read)
+        return reads, results, later
+
+    reads, results, later = asyncio.run(scenario())
+    assert all(result is results[0] for result in results)
+    assert later is not results[0]
+    assert len(calls) == 2
+    assert reads.metrics()["coalesced"] == 19
+
+
+def test_failures_are_shared_but_not_cached():
+    async def failing():
+        await asyncio.sleep(0.01)
+        raise ConnectionError("mongo is down")
+
+    async def scenario():
+        reads = SingleFlight(ttl=60)
+        outcomes = await asyncio.gather(*(reads.do("key", failing) for _ in range(3)), return_exceptions=True)
+        assert await reads.do("key", lambda: asyncio.sleep(0, "ok")) == "ok"
+        return reads, outcomes
+
+    reads, outcomes = asyncio.run(scenario())
+    assert all(isinstance(outcome, ConnectionError) for outcome in outcomes)
+    assert reads.executions == 2
+
+
+def test_micro_cache_and_invalidate():
+    async def scenario():
+        reads = SingleFlight(ttl=60)
+        first = await reads.do("key", lambda: asyncio.sleep(0, [1]))
+        cached = await reads.do("key", lambda: asyncio.sleep(0, [2]))
+        reads.invalidate()
+        fresh = await reads.do("key", lambda: asyncio.sleep(0, [3]))
+        return first, cached, fresh, reads
+
+    first, cached, fresh, reads = asyncio.run(scenario())
+    assert cached is first
+    assert fresh == [3]
+    assert reads.cache_hits == 1
+
+
+def test_cancelled_caller_does_not_cancel_shared_read():
+    async def scenario():
+        reads = SingleFlight()
+        first = asyncio.ensure_future(reads.do("key", lambda: asyncio.sleep(0.02, "done")))
+        second = asyncio.ensure_future(reads.do("key", lambda: asyncio.sleep(0, "other")))
+        await asyncio.sleep(0.005)
+        first.cancel()
+        return await second
+
+    assert asyncio.run(scenario()) == "done"
+
+
+def test_concurrent_status_reads_hit_mongo_once(client, mongo, monkeypatch):
+    client.post("/api/status", json={"client_name": "monitor"})
+    finds = []
+    collection_type = type(mongo.status_checks)
+    find = collection_type.find
+
+    def counting_find(self, *args, **kwargs):
+        finds.append(args)
+        return find(self, *args, **kwargs)
+
+    monkeypatch.setattr(collection_type, "find", counting_find)
+
+    async def stampede():
+        transport = httpx.ASGITransport(app=server.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as http:
+            return await asyncio.gather(*(http.get("/api/status") for _ in range(10)))
+
+    responses = client.portal.call(stampede)
+    assert {r.status_code for r in responses} == {200}
+    assert all(r.content == responses[0].content for r in responses)
+    assert responses[0].json()[0]["client_name"] == "monitor"
+    assert len(finds) < 10
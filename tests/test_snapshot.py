@@ -0,0 +1,56 @@
+import asyncio
+import gzip
+import json
+
+import server
+import snapshot
+from portfolio_content import PORTFOLIO_DATA
+
+
+def export(out_dir, **kwargs):
+    async def run():
+        await server.portfolio_store.warm()
+        return await snapshot.export_snapshot(server.app, out_dir, **kwargs)
+
+    return asyncio.run(run())
+
+
+def test_snapshot_writes_routes_with_variants(mongo, tmp_path):
+    report = export(tmp_path)
+    assert report["skipped"] == {}
+    assert set(report["written"]) == set(snapshot.static_paths())
+
+    manifest = json.loads((tmp_path / snapshot.MANIFEST).read_text())
+    portfolio = manifest["routes"]["/api/portfolio"]
+    assert portfolio["file"] == "api/portfolio.json"
+    body = (tmp_path / portfolio["file"]).read_bytes()
+    assert json.loads(body) == PORTFOLIO_DATA
+    assert gzip.decompress((tmp_path / portfolio["variants"]["gzip"]["file"]).read_bytes()) == body
+    assert portfolio["headers"]["etag"].startswith('"')
+
+    projects = manifest["routes"]["/api/portfolio/projects"]
+    assert json.loads((tmp_path / projects["file"]).read_bytes()) == PORTFOLIO_DATA["projects"]
+
+    resume = manifest["routes"]["/api/resume/download"]
+    assert resume["file"] == "api/resume/download.pdf"
+    assert "content-disposition" in resume["headers"]
+
+    assert "POST /api/contact" in manifest["dynamic"]
+    assert "GET /api/contacts" in manifest["dynamic"]
+    assert not any(route.startswith("GET /api/portfolio/") for route in manifest["dynamic"])
+
+
+def test_snapshot_rebuild_only_rewrites_changed_routes(mongo, tmp_path):
+    export(tmp_path)
+    unchanged = export(tmp_path)
+    assert unchanged["written"] == []
+
+    navigation = [{"name": "Home", "href": "#home"}]
+    asyncio.run(server.portfolio_store.update_section("navigation", navigation))
+    report = export(tmp_path)
+    assert set(report["written"]) == {"/api/portfolio", "/api/portfolio/navigation"}
+    assert json.loads((tmp_path / "api/portfolio/navigation.json").read_bytes()) == navigation
+
+    (tmp_path / "api/portfolio/technicalSkills.json").unlink()
+    assert export(tmp_path)["written"] == ["/api/portfolio/technicalSkills"]
+    assert set(export(tmp_path, force=True)["written"]) == set(snapshot.static_paths())
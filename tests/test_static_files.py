@@ -0,0 +1,99 @@
+import os
+
+import pytest
+from starlette.requests import Request
+from starlette.responses import FileResponse
+
+from static_files import RangeNotSatisfiable, StaticFile, file_response, parse_range
+
+CONTENT = b"%PDF-1.4 " + b"resume line\n" * 2000
+
+
+def make_request(headers=None, extensions=None):
+    scope = {
+        "type": "http",
+        "method": "GET",
+        "path": "/api/resume/download",
+        "headers": [(k.lower().encode(), v.encode()) for k, v in (headers or {}).items()],
+    }
+    if extensions is not None:
+        scope["extensions"] = extensions
+    return Request(scope)
+
+
+@pytest.fixture
+def resume(tmp_path):
+    path = tmp_path / "resume.pdf"
+    path.write_bytes(CONTENT)
+    return StaticFile(path, "application/pdf", check_interval=60)
+
+
+def test_parse_range():
+    assert parse_range("bytes=0-99", 1000) == (0, 99)
+    assert parse_range("bytes=900-", 1000) == (900, 999)
+    assert parse_range("bytes=-100", 1000) == (900, 999)
+    assert parse_range("bytes=990-2000", 1000) == (990, 999)
+    assert parse_range("bytes=0-1,5-6", 1000) is None
+    assert parse_range("items=0-1", 1000) is None
+    with pytest.raises(RangeNotSatisfiable):
+        parse_range("bytes=1000-", 1000)
+
+
+def test_range_request_returns_partial_content(resume):
+    response = file_response(make_request({"Range": "bytes=100-199"}), resume.get())
+    assert response.status_code == 206
+    assert response.body == CONTENT[100:200]
+    assert response.headers["content-range"] == f"bytes 100-199/{len(CONTENT)}"
+    assert "content-encoding" not in response.headers
+
+
+def test_unsatisfiable_range_returns_416(resume):
+    response = file_response(make_request({"Range": f"bytes={len(CONTENT)}-"}), resume.get())
+    assert response.status_code == 416
+    assert response.headers["content-range"] == f"bytes */{len(CONTENT)}"
+
+
+def test_stale_if_range_serves_full_body(resume):
+    response = file_response(make_request({"Range": "bytes=0-9", "If-Range": '"old"'}), resume.get())
+    assert response.status_code == 200
+    assert response.body == CONTENT
+
+
+def test_conditional_requests_return_304(resume):
+    snapshot = resume.get()
+    by_etag = file_response(make_request({"If-None-Match": snapshot.etag}), snapshot)
+    by_date = file_response(make_request({"If-Modified-Since": snapshot.last_modified}), snapshot)
+    assert by_etag.status_code == 304
+    assert by_date.status_code == 304
+    assert by_date.headers["last-modified"] == snapshot.last_modified
+
+
+def test_pathsend_used_when_server_supports_it(resume):
+    plain = file_response(make_request(), resume.get())
+    zero_copy = file_response(make_request(extensions={"http.response.pathsend": {}}), resume.get())
+    assert plain.body == CONTENT
+    assert isinstance(zero_copy, FileResponse)
+    assert zero_copy.headers["etag"] == plain.headers["etag"]
+
+
+def test_metadata_reread_only_after_interval(resume):
+    first = resume.get()
+    resume.path.write_bytes(CONTENT + b"updated")
+    os.utime(resume.path, ns=(first.stat.st_mtime_ns + 10**9,) * 2)
+    assert resume.get() is first
+
+    resume.check_interval = 0
+    updated = resume.get()
+    assert updated is not first
+    assert updated.etag != first.etag
+    assert resume.get() is updated
+
+
+def test_resume_download_endpoint(client):
+    response = client.get("/api/resume/download")
+    assert response.status_code == 200
+    assert response.headers["accept-ranges"] == "bytes"
+    assert "last-modified" in response.headers
+    assert client.get(
+        "/api/resume/download", headers={"If-None-Match": response.headers["etag"]}
+    ).status_code == 304
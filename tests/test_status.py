@@ -0,0 +1,65 @@
+import json
+from datetime import datetime, timedelta
+
+import serialization
+import server
+from server import StatusCheck
+
+
+def test_status_round_trip_matches_response_model(client):
+    created = [client.post("/api/status", json={"client_name": f"monitor-{i}"}).json() for i in range(3)]
+    for body in created:
+        StatusCheck.model_validate(body)
+
+    listed = client.get("/api/status").json()
+    assert [c["id"] for c in listed] == [c["id"] for c in reversed(created)]
+    assert all(set(c) == {"id", "client_name", "timestamp"} for c in listed)
+
+
+def test_fast_encoder_matches_stdlib_output(monkeypatch):
+    data = {"name": "Pavitra – café", "when": datetime(2024, 5, 1, 12, 30, 0, 250000), "tags": [1, 2.5, None]}
+    fast = serialization.dumps(data)
+    monkeypatch.setattr(serialization, "orjson", None)
+    assert serialization.dumps(data) == fast
+    assert json.loads(fast)["when"] == "2024-05-01T12:30:00.250000"
+
+
+def test_bulk_status_checks_use_one_insert(client, mongo, monkeypatch):
+    calls = []
+    collection_type = type(mongo.status_checks)
+    insert_many = collection_type.insert_many
+
+    async def counting_insert_many(self, docs, **kwargs):
+        calls.append(len(docs))
+        return await insert_many(self, docs, **kwargs)
+
+    monkeypatch.setattr(collection_type, "insert_many", counting_insert_many)
+    response = client.post("/api/status/bulk", json=[{"client_name": f"monitor-{i}"} for i in range(50)])
+    assert response.status_code == 200
+    assert [c["client_name"] for c in response.json()] == [f"monitor-{i}" for i in range(50)]
+    assert calls == [50]
+    assert len(client.get("/api/status").json()) == 50
+
+
+def test_bulk_status_checks_are_bounded(client, monkeypatch):
+    assert client.post("/api/status/bulk", json=[]).status_code == 422
+    too_many = [{"client_name": "m"}] * (server.STATUS_BULK_MAX + 1)
+    assert client.post("/api/status/bulk", json=too_many).status_code == 422
+
+
+def test_status_summary_groups_by_client(client, mongo):
+    now = datetime.utcnow()
+    client.portal.call(mongo.status_checks.insert_many, [
+        {"id": "1", "client_name": "api", "timestamp": now - timedelta(hours=3)},
+        {"id": "2", "client_name": "api", "timestamp": now - timedelta(minutes=5)},
+        {"id": "3", "client_name": "web", "timestamp": now - timedelta(hours=1)},
+        {"id": "4", "client_name": "web", "timestamp": now - timedelta(days=2)},
+    ])
+    summary = client.get("/api/status/summary").json()
+    assert [(c["client_name"], c["count"]) for c in summary["clients"]] == [("api", 2), ("web", 1)]
+    assert summary["clients"][0]["lastSeen"].startswith((now - timedelta(minutes=5)).isoformat()[:19])
+
+    since = (now - timedelta(hours=2)).isoformat()
+    summary = client.get("/api/status/summary", params={"since": since}).json()
+    assert [(c["client_name"], c["count"]) for c in summary["clients"]] == [("api", 1), ("web", 1)]
+    assert client.get("/api/status/summary", params={"since": now.isoformat(), "until": since}).status_code == 400